@@ -6,6 +6,7 @@ from starlette.status import HTTP_401_UNAUTHORIZED
 from app.core.config import SECRET_KEY, API_PREFIX
 from app.models.user import UserInDB
 from app.api.dependencies.database import get_repository
+from app.db.pools import AUTH_POOL
 from app.db.repositories.users import UsersRepository
 from app.services import auth_service
 
@@ -16,7 +17,7 @@ oauth2_scheme = OAuth2PasswordBearer(
 async def get_user_from_token(
     *,
     token: str = Depends(oauth2_scheme),
-    user_repo: UsersRepository = Depends(get_repository(UsersRepository))
+    user_repo: UsersRepository = Depends(get_repository(UsersRepository, pool=AUTH_POOL))
 
 ) -> Optional[UserInDB]:
     try:
@@ -45,3 +46,13 @@ def get_current_active_user(current_user: UserInDB = Depends(get_user_from_token
         )
 
     return current_user
+
+
+def get_current_superuser(current_user: UserInDB = Depends(get_current_active_user)) -> UserInDB:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only superusers can access this resource."
+        )
+
+    return current_user
@@ -1,12 +1,21 @@
 from fastapi import HTTPException, Depends, Path, status
 
 from app.models.user import UserInDB
-from app.models.cleaning import CleaningInDB, CleaningPublic
+from app.models.cleaning import CleaningExpansion, CleaningInDB, CleaningPublic
 
 from app.db.repositories.cleanings import CleaningsRepository
 
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.auth import get_current_active_user
+from app.api.dependencies.fields import get_field_selection
+
+
+get_cleaning_field_selection = get_field_selection(
+    CleaningPublic, expansions=CleaningExpansion, default_expand=[CleaningExpansion.owner]
+)
+get_cleaning_list_field_selection = get_field_selection(
+    CleaningPublic, expansions=CleaningExpansion
+)
 
 
 async def get_cleaning_by_id_from_path(
@@ -15,7 +24,10 @@ async def get_cleaning_by_id_from_path(
     cleanings_repo: CleaningsRepository = Depends(
         get_repository(CleaningsRepository)),
 ) -> CleaningPublic:
-    cleaning = await cleanings_repo.get_cleaning_by_id(id=cleaning_id, requesting_user=current_user)
+    # permission checks and nested routes only need the owner id
+    cleaning = await cleanings_repo.get_cleaning_by_id(
+        id=cleaning_id, requesting_user=current_user, populate=False
+    )
 
     if not cleaning:
         raise HTTPException(
@@ -0,0 +1,149 @@
+import hashlib
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Depends, Path, Request
+from starlette.responses import Response
+
+from app.core.config import VERSION
+from app.models.user import UserInDB
+from app.db.repositories.cleanings import CleaningsRepository
+from app.db.repositories.profiles import ProfilesRepository
+from app.api.dependencies.auth import get_current_active_user
+from app.api.dependencies.database import get_repository
+
+# where validators computed by a route dependency are left for ConditionalRequestsMiddleware
+CACHE_VALIDATORS_STATE_KEY = "cache_validators"
+
+
+class CacheValidators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime.datetime] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(datetime.timezone.utc), usegmt=True
+            )
+
+        return headers
+
+
+class NotModified(Exception):
+    def __init__(self, validators: CacheValidators) -> None:
+        self.validators = validators
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def make_content_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison function
+    candidates = [opaque_tag(tag.strip()) for tag in if_none_match.split(",")]
+    return opaque_tag(etag) in candidates
+
+
+def is_not_modified(
+    *, if_none_match: Optional[str], if_modified_since: Optional[str], validators: CacheValidators
+) -> bool:
+    if if_none_match is not None:
+        return etag_matches(if_none_match, validators.etag)
+
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+
+    # http dates only carry whole seconds
+    return validators.last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(validators: CacheValidators) -> Response:
+    return Response(status_code=304, headers=validators.headers)
+
+
+async def not_modified_exception_handler(request: Request, exc: NotModified) -> Response:
+    return not_modified_response(exc.validators)
+
+
+def evaluate_conditional_request(request: Request, *, validators: CacheValidators) -> None:
+    """
+    Answers with a 304 when the client already holds this representation,
+    otherwise leaves the validators for the middleware to put on the response.
+    """
+    if is_not_modified(
+        if_none_match=request.headers.get("if-none-match"),
+        if_modified_since=request.headers.get("if-modified-since"),
+        validators=validators,
+    ):
+        raise NotModified(validators)
+
+    setattr(request.state, CACHE_VALIDATORS_STATE_KEY, validators)
+
+
+def get_resource_validators(
+    request: Request, *, resource: str, resource_id: str, last_modified: datetime.datetime
+) -> CacheValidators:
+    # fields= and expand= change the representation, so they are part of the tag
+    return CacheValidators(
+        etag=make_etag(VERSION, resource, resource_id, last_modified.isoformat(), request.url.query),
+        last_modified=last_modified,
+    )
+
+
+async def check_cleaning_conditional_request(
+    request: Request,
+    cleaning_id: str = Path(...),
+    # never answer a 304 before the request is authenticated
+    current_user: UserInDB = Depends(get_current_active_user),
+    cleanings_repo: CleaningsRepository = Depends(get_repository(CleaningsRepository)),
+) -> None:
+    last_modified = await cleanings_repo.get_cleaning_last_modified(id=cleaning_id)
+
+    # unknown cleanings fall through to the route's own 404
+    if last_modified:
+        evaluate_conditional_request(
+            request,
+            validators=get_resource_validators(
+                request, resource="cleaning", resource_id=cleaning_id, last_modified=last_modified
+            )
+        )
+
+
+async def check_profile_conditional_request(
+    request: Request,
+    username: str = Path(...),
+    current_user: UserInDB = Depends(get_current_active_user),
+    profiles_repo: ProfilesRepository = Depends(get_repository(ProfilesRepository)),
+) -> None:
+    last_modified = await profiles_repo.get_profile_last_modified_by_username(username=username)
+
+    if last_modified:
+        evaluate_conditional_request(
+            request,
+            validators=get_resource_validators(
+                request, resource="profile", resource_id=username, last_modified=last_modified
+            )
+        )
@@ -1,4 +1,4 @@
-from typing import Callable, Type
+from typing import Callable, Optional, Type
 from databases import Database
 
 from fastapi import Depends
@@ -11,8 +11,20 @@ def get_database(request: Request) -> Database:
     return request.app.state._db
 
 
-def get_repository(Repo_type: Type[BaseRepository]) -> Callable:
-    def get_repo(db: Database = Depends(get_database)) -> Type[BaseRepository]:
+def get_database_pool(name: str) -> Callable:
+    def get_pool(request: Request) -> Database:
+        pools = getattr(request.app.state, "_db_pools", None)
+        return pools.get(name) if pools else get_database(request)
+
+    return get_pool
+
+
+def get_repository(Repo_type: Type[BaseRepository], *, pool: Optional[str] = None) -> Callable:
+    """
+    Repositories run on the pool they declare, `pool=` overrides it for
+    a single dependency, e.g. user lookups made while authenticating.
+    """
+    def get_repo(db: Database = Depends(get_database_pool(pool or Repo_type.pool))) -> Type[BaseRepository]:
         return Repo_type(db)
 
     return get_repo
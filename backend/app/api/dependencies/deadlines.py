@@ -0,0 +1,16 @@
+from typing import Callable
+
+from app.core.deadlines import get_request_deadline
+
+
+def limit_request_time(seconds: float) -> Callable:
+    """
+    Route dependency that shortens the request's deadline, and with it the
+    statement_timeout of the queries the route runs afterwards.
+    """
+    async def tighten_request_deadline() -> None:
+        deadline = get_request_deadline()
+        if deadline is not None:
+            deadline.tighten(seconds)
+
+    return tighten_request_deadline
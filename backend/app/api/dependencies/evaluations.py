@@ -1,18 +1,41 @@
-from typing import List
-from fastapi import Depends
+from typing import List, Optional, Tuple
+from fastapi import Depends, Query
 from fastapi.exceptions import HTTPException
 from starlette import status
 
 from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.cleanings import get_cleaning_by_id_from_path, user_owns_cleaning
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.deadlines import limit_request_time
+from app.api.dependencies.fields import FieldSelection, get_field_selection
 from app.api.dependencies.offers import get_offer_for_cleaning_from_user_by_path
+from app.api.dependencies.pagination import Pagination, get_pagination
 from app.api.dependencies.users import get_user_by_username_from_path
+from app.core.config import ANALYTICAL_REQUEST_TIMEOUT_SECONDS
+from app.db.pools import ANALYTICAL_POOL
 from app.db.repositories.evaluations import EvaluationsRepository
 from app.models.cleaning import CleaningInDB
 from app.models.offer import OfferInDB
 from app.models.user import UserInDB
-from app.models.evaluation import EvaluationInDB
+from app.models.evaluation import (
+    EvaluationAggregate,
+    EvaluationCursor,
+    EvaluationExpansion,
+    EvaluationPublic,
+    EvaluationSort,
+)
+
+
+get_evaluation_list_field_selection = get_field_selection(
+    EvaluationPublic, expansions=EvaluationExpansion
+)
+get_evaluation_list_pagination = get_pagination(EvaluationCursor)
+
+
+def get_evaluation_sort(
+    sort: EvaluationSort = Query(EvaluationSort.newest, description="The order evaluations come in."),
+) -> EvaluationSort:
+    return sort
 
 
 async def check_evaluation_create_permissions(
@@ -43,11 +66,48 @@ async def check_evaluation_create_permissions(
 
 
 async def list_evaluations_for_cleaner_from_path(
+    sort: EvaluationSort = Depends(get_evaluation_sort),
+    min_rating: Optional[int] = Query(None, ge=0, le=5, description="Only evaluations rated at least this."),
+    max_rating: Optional[int] = Query(None, ge=0, le=5, description="Only evaluations rated at most this."),
+    no_show: Optional[bool] = Query(None, description="Only no-shows, or only the jobs the cleaner showed up for."),
+    include_stats: bool = Query(
+        False, description="Also return the cleaner's aggregate ratings, counted from the same snapshot."
+    ),
+    pagination: Pagination = Depends(get_evaluation_list_pagination),
+    selection: FieldSelection = Depends(get_evaluation_list_field_selection),
     cleaner: UserInDB = Depends(get_user_by_username_from_path),
     evals_repo: EvaluationsRepository = Depends(
-        get_repository(EvaluationsRepository))
-) -> List[EvaluationInDB]:
-    return await evals_repo.list_evaluations_for_cleaner(cleaner=cleaner)
+        get_repository(EvaluationsRepository)),
+    analytical_evals_repo: EvaluationsRepository = Depends(
+        get_repository(EvaluationsRepository, pool=ANALYTICAL_POOL))
+) -> Tuple[List[EvaluationPublic], Optional[EvaluationAggregate]]:
+    if min_rating is not None and max_rating is not None and min_rating > max_rating:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="min_rating can't be greater than max_rating."
+        )
+
+    if pagination.after and pagination.after.sort != sort:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    options = dict(
+        cleaner=cleaner,
+        sort=sort,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        no_show=no_show,
+        # one more than the page, so render_page knows whether another follows
+        limit=pagination.limit + 1,
+        after=pagination.after,
+        expand=selection.expand,
+    )
+
+    if include_stats:
+        # the aggregates scan all of the cleaner's evaluations, same as /stats
+        await limit_request_time(ANALYTICAL_REQUEST_TIMEOUT_SECONDS)()
+        return await analytical_evals_repo.list_evaluations_for_cleaner_with_stats(**options)
+
+    return await evals_repo.list_evaluations_for_cleaner(**options), None
 
 
 async def get_cleaner_evaluation_for_cleaning_from_path(
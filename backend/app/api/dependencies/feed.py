@@ -0,0 +1,7 @@
+from fastapi import Request
+
+from app.services.feed_snapshot import CleaningFeedSnapshot
+
+
+def get_cleaning_feed_snapshot(request: Request) -> CleaningFeedSnapshot:
+    return request.app.state.cleaning_feed_snapshot
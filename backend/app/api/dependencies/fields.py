@@ -0,0 +1,116 @@
+from enum import Enum
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class FieldSelection(NamedTuple):
+    # pydantic style include mapping, None means every field
+    include: Optional[Dict[str, Any]]
+    expand: FrozenSet[Enum]
+
+
+def split_query_values(values: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Accepts both `?fields=id,name` and `?fields=id&fields=name`.
+    """
+    if values is None:
+        return None
+
+    return [v.strip() for value in values for v in value.split(",") if v.strip()]
+
+
+def build_include(*, paths: List[str], model: Type[BaseModel]) -> Dict[str, Any]:
+    include: Dict[str, Any] = {}
+
+    for path in paths:
+        parts = path.split(".")
+        if parts[0] not in model.__fields__:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown field '{path}'."
+            )
+
+        node = include
+        for part in parts[:-1]:
+            if node.get(part) is ...:
+                # the whole parent was already selected
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = ...
+
+    return include
+
+
+def parse_expand(
+    *, values: Optional[List[str]], expansions: Optional[Type[Enum]], default: FrozenSet[Enum]
+) -> FrozenSet[Enum]:
+    if values is None:
+        return default
+
+    try:
+        return frozenset(expansions(v) for v in values) if expansions else frozenset()
+    except ValueError:
+        allowed = ", ".join(e.value for e in expansions)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Can only expand: {allowed}."
+        )
+
+
+def get_field_selection(
+    model: Type[BaseModel],
+    *,
+    expansions: Optional[Type[Enum]] = None,
+    default_expand: Iterable[Enum] = (),
+) -> Callable:
+    """
+    Builds a dependency that reads the `fields=` and `expand=` query parameters
+    for a response model. `expand` decides which relations the repositories
+    populate, `fields` trims the serialized response.
+    """
+    default = frozenset(default_expand)
+    fields_description = "Comma separated fields to return, e.g. `id,name,owner.username`."
+
+    if expansions is None:
+        def get_selection(
+            fields: Optional[List[str]] = Query(None, description=fields_description),
+        ) -> FieldSelection:
+            paths = split_query_values(fields)
+            return FieldSelection(
+                include=build_include(paths=paths, model=model) if paths else None,
+                expand=default,
+            )
+
+        return get_selection
+
+    def get_selection_with_expand(
+        fields: Optional[List[str]] = Query(None, description=fields_description),
+        expand: Optional[List[str]] = Query(
+            None,
+            description=f"Comma separated relations to embed: {', '.join(e.value for e in expansions)}. "
+                        "Pass an empty value to embed none."
+        ),
+    ) -> FieldSelection:
+        paths = split_query_values(fields)
+        return FieldSelection(
+            include=build_include(paths=paths, model=model) if paths else None,
+            expand=parse_expand(values=split_query_values(expand), expansions=expansions, default=default),
+        )
+
+    return get_selection_with_expand
+
+
+def render_field_selection(content: Any, *, selection: FieldSelection) -> Any:
+    """
+    Serializes only the selected fields. Without `fields=` the content is
+    returned untouched and goes through the route's response_model as usual.
+    """
+    if selection.include is None:
+        return content
+
+    return JSONResponse(content=jsonable_encoder(content, include=selection.include))
@@ -3,7 +3,7 @@ from fastapi import HTTPException, Depends, status
 
 from app.models.user import UserInDB
 from app.models.cleaning import CleaningInDB
-from app.models.offer import OfferInDB
+from app.models.offer import CleaningOfferCursor, OfferExpansion, OfferInDB, OfferPublic
 
 from app.db.repositories.offers import OffersRepository
 
@@ -11,6 +11,15 @@ from app.api.dependencies.database import get_repository
 from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.users import get_user_by_username_from_path
 from app.api.dependencies.cleanings import get_cleaning_by_id_from_path, user_owns_cleaning
+from app.api.dependencies.fields import FieldSelection, get_field_selection
+from app.api.dependencies.pagination import Pagination, get_pagination
+
+
+get_offer_field_selection = get_field_selection(OfferPublic, expansions=OfferExpansion)
+get_offer_list_field_selection = get_field_selection(
+    OfferPublic, expansions=OfferExpansion, default_expand=[OfferExpansion.user]
+)
+get_offer_list_pagination = get_pagination(CleaningOfferCursor)
 
 
 async def get_offer_for_cleaning_from_user(
@@ -40,10 +49,15 @@ async def get_offer_for_cleaning_from_user_by_path(
 
 
 async def list_offers_for_cleaning_by_id_from_path(
+    selection: FieldSelection = Depends(get_offer_list_field_selection),
+    pagination: Pagination = Depends(get_offer_list_pagination),
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
     offers_repo: OffersRepository = Depends(get_repository(OffersRepository))
 ) -> List[OfferInDB]:
-    return await offers_repo.list_offers_for_cleaning(cleaning=cleaning)
+    # one more than the page, so render_page knows whether another follows
+    return await offers_repo.list_offers_for_cleaning(
+        cleaning=cleaning, expand=selection.expand, limit=pagination.limit + 1, after=pagination.after
+    )
 
 
 async def check_offer_create_permissions(
@@ -90,8 +104,6 @@ def check_offer_acceptance_permissions(
     current_user: UserInDB = Depends(get_current_active_user),
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
     offer: OfferInDB = Depends(get_offer_for_cleaning_from_user_by_path),
-    existing_offers: List[OfferInDB] = Depends(
-        list_offers_for_cleaning_by_id_from_path)
 ) -> None:
     if not user_owns_cleaning(user=current_user, cleaning=cleaning):
         raise HTTPException(
@@ -105,7 +117,8 @@ def check_offer_acceptance_permissions(
             detail="Can only accept offers that are currently pending",
         )
 
-    if "accepted" in [o.status for o in existing_offers]:
+    # the cleaning's counters answer this without going through its offers
+    if cleaning.offer_counts.accepted:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="That cleaning job already has an accepted offer."
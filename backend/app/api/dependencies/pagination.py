@@ -0,0 +1,87 @@
+import base64
+import binascii
+from typing import Any, Callable, List, NamedTuple, Optional, Type
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, ValidationError
+
+from app.api.dependencies.fields import FieldSelection, render_field_selection
+
+# the cursor for the page after this one, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Pagination(NamedTuple):
+    limit: int
+    # where the previous page left off, None for the first page
+    after: Optional[BaseModel]
+
+
+def encode_cursor(cursor: BaseModel) -> str:
+    return base64.urlsafe_b64encode(cursor.json().encode()).decode()
+
+
+def decode_cursor(cursor: str, *, model: Type[BaseModel]) -> BaseModel:
+    try:
+        return model.parse_raw(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, ValidationError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def get_pagination(cursor_model: Type[BaseModel], *, default_limit: int = 20, max_limit: int = 50) -> Callable:
+    """
+    Builds a dependency that reads the `limit=` and `cursor=` query
+    parameters of a keyset paginated list. Cursors are opaque to clients,
+    they only ever pass back the one from the previous page's header.
+    """
+    def get_page(
+        limit: int = Query(default_limit, ge=1, le=max_limit, description="How many items to return."),
+        cursor: Optional[str] = Query(
+            None,
+            description=f"The {NEXT_CURSOR_HEADER} header of the previous page. Omit for the first page."
+        ),
+    ) -> Pagination:
+        return Pagination(limit=limit, after=decode_cursor(cursor, model=cursor_model) if cursor else None)
+
+    return get_page
+
+
+def render_page(
+    items: List[Any],
+    *,
+    pagination: Pagination,
+    selection: FieldSelection,
+    response: Response,
+    cursor: Callable[[Any], BaseModel],
+    envelope: Optional[Callable[[List[Any]], BaseModel]] = None,
+    envelope_field: str = "items",
+) -> Any:
+    """
+    Expects up to `limit + 1` items, the extra one only telling whether
+    another page follows. The next cursor points at the last item kept.
+    An `envelope` wraps the page in a body of its own, the page under
+    `envelope_field`, which is what `fields=` then applies to.
+    """
+    page = items[:pagination.limit]
+    headers = {}
+
+    if len(items) > pagination.limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(cursor(page[-1]))
+
+    response.headers.update(headers)
+
+    body = page
+    if envelope is not None:
+        body = envelope(page)
+        if selection.include is not None:
+            include = {name: ... for name in body.__fields__}
+            include[envelope_field] = {"__all__": selection.include}
+            selection = selection._replace(include=include)
+
+    rendered = render_field_selection(body, selection=selection)
+
+    # sparse fieldsets come back as a response of their own
+    if isinstance(rendered, Response):
+        rendered.headers.update(headers)
+
+    return rendered
@@ -0,0 +1,81 @@
+import math
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.core.config import SECRET_KEY
+from app.services import auth_service
+from app.services.rate_limiting import RateLimiter
+
+WRITE_METHODS = frozenset(["POST", "PUT", "PATCH", "DELETE"])
+
+
+def get_rate_limiter(request: Request) -> RateLimiter:
+    return request.app.state.rate_limiter
+
+
+def get_client_ip(request: Request) -> str:
+    # behind a proxy uvicorn's proxy_headers already resolved X-Forwarded-For
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_rate_limit(rate_limiter: RateLimiter, *, rule_name: str, key: str) -> None:
+    result = await rate_limiter.hit(rule_name=rule_name, key=key)
+
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))},
+        )
+
+
+async def rate_limit_login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(OAuth2PasswordRequestForm),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> None:
+    """
+    Limits attempts per client and per account, so neither one address nor
+    a botnet spread over many addresses can keep guessing one password.
+    """
+    await enforce_rate_limit(rate_limiter, rule_name="login-ip", key=get_client_ip(request))
+    await enforce_rate_limit(
+        rate_limiter, rule_name="login-account", key=form_data.username.strip().lower()
+    )
+
+
+async def rate_limit_registration(
+    request: Request,
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> None:
+    await enforce_rate_limit(rate_limiter, rule_name="register-ip", key=get_client_ip(request))
+
+
+def get_rate_limit_identity(request: Request) -> str:
+    """
+    Keys writes on the authenticated user. The token is only decoded, which
+    the token cache makes cheap, the route itself still authenticates it.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+
+    if scheme.lower() == "bearer" and token:
+        try:
+            username = auth_service.get_username_from_token(token=token, secret_key=str(SECRET_KEY))
+        except HTTPException:
+            username = None
+
+        if username:
+            return f"user:{username}"
+
+    return f"ip:{get_client_ip(request)}"
+
+
+async def rate_limit_writes(
+    request: Request,
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+) -> None:
+    if request.method not in WRITE_METHODS:
+        return
+
+    await enforce_rate_limit(rate_limiter, rule_name="writes-user", key=get_rate_limit_identity(request))
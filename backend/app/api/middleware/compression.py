@@ -0,0 +1,270 @@
+import gzip
+import importlib.util
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+Compressor = Callable[[bytes], bytes]
+
+# compression level per encoding for each COMPRESSION_PROFILE
+COMPRESSION_LEVELS: Dict[str, Dict[str, int]] = {
+    "fast": {"gzip": 1, "br": 1, "zstd": 1},
+    "balanced": {"gzip": 6, "br": 4, "zstd": 3},
+    # br 11 and zstd 19 take tens of milliseconds, fine for static files, not per request
+    "best": {"gzip": 9, "br": 7, "zstd": 9},
+}
+
+
+def make_gzip_compressor(level: int) -> Compressor:
+    # a fixed mtime keeps the output, and so the cache, deterministic
+    return lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+
+
+# brotli and zstandard are imported the first time their encoding is negotiated, not at startup
+
+
+def make_brotli_compressor(level: int) -> Compressor:
+    def compress(body: bytes) -> bytes:
+        import brotli
+
+        return brotli.compress(body, quality=level)
+
+    return compress
+
+
+def make_zstd_compressor(level: int) -> Compressor:
+    compressor = None
+
+    def compress(body: bytes) -> bytes:
+        nonlocal compressor
+
+        if compressor is None:
+            import zstandard
+
+            compressor = zstandard.ZstdCompressor(level=level)
+
+        return compressor.compress(body)
+
+    return compress
+
+
+# encoding -> (module it needs, factory)
+COMPRESSOR_FACTORIES: Dict[str, Tuple[Optional[str], Callable[[int], Compressor]]] = {
+    "gzip": (None, make_gzip_compressor),
+    "br": ("brotli", make_brotli_compressor),
+    "zstd": ("zstandard", make_zstd_compressor),
+}
+
+
+def get_available_compressors(*, encodings: Iterable[str], profile: str) -> Dict[str, Compressor]:
+    """
+    Builds compressors for the configured encodings, in order of preference,
+    leaving out the ones whose optional package isn't installed.
+    """
+    levels = COMPRESSION_LEVELS.get(profile, COMPRESSION_LEVELS["balanced"])
+    compressors = {}
+
+    for encoding in encodings:
+        if encoding not in COMPRESSOR_FACTORIES:
+            continue
+
+        module, factory = COMPRESSOR_FACTORIES[encoding]
+        if module is None or importlib.util.find_spec(module):
+            compressors[encoding] = factory(levels[encoding])
+
+    return compressors
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+
+    for item in header.split(","):
+        encoding, _, params = item.strip().partition(";")
+        if not encoding:
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+
+        accepted[encoding.strip().lower()] = q
+
+    return accepted
+
+
+def select_encoding(accept_encoding: Optional[str], *, available: List[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+
+    # highest q wins, ties go to the server's order of preference
+    candidates = [
+        (accepted.get(encoding, wildcard), -position, encoding)
+        for position, encoding in enumerate(available)
+    ]
+    q, _, encoding = max(candidates, default=(0.0, 0, None))
+
+    return encoding if q > 0 else None
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies keyed by encoding and strong ETag. Responses
+    served from the feed snapshot or revalidated through ETags repeat the
+    same bytes, so they are only compressed once.
+    """
+
+    def __init__(self, *, max_size: int, max_body_size: int = 512 * 1024) -> None:
+        self.max_size = max_size
+        self.max_body_size = max_body_size
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: Tuple[str, str], body: bytes) -> None:
+        if self.max_size <= 0 or len(body) > self.max_body_size:
+            return
+
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        encodings: Iterable[str] = ("zstd", "br", "gzip"),
+        minimum_size: int = 1024,
+        profile: str = "balanced",
+        content_types: Iterable[str] = ("application/json",),
+        cache_size: int = 256,
+    ) -> None:
+        self.app = app
+        self.compressors = get_available_compressors(encodings=encodings, profile=profile)
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.cache = CompressedBodyCache(max_size=cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.compressors:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = select_encoding(request_headers.get("accept-encoding"), available=list(self.compressors))
+        start_message: Message = {}
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+
+                if message["status"] == 304:
+                    passthrough = True
+                    await send(with_held_etag(message, if_none_match=request_headers.get("if-none-match")))
+                elif (
+                    "content-encoding" in headers
+                    or message["status"] == 204
+                    or not content_type.startswith(self.content_types)
+                ):
+                    passthrough = True
+                    await send(message)
+                elif encoding is None:
+                    # shared caches must not hand this copy to a client that does accept an encoding
+                    passthrough = True
+                    await send(with_vary_accept_encoding(message))
+                else:
+                    start_message = with_vary_accept_encoding(message)
+                return
+
+            body = message.get("body", b"")
+
+            # streamed responses are sent as they are
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compress_body(start_message, body=body, encoding=encoding)
+            await send(with_content_encoding(start_message, encoding=encoding, body=compressed))
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def compress_body(self, message: Message, *, body: bytes, encoding: str) -> bytes:
+        etag = Headers(raw=message["headers"]).get("etag")
+        if etag is None or etag.startswith("W/"):
+            return self.compressors[encoding](body)
+
+        key = (encoding, etag)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self.compressors[encoding](body)
+            self.cache.set(key, compressed)
+
+        return compressed
+
+
+def with_vary_accept_encoding(message: Message) -> Message:
+    message = {**message, "headers": list(message["headers"])}
+    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+    return message
+
+
+def with_content_encoding(message: Message, *, encoding: str, body: bytes) -> Message:
+    message = {**message, "headers": list(message["headers"])}
+    headers = MutableHeaders(raw=message["headers"])
+
+    headers["content-encoding"] = encoding
+    headers["content-length"] = str(len(body))
+
+    # the bytes differ per encoding, so a strong validator becomes weak
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["etag"] = f"W/{etag}"
+
+    return message
+
+
+def with_held_etag(message: Message, *, if_none_match: Optional[str]) -> Message:
+    """
+    A 304 has no body to compress, so it carries the strong ETag. A client
+    revalidating a compressed copy gets back the weak one it holds.
+    """
+    message = with_vary_accept_encoding(message)
+    headers = MutableHeaders(raw=message["headers"])
+
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/") and if_none_match and f"W/{etag}" in if_none_match:
+        headers["etag"] = f"W/{etag}"
+
+    return message
@@ -0,0 +1,104 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.dependencies.conditional import (
+    CACHE_VALIDATORS_STATE_KEY,
+    CacheValidators,
+    etag_matches,
+    make_content_etag,
+)
+
+
+class ConditionalRequestsMiddleware:
+    """
+    Puts validators on successful GET responses and turns them into a 304
+    when the client's If-None-Match already matches.
+
+    Routes that computed validators from `updated_at` (and already answered
+    304s from a cheap query) leave them in the request state. Any other JSON
+    response gets a strong ETag hashed from its body, which saves the
+    transfer but not the work, e.g. for aggregates like evaluation stats.
+    """
+
+    def __init__(self, app: ASGIApp, *, max_body_size: int = 1024 * 1024) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message: Message = {}
+        body = b""
+        passthrough = False
+
+        async def send_with_validators(message: Message) -> None:
+            nonlocal start_message, body, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                validators = scope.get("state", {}).get(CACHE_VALIDATORS_STATE_KEY)
+
+                if message["status"] != 200 or "etag" in headers:
+                    passthrough = True
+                    await send(message)
+                elif validators is not None:
+                    passthrough = True
+                    await send(with_validators(message, validators=validators))
+                elif not headers.get("content-type", "").startswith("application/json"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            body += message.get("body", b"")
+
+            if len(body) > self.max_body_size:
+                # too large to buffer, send it as is
+                passthrough = True
+                await send(start_message)
+                await send({**message, "body": body})
+                return
+
+            if message.get("more_body", False):
+                return
+
+            validators = CacheValidators(etag=make_content_etag(body))
+
+            if if_none_match is not None and etag_matches(if_none_match, validators.etag):
+                await send(not_modified(start_message, validators=validators))
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(with_validators(start_message, validators=validators))
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_validators)
+
+
+def with_validators(message: Message, *, validators: CacheValidators) -> Message:
+    message = {**message, "headers": list(message["headers"])}
+    headers = MutableHeaders(raw=message["headers"])
+
+    for name, value in validators.headers.items():
+        headers[name] = value
+
+    return message
+
+
+def not_modified(message: Message, *, validators: CacheValidators) -> Message:
+    message = with_validators({**message, "status": 304}, validators=validators)
+    headers = MutableHeaders(raw=message["headers"])
+
+    for name in ("content-length", "content-type"):
+        if name in headers:
+            del headers[name]
+
+    return message
@@ -0,0 +1,169 @@
+import asyncio
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.deadlines import DeadlineExceeded, RequestDeadline, request_deadline
+
+# query_canceled, what asyncpg raises once a statement_timeout fires
+QUERY_CANCELED_SQLSTATE = "57014"
+
+
+class ClientDisconnectWatcher:
+    """
+    Sole reader of the server's `receive`: hands request messages on to the
+    app and finishes as soon as the client disconnects, even when the app
+    never reads again after the body.
+    """
+
+    def __init__(self, receive: Receive) -> None:
+        self._receive = receive
+        self._messages: "asyncio.Queue[Message]" = asyncio.Queue()
+        self.disconnected = False
+
+    async def watch(self) -> None:
+        while True:
+            message = await self._receive()
+            self._messages.put_nowait(message)
+
+            if message["type"] == "http.disconnect":
+                self.disconnected = True
+                return
+
+    async def receive(self) -> Message:
+        if self.disconnected and self._messages.empty():
+            return {"type": "http.disconnect"}
+
+        return await self._messages.get()
+
+
+def parse_timeout_header(value: Optional[str]) -> Optional[float]:
+    try:
+        timeout = float(value) if value else None
+    except ValueError:
+        return None
+
+    return timeout if timeout and timeout > 0 else None
+
+
+class RequestDeadlineMiddleware:
+    """
+    Gives every request a deadline, REQUEST_TIMEOUT_SECONDS or shorter when
+    the client asks for it with `timeout_header`, which routes may tighten
+    further and the database pools turn into statement timeouts.
+
+    The app runs in its own task, cancelled when the deadline passes (504)
+    or the client goes away. Cancelling a task blocked on asyncpg also
+    cancels its query on the server, so abandoned requests stop holding
+    connections.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, timeout: float = 30.0, timeout_header: str = "X-Request-Timeout"
+    ) -> None:
+        self.app = app
+        self.timeout = timeout
+        self.timeout_header = timeout_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = self.timeout
+        requested = parse_timeout_header(Headers(scope=scope).get(self.timeout_header))
+        if requested:
+            timeout = min(timeout, requested)
+
+        deadline = RequestDeadline(timeout)
+        watcher = ClientDisconnectWatcher(receive)
+        response_started = False
+        response_complete = False
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal response_started, response_complete
+
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # flagged first, the server may report the disconnect as soon as it's sent
+                response_complete = True
+
+            await send(message)
+
+        token = request_deadline.set(deadline)
+        try:
+            app_task = asyncio.ensure_future(self.app(scope, watcher.receive, send_tracked))
+        finally:
+            request_deadline.reset(token)
+
+        watch_task = asyncio.ensure_future(watcher.watch())
+        changed_task = asyncio.ensure_future(deadline.changed.wait())
+
+        try:
+            while True:
+                waiting = {app_task, changed_task} | ({watch_task} if not watch_task.done() else set())
+                done, _ = await asyncio.wait(
+                    waiting, timeout=max(deadline.remaining(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if app_task in done:
+                    break
+
+                # background tasks run after the response, nothing to cut short any more
+                if response_complete:
+                    await asyncio.wait({app_task})
+                    break
+
+                if changed_task in done:
+                    deadline.changed.clear()
+                    changed_task = asyncio.ensure_future(deadline.changed.wait())
+                    continue
+
+                if watch_task in done and watcher.disconnected:
+                    await cancel(app_task)
+                    return
+
+                if deadline.expired:
+                    await cancel(app_task)
+                    if not response_started:
+                        await self.timeout_response(scope, receive, send)
+                    return
+
+            try:
+                app_task.result()
+            except Exception as exc:
+                if response_started or not is_deadline_error(exc):
+                    raise
+                await self.timeout_response(scope, receive, send)
+        finally:
+            for task in (app_task, watch_task, changed_task):
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task is watch_task:
+                    # a failing receive only means nothing more can be watched
+                    task.exception()
+
+    async def timeout_response(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            {"detail": "The request took too long and was cancelled."}, status_code=504
+        )
+        await response(scope, receive, send)
+
+
+def is_deadline_error(exc: Exception) -> bool:
+    # matched on the SQLSTATE so asyncpg stays off the import path
+    return isinstance(exc, DeadlineExceeded) or getattr(exc, "sqlstate", None) == QUERY_CANCELED_SQLSTATE
+
+
+async def cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        # whatever the task was doing when cancelled is moot now
+        pass
@@ -0,0 +1,35 @@
+from typing import Dict
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class InFlightRequestTracker:
+    """
+    Counts HTTP requests currently being handled. uvicorn drains them on
+    shutdown, the count shows whether that drain finished in time.
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.completed = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": self.in_flight, "completed": self.completed}
+
+
+class InFlightRequestsMiddleware:
+    def __init__(self, app: ASGIApp, *, tracker: InFlightRequestTracker) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.tracker.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.in_flight -= 1
+            self.tracker.completed += 1
@@ -0,0 +1,168 @@
+import re
+import time
+from collections import Counter
+from enum import Enum
+from typing import Dict, FrozenSet, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import API_PREFIX
+
+
+class Priority(str, Enum):
+    # never shed, logging in and making offers must keep working under load
+    critical = "critical"
+    normal = "normal"
+    # shed first, these are the heaviest reads and can simply be retried
+    low = "low"
+
+
+WRITE_METHODS = frozenset(["POST", "PUT", "PATCH", "DELETE"])
+
+# (name, priority, methods, path) checked in order, anything else is normal
+REQUEST_CLASSES: Tuple[Tuple[str, Priority, FrozenSet[str], Pattern], ...] = (
+    ("auth", Priority.critical, frozenset(["POST"]),
+     re.compile(rf"^{API_PREFIX}/users/(login/token|token/refresh)/?$")),
+    ("offer-writes", Priority.critical, WRITE_METHODS,
+     re.compile(rf"^{API_PREFIX}/cleanings/[^/]+/offers(/.*)?$")),
+    ("feed", Priority.low, frozenset(["GET"]),
+     re.compile(rf"^{API_PREFIX}/feed(/.*)?$")),
+    ("evaluation-stats", Priority.low, frozenset(["GET"]),
+     re.compile(rf"^{API_PREFIX}/users/[^/]+/evaluations/stats/?$")),
+)
+
+
+def classify_request(*, method: str, path: str) -> Tuple[str, Priority]:
+    for name, priority, methods, pattern in REQUEST_CLASSES:
+        if method in methods and pattern.match(path):
+            return name, priority
+
+    return "other", Priority.normal
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit driven by how long queries wait for a pool
+    connection. While the smoothed wait is above target the limit is cut by
+    `backoff`, at most once per `backoff_interval`, and while it is healthy a
+    saturated limit grows by about one request per limit's worth of responses.
+    A 503 up front is cheaper than a request queueing for a connection until
+    its client gives up, and keeps the queue short for the requests let in.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 200,
+        target_pool_wait: float = 0.05,
+        low_priority_share: float = 0.5,
+        backoff: float = 0.9,
+        backoff_interval: float = 0.5,
+        smoothing: float = 0.2,
+        half_life: float = 1.0,
+    ) -> None:
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_pool_wait = target_pool_wait
+        self.low_priority_share = low_priority_share
+        self.backoff = backoff
+        self.backoff_interval = backoff_interval
+        self.smoothing = smoothing
+        self.half_life = half_life
+
+        self.in_flight = 0
+        self.in_flight_by_class: Counter = Counter()
+        self.shed_by_class: Counter = Counter()
+
+        self._pool_wait = 0.0
+        self._pool_wait_at = time.monotonic()
+        self._last_backoff = 0.0
+
+    @property
+    def pool_wait(self) -> float:
+        # decays while nothing queries the pool, e.g. when everything is being shed
+        elapsed = time.monotonic() - self._pool_wait_at
+        return self._pool_wait * 0.5 ** (elapsed / self.half_life)
+
+    @property
+    def overloaded(self) -> bool:
+        return self.pool_wait > self.target_pool_wait
+
+    def record_pool_wait(self, seconds: float) -> None:
+        current = self.pool_wait
+        now = time.monotonic()
+        self._pool_wait = current + self.smoothing * (seconds - current)
+        self._pool_wait_at = now
+
+        if self.overloaded and now - self._last_backoff >= self.backoff_interval:
+            self._last_backoff = now
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+
+    def try_acquire(self, *, name: str, priority: Priority) -> bool:
+        if priority == Priority.low:
+            admitted = not self.overloaded and self.in_flight < self.limit * self.low_priority_share
+        elif priority == Priority.normal:
+            admitted = self.in_flight < self.limit
+        else:
+            admitted = True
+
+        if not admitted:
+            self.shed_by_class[name] += 1
+            return False
+
+        self.in_flight += 1
+        self.in_flight_by_class[name] += 1
+        return True
+
+    def release(self, *, name: str) -> None:
+        saturated = self.in_flight >= self.limit - 1
+
+        self.in_flight -= 1
+        self.in_flight_by_class[name] -= 1
+
+        if saturated and not self.overloaded:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "pool_wait_ms": round(self.pool_wait * 1000, 2),
+            "in_flight_by_class": {k: v for k, v in self.in_flight_by_class.items() if v},
+            "shed_by_class": dict(self.shed_by_class),
+        }
+
+
+class LoadSheddingMiddleware:
+    def __init__(
+        self, app: ASGIApp, *, limiter: AdaptiveConcurrencyLimiter, enabled: bool = True
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        name, priority = classify_request(method=scope["method"], path=scope["path"])
+
+        if not self.limiter.try_acquire(name=name, priority=priority):
+            response = JSONResponse(
+                {"detail": "The server is busy, try again shortly."},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(name=name)
+
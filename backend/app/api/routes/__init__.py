@@ -1,19 +1,27 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from app.api.routes.cleanings import router as cleanings_router
 from app.api.routes.users import router as users_router
 from app.api.routes.profiles import router as profiles_router
 from app.api.routes.offers import router as offers_router
 from app.api.routes.evaluations import router as evaluations_router
 from app.api.routes.feed import router as feed_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.dependencies.rate_limiting import rate_limit_writes
 
 router = APIRouter()
 
+# only POST/PUT/PATCH/DELETE are counted, reads pass straight through
+write_limits = [Depends(rate_limit_writes)]
+
 router.include_router(
-    cleanings_router, prefix="/cleanings", tags=["cleanings"])
+    cleanings_router, prefix="/cleanings", tags=["cleanings"], dependencies=write_limits)
 router.include_router(users_router, prefix="/users", tags=["users"])
-router.include_router(profiles_router, prefix="/profiles", tags=["profiles"])
 router.include_router(
-    offers_router, prefix="/cleanings/{cleaning_id}/offers", tags=["offers"])
+    profiles_router, prefix="/profiles", tags=["profiles"], dependencies=write_limits)
+router.include_router(
+    offers_router, prefix="/cleanings/{cleaning_id}/offers", tags=["offers"], dependencies=write_limits)
 router.include_router(
-    evaluations_router, prefix="/users/{username}/evaluations", tags=["evaluations"])
+    evaluations_router, prefix="/users/{username}/evaluations", tags=["evaluations"],
+    dependencies=write_limits)
 router.include_router(feed_router, prefix="/feed", tags=["feed"])
+router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
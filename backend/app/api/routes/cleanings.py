@@ -1,36 +1,53 @@
-import re
 from typing import List
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
 
 from starlette.status import HTTP_201_CREATED, HTTP_404_NOT_FOUND
 from fastapi import APIRouter, Body, Depends, HTTPException, Path
 
-from app.models.cleaning import CleaningCreate, CleaningInDB, CleaningPublic, CleaningUpdate
+from app.models.cleaning import CleaningCreate, CleaningExpansion, CleaningInDB, CleaningPublic, CleaningUpdate
 from app.models.user import UserInDB
 from app.db.repositories.cleanings import CleaningsRepository
 
 from app.api.dependencies.database import get_repository
 from app.api.dependencies.auth import get_current_active_user
-from app.api.dependencies.cleanings import get_cleaning_by_id_from_path, check_cleaning_modification_permissions
+from app.api.dependencies.cleanings import (
+    get_cleaning_by_id_from_path,
+    check_cleaning_modification_permissions,
+    get_cleaning_field_selection,
+    get_cleaning_list_field_selection,
+)
+from app.api.dependencies.fields import FieldSelection, render_field_selection
+from app.api.dependencies.conditional import check_cleaning_conditional_request
+from app.api.dependencies.feed import get_cleaning_feed_snapshot
+from app.services.feed_snapshot import CleaningFeedSnapshot
 
 
 router = APIRouter()
 
 
-@router.get("/{cleaning_id}/", response_model=CleaningPublic, name="cleanings:get-cleaning-by-id")
+@router.get(
+    "/{cleaning_id}/",
+    response_model=CleaningPublic,
+    name="cleanings:get-cleaning-by-id",
+    dependencies=[Depends(check_cleaning_conditional_request)],
+)
 async def get_cleaning_by_id(
     cleaning_id: str = Path(...),
     current_user: UserInDB = Depends(get_current_active_user),
+    selection: FieldSelection = Depends(get_cleaning_field_selection),
     cleanings_repo: CleaningsRepository = Depends(
         get_repository(CleaningsRepository))
 ) -> CleaningPublic:
-    cleaning = await cleanings_repo.get_cleaning_by_id(id=cleaning_id, requesting_user=current_user)
+    cleaning = await cleanings_repo.get_cleaning_by_id(
+        id=cleaning_id,
+        requesting_user=current_user,
+        populate=CleaningExpansion.owner in selection.expand,
+        include_archived=True,
+    )
 
     if not cleaning:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND,
                             detail="No cleaning found with that id.")
-    return cleaning
+    return render_field_selection(cleaning, selection=selection)
 
 
 @router.post("/", response_model=CleaningPublic, name="cleanings:create-cleaning", status_code=HTTP_201_CREATED)
@@ -39,23 +56,28 @@ async def create_new_cleaning(
     current_user: UserInDB = Depends(get_current_active_user),
     cleanings_repo: CleaningsRepository = Depends(
         get_repository(CleaningsRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> CleaningPublic:
     created_cleaning = await cleanings_repo.create_cleaning(
         new_cleaning=new_cleaning,
         requesting_user=current_user
     )
+    feed_snapshot.mark_stale()
     return created_cleaning
 
 
 @router.get("/", response_model=List[CleaningPublic], name="cleanings:list-all-user-cleanings")
 async def get_all_cleanings(
     current_user: UserInDB = Depends(get_current_active_user),
+    selection: FieldSelection = Depends(get_cleaning_list_field_selection),
     cleanings_repo: CleaningsRepository = Depends(
         get_repository(CleaningsRepository))
 ) -> List[CleaningPublic]:
-    return await cleanings_repo.list_all_user_cleanings(
-        requesting_user=current_user
+    cleanings = await cleanings_repo.list_all_user_cleanings(
+        requesting_user=current_user,
+        populate=CleaningExpansion.owner in selection.expand
     )
+    return render_field_selection(cleanings, selection=selection)
 
 
 @router.put(
@@ -69,10 +91,12 @@ async def update_cleaning_by_id(
     cleaning_update: CleaningUpdate = Body(..., embed=False),
     cleanings_repo: CleaningsRepository = Depends(
         get_repository(CleaningsRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> CleaningPublic:
     updated_cleaning = await cleanings_repo.update_cleaning(
         cleaning=cleaning, cleaning_update=cleaning_update
     )
+    feed_snapshot.mark_stale()
 
     if not updated_cleaning:
         raise HTTPException(
@@ -93,5 +117,8 @@ async def delete_cleaning_by_id(
     current_user: UserInDB = Depends(get_current_active_user),
     cleanings_repo: CleaningsRepository = Depends(
         get_repository(CleaningsRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> str:
-    return await cleanings_repo.delete_cleaning_by_id(id=cleaning_id, requesting_user=current_user)
+    deleted_id = await cleanings_repo.delete_cleaning_by_id(id=cleaning_id, requesting_user=current_user)
+    feed_snapshot.mark_stale()
+    return deleted_id
@@ -1,18 +1,41 @@
-from re import M
-from typing import List
-from fastapi import APIRouter, Path, Body, status, HTTPException
+from typing import List, Optional, Tuple, Union
+from fastapi import APIRouter, Path, Body, Query, Response, status, HTTPException
 from fastapi.param_functions import Depends
 
-from app.models.evaluation import EvaluationAggregate, EvaluationCreate, EvaluationUpdate, EvaluationInDB, EvaluationPublic
+from app.models.evaluation import (
+    EvaluationAggregate,
+    EvaluationCreate,
+    EvaluationCursor,
+    EvaluationInDB,
+    EvaluationListWithStats,
+    EvaluationPublic,
+    EvaluationSort,
+    EvaluationUpdate,
+)
 from app.models.cleaning import CleaningInDB
 from app.models.user import UserInDB
 
+from app.core.config import ANALYTICAL_REQUEST_TIMEOUT_SECONDS, EVALUATION_STATS_MAX_WINDOW_DAYS
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.deadlines import limit_request_time
 from app.api.dependencies.cleanings import get_cleaning_by_id_from_path
 from app.api.dependencies.users import get_user_by_username_from_path
 
+from app.api.dependencies.feed import get_cleaning_feed_snapshot
+from app.services.feed_snapshot import CleaningFeedSnapshot
+
+from app.db.pools import ANALYTICAL_POOL
 from app.db.repositories.evaluations import EvaluationsRepository
-from app.api.dependencies.evaluations import check_evaluation_create_permissions, get_cleaner_evaluation_for_cleaning_from_path, list_evaluations_for_cleaner_from_path
+from app.api.dependencies.evaluations import (
+    check_evaluation_create_permissions,
+    get_cleaner_evaluation_for_cleaning_from_path,
+    get_evaluation_list_field_selection,
+    get_evaluation_list_pagination,
+    get_evaluation_sort,
+    list_evaluations_for_cleaner_from_path,
+)
+from app.api.dependencies.fields import FieldSelection
+from app.api.dependencies.pagination import Pagination, render_page
 
 
 router = APIRouter()
@@ -30,24 +53,47 @@ async def create_evaluation_for_cleaner(
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
     cleaner: UserInDB = Depends(get_user_by_username_from_path),
     eval_repo: EvaluationsRepository = Depends(
-        get_repository(EvaluationsRepository))
+        get_repository(EvaluationsRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> EvaluationPublic:
-    return await eval_repo.create_evaluation_for_cleaner(
+    evaluation = await eval_repo.create_evaluation_for_cleaner(
         evaluation_create=evaluation_create, cleaner=cleaner, cleaning=cleaning
     )
+    # the evaluated offer is completed, which moves the counts feed items carry
+    feed_snapshot.mark_stale()
+    return evaluation
 
 
 @router.get(
     "/",
-    response_model=List[EvaluationPublic],
+    response_model=Union[List[EvaluationPublic], EvaluationListWithStats],
     name="evaluations:list-evaluations-for-cleaner",
     status_code=status.HTTP_200_OK,
 )
 async def list_evaluation_for_cleaning(
-    evaluations: List[EvaluationInDB] = Depends(
-        list_evaluations_for_cleaner_from_path)
-) -> List[EvaluationPublic]:
-    return evaluations
+    response: Response,
+    evaluations_and_stats: Tuple[List[EvaluationPublic], Optional[EvaluationAggregate]] = Depends(
+        list_evaluations_for_cleaner_from_path),
+    sort: EvaluationSort = Depends(get_evaluation_sort),
+    pagination: Pagination = Depends(get_evaluation_list_pagination),
+    selection: FieldSelection = Depends(get_evaluation_list_field_selection),
+) -> Union[List[EvaluationPublic], EvaluationListWithStats]:
+    evaluations, stats = evaluations_and_stats
+
+    return render_page(
+        evaluations,
+        pagination=pagination,
+        selection=selection,
+        response=response,
+        cursor=lambda evaluation: EvaluationCursor(
+            sort=sort,
+            overall_rating=evaluation.overall_rating,
+            created_at=evaluation.created_at,
+            cleaning_id=evaluation.cleaning_id,
+        ),
+        envelope=(lambda page: EvaluationListWithStats(evaluations=page, stats=stats)) if stats is not None else None,
+        envelope_field="evaluations",
+    )
 
 # Important note! The order in which we define these routes ABSOLUTELY DOES
 # MATTER. If we were to put the /stats/ route after our
@@ -60,14 +106,21 @@ async def list_evaluation_for_cleaning(
     "/stats",
     response_model=EvaluationAggregate,
     name="evaluations:get-stats-for-cleaner",
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_request_time(ANALYTICAL_REQUEST_TIMEOUT_SECONDS))],
 )
 async def get_evaluation_from_user(
+    days: Optional[int] = Query(
+        None,
+        ge=1,
+        le=EVALUATION_STATS_MAX_WINDOW_DAYS,
+        description="Only evaluations from the last this many days, today included. Omit for all of them."
+    ),
     cleaner: UserInDB = Depends(get_user_by_username_from_path),
     evals_repo: EvaluationsRepository = Depends(
-        get_repository(EvaluationsRepository))
+        get_repository(EvaluationsRepository, pool=ANALYTICAL_POOL))
 ) -> EvaluationPublic:
-    return await evals_repo.get_cleaner_aggregates(cleaner=cleaner)
+    return await evals_repo.get_cleaner_aggregates(cleaner=cleaner, days=days)
 
 
 @router.get(
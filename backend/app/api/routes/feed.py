@@ -1,20 +1,33 @@
-from typing import List
+from typing import List, Optional
 import datetime
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from app.core.config import ANALYTICAL_REQUEST_TIMEOUT_SECONDS
+from app.models.cleaning import CleaningExpansion
 from app.models.feed import CleaningFeedItem
 from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.deadlines import limit_request_time
+from app.api.dependencies.feed import get_cleaning_feed_snapshot
+from app.api.dependencies.fields import FieldSelection, get_field_selection, render_field_selection
 from app.db.repositories.feed import FeedRepository
+from app.services.feed_snapshot import CleaningFeedSnapshot, get_default_feed_starting_date
 
 
 router = APIRouter()
 
+get_feed_field_selection = get_field_selection(
+    CleaningFeedItem, expansions=CleaningExpansion, default_expand=[CleaningExpansion.owner]
+)
+
 
 @router.get(
     "/cleanings/",
     response_model=List[CleaningFeedItem],
     name="feed:get-cleaning-feed-for-user",
-    dependencies=[Depends(get_current_active_user)]
+    dependencies=[
+        Depends(get_current_active_user),
+        Depends(limit_request_time(ANALYTICAL_REQUEST_TIMEOUT_SECONDS)),
+    ]
 )
 async def get_cleaning_feed_for_user(
     page_chunk_size: int = Query(
@@ -23,12 +36,38 @@ async def get_cleaning_feed_for_user(
         le=50,
         description="Used to determine how many cleaning feed item objects to return in the response."
     ),
-    starting_date: datetime.datetime = Query(
-        datetime.datetime.now() + datetime.timedelta(minutes=10),
-        description="Used to determine the timestamp at which to begin querying for cleaning feed items."
+    starting_date: Optional[datetime.datetime] = Query(
+        None,
+        description="Used to determine the timestamp at which to begin querying for cleaning feed items. "
+                    "Defaults to the newest items."
     ),
-    feed_repository: FeedRepository = Depends(get_repository(FeedRepository))
+    selection: FieldSelection = Depends(get_feed_field_selection),
+    feed_repository: FeedRepository = Depends(get_repository(FeedRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> List[CleaningFeedItem]:
-    return await feed_repository.fetch_cleaning_jobs_feed(
-        starting_date=starting_date, page_chunk_size=page_chunk_size,
+    # naive datetimes are read as local time, the same way the database driver does
+    starting_date = (starting_date or get_default_feed_starting_date()).astimezone(datetime.timezone.utc)
+    populate = CleaningExpansion.owner in selection.expand
+
+    if feed_snapshot.enabled:
+        await feed_snapshot.refresh_if_needed(feed_repo=feed_repository)
+        window = feed_snapshot.find_page(starting_date=starting_date, page_chunk_size=page_chunk_size)
+
+        if window and populate and selection.include is None:
+            start, end = window
+            return Response(
+                content=feed_snapshot.get_serialized_page(start=start, end=end),
+                media_type="application/json",
+            )
+
+        if window:
+            start, end = window
+            cleaning_feed = feed_snapshot.get_page(start=start, end=end, populate=populate)
+            return render_field_selection(cleaning_feed, selection=selection)
+
+    cleaning_feed = await feed_repository.fetch_cleaning_jobs_feed(
+        starting_date=starting_date,
+        page_chunk_size=page_chunk_size,
+        populate=populate,
     )
+    return render_field_selection(cleaning_feed, selection=selection)
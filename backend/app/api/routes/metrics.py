@@ -0,0 +1,27 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, Request
+
+from app.api.dependencies.auth import get_current_superuser
+
+router = APIRouter()
+
+
+@router.get("/", name="metrics:get-runtime-metrics", dependencies=[Depends(get_current_superuser)])
+async def get_runtime_metrics(request: Request) -> Dict[str, Any]:
+    """
+    Per worker: checkout waits and occupancy of each connection pool, the
+    state of the adaptive concurrency limit, the requests in flight and how
+    often the feed snapshot answered a page. Superusers only, the numbers
+    tell anyone else when the API is easiest to overload.
+    """
+    pools = getattr(request.app.state, "_db_pools", None)
+    limiter = getattr(request.app.state, "concurrency_limiter", None)
+    in_flight = getattr(request.app.state, "in_flight_requests", None)
+    feed_snapshot = getattr(request.app.state, "cleaning_feed_snapshot", None)
+
+    return {
+        "pools": pools.stats() if pools else {},
+        "load_shedding": limiter.stats() if limiter else {},
+        "requests": in_flight.stats() if in_flight else {},
+        "feed_snapshot": feed_snapshot.stats() if feed_snapshot else {},
+    }
@@ -1,14 +1,16 @@
 from typing import List
-from fastapi import APIRouter, Path, Body, status, HTTPException
+from fastapi import APIRouter, Path, Body, Response, status, HTTPException
 from fastapi.param_functions import Depends
 
-from app.models.offer import OfferCreate, OfferUpdate, OfferInDB, OfferPublic
+from app.models.offer import CleaningOfferCursor, OfferCreate, OfferUpdate, OfferInDB, OfferPublic
 from app.models.cleaning import CleaningInDB
 from app.models.user import UserInDB
 
 from app.api.dependencies.cleanings import get_cleaning_by_id_from_path
 from app.api.dependencies.auth import get_current_active_user
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.fields import FieldSelection, render_field_selection
+from app.api.dependencies.pagination import Pagination, render_page
 from app.api.dependencies.offers import (
     check_offer_acceptance_permissions,
     check_offer_cancel_permissions,
@@ -18,10 +20,15 @@ from app.api.dependencies.offers import (
     get_offer_for_cleaning_from_current_user,
     get_offer_for_cleaning_from_user_by_path,
     list_offers_for_cleaning_by_id_from_path,
-    check_offer_rescind_permissions
+    check_offer_rescind_permissions,
+    get_offer_field_selection,
+    get_offer_list_field_selection,
+    get_offer_list_pagination,
 )
 
+from app.api.dependencies.feed import get_cleaning_feed_snapshot
 from app.db.repositories.offers import OffersRepository
+from app.services.feed_snapshot import CleaningFeedSnapshot
 
 
 router = APIRouter()
@@ -37,11 +44,15 @@ router = APIRouter()
 async def create_offer(
     cleaning: CleaningInDB = Depends(get_cleaning_by_id_from_path),
     current_user: UserInDB = Depends(get_current_active_user),
-    offers_repo: OffersRepository = Depends(get_repository(OffersRepository))
+    offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> OfferPublic:
-    return await offers_repo.create_offer_for_cleaning(
+    created_offer = await offers_repo.create_offer_for_cleaning(
         new_offer=OfferCreate(cleaning_id=cleaning.id, user_id=current_user.id)
     )
+    # feed items carry the cleaning's offer counts
+    feed_snapshot.mark_stale()
+    return created_offer
 
 
 @router.get(
@@ -52,9 +63,20 @@ async def create_offer(
     dependencies=[Depends(check_offer_list_permissions)]
 )
 async def list_offer_for_cleaning(
-    offers: List[OfferInDB] = Depends(list_offers_for_cleaning_by_id_from_path)
+    response: Response,
+    offers: List[OfferInDB] = Depends(list_offers_for_cleaning_by_id_from_path),
+    pagination: Pagination = Depends(get_offer_list_pagination),
+    selection: FieldSelection = Depends(get_offer_list_field_selection),
 ) -> List[OfferPublic]:
-    return offers
+    return render_page(
+        offers,
+        pagination=pagination,
+        selection=selection,
+        response=response,
+        cursor=lambda offer: CleaningOfferCursor(
+            status=offer.status, created_at=offer.created_at, user_id=offer.user_id
+        ),
+    )
 
 
 @router.get(
@@ -65,9 +87,14 @@ async def list_offer_for_cleaning(
     dependencies=[Depends(check_offer_get_permissions)]
 )
 async def get_offer_from_user(
-    offer: OfferInDB = Depends(get_offer_for_cleaning_from_user_by_path)
+    offer: OfferInDB = Depends(get_offer_for_cleaning_from_user_by_path),
+    selection: FieldSelection = Depends(get_offer_field_selection),
+    offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
 ) -> OfferPublic:
-    return offer
+    if selection.expand:
+        [offer] = await offers_repo.populate_offers(offers=[offer], expand=selection.expand)
+
+    return render_field_selection(offer, selection=selection)
 
 
 @router.put(
@@ -79,11 +106,14 @@ async def get_offer_from_user(
 )
 async def accept_offer_from_user(
     offer: OfferInDB = Depends(get_offer_for_cleaning_from_user_by_path),
-    offers_repo: OffersRepository = Depends(get_repository(OffersRepository))
+    offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> OfferPublic:
-    return await offers_repo.accept_offer(
+    accepted_offer = await offers_repo.accept_offer(
         offer=offer
     )
+    feed_snapshot.mark_stale()
+    return accepted_offer
 
 
 @router.put(
@@ -95,11 +125,14 @@ async def accept_offer_from_user(
 )
 async def cancel_offer_from_user(
     offer: OfferInDB = Depends(get_offer_for_cleaning_from_current_user),
-    offers_repo: OffersRepository = Depends(get_repository(OffersRepository))
+    offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> OfferPublic:
-    return await offers_repo.cancel_offer(
+    cancelled_offer = await offers_repo.cancel_offer(
         offer=offer,
     )
+    feed_snapshot.mark_stale()
+    return cancelled_offer
 
 
 @router.delete(
@@ -110,6 +143,9 @@ async def cancel_offer_from_user(
 )
 async def rescind_offer_from_user(
     offer: OfferInDB = Depends(get_offer_for_cleaning_from_current_user),
-    offers_repo: OffersRepository = Depends(get_repository(OffersRepository))
+    offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
+    feed_snapshot: CleaningFeedSnapshot = Depends(get_cleaning_feed_snapshot),
 ) -> OfferPublic:
-    return await offers_repo.rescind_offer(offer=offer)
+    rescinded_offer = await offers_repo.rescind_offer(offer=offer)
+    feed_snapshot.mark_stale()
+    return rescinded_offer
@@ -8,16 +8,26 @@ from app.models.user import UserInDB
 from app.api.dependencies.auth import get_current_active_user
 from app.db.repositories.profiles import ProfilesRepository
 from app.api.dependencies.database import get_repository
+from app.api.dependencies.fields import FieldSelection, get_field_selection, render_field_selection
+from app.api.dependencies.conditional import check_profile_conditional_request
 
 
 router = APIRouter()
 
+get_profile_field_selection = get_field_selection(ProfilePublic)
 
-@router.get("/{username}", response_model=ProfilePublic, name="profiles:get-profile-by-username")
+
+@router.get(
+    "/{username}",
+    response_model=ProfilePublic,
+    name="profiles:get-profile-by-username",
+    dependencies=[Depends(check_profile_conditional_request)],
+)
 async def get_profile_by_username(
     *,
     username: str = Path(..., min_length=3, regex="^[a-zA-Z0-9_-]+$"),
     current_user: UserInDB = Depends(get_current_active_user),
+    selection: FieldSelection = Depends(get_profile_field_selection),
     profiles_repo: ProfilesRepository = Depends(
         get_repository(ProfilesRepository)),
 ) -> ProfilePublic:
@@ -29,7 +39,7 @@ async def get_profile_by_username(
             detail=f"No profile found with  username '{username}'."
         )
 
-    return profile
+    return render_field_selection(profile, selection=selection)
 
 
 @router.put("/me/", response_model=ProfilePublic, name="profiles:update-own-profile")
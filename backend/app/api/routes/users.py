@@ -1,37 +1,68 @@
-from fastapi import Depends, APIRouter, HTTPException, Path, Body
+from typing import List, Optional
+
+from fastapi import Depends, APIRouter, HTTPException, Path, Body, Query, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from starlette.status import HTTP_201_CREATED, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND
 
 from app.api.dependencies.database import get_repository
 from app.models.user import UserCreate, UserInDB, UserPublic
+from app.models.offer import OfferCursor, OfferExpansion, OfferPublic, OfferStatus
 
+from app.db.pools import AUTH_POOL
 from app.db.repositories.users import UsersRepository
-from app.models.token import AccessToken
+from app.db.repositories.offers import OffersRepository
+from app.db.repositories.refresh_tokens import RefreshTokensRepository
+from app.models.token import AccessToken, RefreshTokenRequest
 from app.services import auth_service
 from app.api.dependencies.auth import get_current_active_user
+from app.api.dependencies.fields import FieldSelection, get_field_selection
+from app.api.dependencies.pagination import Pagination, get_pagination, render_page
+from app.api.dependencies.rate_limiting import rate_limit_login, rate_limit_registration
 
 router = APIRouter()
 
+get_own_offers_field_selection = get_field_selection(
+    OfferPublic, expansions=OfferExpansion, default_expand=[OfferExpansion.cleaning]
+)
+get_own_offers_pagination = get_pagination(OfferCursor)
+
 
-@router.post("/", response_model=UserPublic, name="users:register-new-user", status_code=HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=UserPublic,
+    name="users:register-new-user",
+    status_code=HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit_registration)],
+)
 async def register_new_user(
     new_user: UserCreate = Body(..., embed=False),
     user_repo: UsersRepository = Depends(get_repository(UsersRepository)),
+    refresh_tokens_repo: RefreshTokensRepository = Depends(
+        get_repository(RefreshTokensRepository)),
 ) -> UserPublic:
     created_user = await user_repo.register_new_user(new_user=new_user)
+    refresh_token = await refresh_tokens_repo.create_refresh_token_for_user(user=created_user)
 
     access_token = AccessToken(
         access_token=auth_service.create_access_token_for_user(
             user=created_user),
-        token_type="bearer"
+        token_type="bearer",
+        refresh_token=refresh_token.refresh_token
     )
 
     return created_user.copy(update={"access_token": access_token})
 
 
-@router.post("/login/token", response_model=AccessToken, name="users:login-email-and-password")
+@router.post(
+    "/login/token",
+    response_model=AccessToken,
+    name="users:login-email-and-password",
+    dependencies=[Depends(rate_limit_login)],
+)
 async def user_login_with_email_and_password(
-    user_repo: UsersRepository = Depends(get_repository(UsersRepository)),
+    user_repo: UsersRepository = Depends(get_repository(UsersRepository, pool=AUTH_POOL)),
+    refresh_tokens_repo: RefreshTokensRepository = Depends(
+        get_repository(RefreshTokensRepository, pool=AUTH_POOL)),
     form_data: OAuth2PasswordRequestForm = Depends(OAuth2PasswordRequestForm),
 ) -> AccessToken:
     user = await user_repo.authenticate_user(email=form_data.username, password=form_data.password)
@@ -43,15 +74,83 @@ async def user_login_with_email_and_password(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    refresh_token = await refresh_tokens_repo.create_refresh_token_for_user(user=user)
+
     access_token = AccessToken(
         access_token=auth_service.create_access_token_for_user(
             user=user),
-        token_type="bearer"
+        token_type="bearer",
+        refresh_token=refresh_token.refresh_token
     )
 
     return access_token
 
 
+@router.post("/token/refresh", response_model=AccessToken, name="users:refresh-access-token")
+async def refresh_access_token(
+    refresh_request: RefreshTokenRequest = Body(..., embed=False),
+    user_repo: UsersRepository = Depends(get_repository(UsersRepository, pool=AUTH_POOL)),
+    refresh_tokens_repo: RefreshTokensRepository = Depends(
+        get_repository(RefreshTokensRepository, pool=AUTH_POOL)),
+) -> AccessToken:
+    refresh_error = HTTPException(
+        status_code=HTTP_401_UNAUTHORIZED,
+        detail="Could not refresh access token.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    existing_token = await refresh_tokens_repo.get_refresh_token(
+        refresh_token=refresh_request.refresh_token)
+
+    user = None
+    if existing_token:
+        user = await user_repo.get_user_by_id(user_id=existing_token.user_id, populate=False)
+
+    # a deactivated user's token is left as it is, not rotated
+    if not user or not user.is_active:
+        raise refresh_error
+
+    refresh_token = await refresh_tokens_repo.rotate_refresh_token(
+        refresh_token=refresh_request.refresh_token)
+
+    if not refresh_token:
+        raise refresh_error
+
+    return AccessToken(
+        access_token=auth_service.create_access_token_for_user(user=user),
+        token_type="bearer",
+        refresh_token=refresh_token.refresh_token
+    )
+
+
 @router.get("/me/", response_model=UserPublic, name="users:get-current-user")
 async def get_currently_authenticated_user(current_user: UserInDB = Depends(get_current_active_user)) -> UserPublic:
     return current_user
+
+
+@router.get("/me/offers/", response_model=List[OfferPublic], name="users:list-own-offers")
+async def list_own_offers(
+    response: Response,
+    statuses: Optional[List[OfferStatus]] = Query(
+        None, alias="status", description="Only offers in these statuses, e.g. `status=pending&status=accepted`."
+    ),
+    pagination: Pagination = Depends(get_own_offers_pagination),
+    selection: FieldSelection = Depends(get_own_offers_field_selection),
+    current_user: UserInDB = Depends(get_current_active_user),
+    offers_repo: OffersRepository = Depends(get_repository(OffersRepository)),
+) -> List[OfferPublic]:
+    offers = await offers_repo.list_offers_for_user(
+        user=current_user,
+        statuses=statuses,
+        limit=pagination.limit + 1,
+        after=pagination.after,
+        expand=selection.expand,
+    )
+
+    return render_page(
+        offers,
+        pagination=pagination,
+        selection=selection,
+        response=response,
+        cursor=lambda offer: OfferCursor(created_at=offer.created_at, cleaning_id=offer.cleaning_id),
+    )
@@ -3,17 +3,69 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.core import config, tasks
 from app.api.routes import router as api_router
+from app.api.middleware.in_flight import InFlightRequestTracker, InFlightRequestsMiddleware
+from app.api.middleware.conditional import ConditionalRequestsMiddleware
+from app.api.middleware.compression import CompressionMiddleware
+from app.api.middleware.deadlines import RequestDeadlineMiddleware
+from app.api.middleware.load_shedding import AdaptiveConcurrencyLimiter, LoadSheddingMiddleware
+from app.api.dependencies.conditional import NotModified, not_modified_exception_handler
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.services.feed_snapshot import CleaningFeedSnapshot
+from app.services.rate_limiting import RateLimiter
 
 
 def get_application():
     app = FastAPI(title=config.PROJECT_NAME, version=config.VERSION)
 
+    app.add_middleware(ConditionalRequestsMiddleware)
+    app.add_exception_handler(NotModified, not_modified_exception_handler)
+
+    # wraps ConditionalRequestsMiddleware so ETags are known before compressing
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=config.COMPRESSION_ENCODINGS,
+        minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+        profile=config.COMPRESSION_PROFILE,
+        content_types=config.COMPRESSION_CONTENT_TYPES,
+        cache_size=config.COMPRESSION_CACHE_SIZE,
+    )
+
+    app.state.cleaning_feed_snapshot = CleaningFeedSnapshot()
+    # in memory per worker until startup switches to the shared postgres backend
+    app.state.rate_limiter = RateLimiter()
+
+    # inside load shedding, so shed requests never get a deadline or task of their own
+    app.add_middleware(
+        RequestDeadlineMiddleware,
+        timeout=config.REQUEST_TIMEOUT_SECONDS,
+        timeout_header=config.REQUEST_TIMEOUT_HEADER,
+    )
+
+    # sheds before any pool connection, compression or serialization is spent
+    app.state.concurrency_limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=config.LOAD_SHEDDING_INITIAL_LIMIT,
+        min_limit=config.LOAD_SHEDDING_MIN_LIMIT,
+        max_limit=config.LOAD_SHEDDING_MAX_LIMIT,
+        target_pool_wait=config.LOAD_SHEDDING_TARGET_POOL_WAIT_MS / 1000,
+        low_priority_share=config.LOAD_SHEDDING_LOW_PRIORITY_SHARE,
+    )
+    app.add_middleware(LoadSheddingMiddleware, limiter=app.state.concurrency_limiter,
+                       enabled=config.LOAD_SHEDDING_ENABLED)
+
+    # outside load shedding so shed requests are counted too
+    app.state.in_flight_requests = InFlightRequestTracker()
+    app.add_middleware(InFlightRequestsMiddleware,
+                       tracker=app.state.in_flight_requests)
+
+    # added last so it is outermost, shed 503s and every other early answer get CORS headers
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
-        allow_headers=["*"]
+        allow_headers=["*"],
+        # browsers hide response headers from scripts unless they're listed
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     app.add_event_handler("startup", tasks.create_start_app_handler(app))
@@ -0,0 +1,43 @@
+"""
+Rebuilds the cleaner_daily_ratings rollup from the evaluations themselves.
+
+    python -m app.backfill_ratings [YYYY-MM-DD]
+
+Rebuilds every day since the given one, or since the first evaluation. The
+migration fills the rollup once and triggers keep it current, so this is for
+evaluations written around the triggers, e.g. restored from a dump or bulk
+loaded with them disabled, and for days of partitions that were detached.
+"""
+import sys
+import asyncio
+import datetime
+import logging
+from typing import Optional
+
+from databases import Database
+
+from app.core.config import DATABASE_URL
+from app.services.cleaner_ratings import backfill_cleaner_daily_ratings
+
+logger = logging.getLogger(__name__)
+
+
+async def run_backfill(since: Optional[datetime.date] = None) -> None:
+    database = Database(str(DATABASE_URL), min_size=1, max_size=1)
+    await database.connect()
+
+    try:
+        written = await backfill_cleaner_daily_ratings(database, since=since)
+        logger.info(f"Backfill done, {written} cleaner_daily_ratings rows written")
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    since = datetime.date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    asyncio.run(run_backfill(since))
+
+
+if __name__ == "__main__":
+    main()
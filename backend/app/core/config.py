@@ -1,6 +1,6 @@
 from databases import DatabaseURL
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 
 config = Config(".env")
@@ -15,9 +15,21 @@ ACCESS_TOKEN_EXPIRE_MINUTES = config(
     cast=int,
     default=7*24*60  # one week
 )
+REFRESH_TOKEN_EXPIRE_MINUTES = config(
+    "REFRESH_TOKEN_EXPIRE_MINUTES",
+    cast=int,
+    default=30*24*60  # one month
+)
 JWT_ALGORITHM = config("JWT_ALGORITHM", cast=str, default="HS256")
 JWT_AUDIENCE = config("JWT_AUDIENCE", cast=str, default="phresh:auth")
 JWT_TOKEN_PREFIX = config("JWT_TOKEN_PREFIX", cast=str, default="Bearer")
+JWT_CACHE_MAX_SIZE = config("JWT_CACHE_MAX_SIZE", cast=int, default=10000)
+
+SERVER_HOST = config("SERVER_HOST", cast=str, default="0.0.0.0")
+SERVER_PORT = config("SERVER_PORT", cast=int, default=5500)
+SERVER_WORKERS = config("SERVER_WORKERS", cast=int, default=0)  # 0 picks one per available core
+SERVER_GRACEFUL_TIMEOUT_SECONDS = config(
+    "SERVER_GRACEFUL_TIMEOUT_SECONDS", cast=int, default=30)
 
 POSTGRES_USER = config("POSTGRES_USER", cast=str)
 POSTGRES_PASSWORD = config("POSTGRES_PASSWORD", cast=Secret)
@@ -31,3 +43,114 @@ DATABASE_URL = config(
     cast=DatabaseURL,
     default=f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
+
+# one pool per workload class, a pool size of 0 makes that class share the transactional pool
+DB_AUTH_POOL_SIZE = config("DB_AUTH_POOL_SIZE", cast=int, default=3)
+DB_AUTH_STATEMENT_TIMEOUT_MS = config(
+    "DB_AUTH_STATEMENT_TIMEOUT_MS", cast=int, default=2000)
+DB_TRANSACTIONAL_POOL_SIZE = config(
+    "DB_TRANSACTIONAL_POOL_SIZE", cast=int, default=10)
+DB_TRANSACTIONAL_STATEMENT_TIMEOUT_MS = config(
+    "DB_TRANSACTIONAL_STATEMENT_TIMEOUT_MS", cast=int, default=10000)
+DB_ANALYTICAL_POOL_SIZE = config("DB_ANALYTICAL_POOL_SIZE", cast=int, default=4)
+DB_ANALYTICAL_STATEMENT_TIMEOUT_MS = config(
+    "DB_ANALYTICAL_STATEMENT_TIMEOUT_MS", cast=int, default=30000)
+
+# uuid7 gives new rows time ordered ids, uuid4 the old random ones
+ID_GENERATOR = config("ID_GENERATOR", cast=str, default="uuid7")
+
+# background jobs
+JOBS_RUN_IN_PROCESS = config("JOBS_RUN_IN_PROCESS", cast=bool, default=True)
+JOBS_ALWAYS_EAGER = config("JOBS_ALWAYS_EAGER", cast=bool, default=False)
+JOBS_WORKER_CONCURRENCY = config("JOBS_WORKER_CONCURRENCY", cast=int, default=2)
+JOBS_POLL_INTERVAL_SECONDS = config(
+    "JOBS_POLL_INTERVAL_SECONDS", cast=float, default=1.0)
+JOBS_MAX_ATTEMPTS = config("JOBS_MAX_ATTEMPTS", cast=int, default=5)
+JOBS_RETRY_BACKOFF_SECONDS = config(
+    "JOBS_RETRY_BACKOFF_SECONDS", cast=float, default=2.0)
+JOBS_RETRY_BACKOFF_MAX_SECONDS = config(
+    "JOBS_RETRY_BACKOFF_MAX_SECONDS", cast=float, default=10*60)
+JOBS_STALE_AFTER_SECONDS = config(
+    "JOBS_STALE_AFTER_SECONDS", cast=float, default=5*60)
+
+# offers and evaluations are partitioned by month, months ahead are created
+# in advance and partitions older than the retention are detached, 0 keeps all
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = config(
+    "PARTITION_MAINTENANCE_INTERVAL_SECONDS", cast=float, default=60*60)
+PARTITION_MONTHS_AHEAD = config("PARTITION_MONTHS_AHEAD", cast=int, default=3)
+PARTITION_RETENTION_MONTHS = config(
+    "PARTITION_RETENTION_MONTHS", cast=int, default=0)
+PARTITION_LOCK_TIMEOUT_MS = config(
+    "PARTITION_LOCK_TIMEOUT_MS", cast=int, default=5000)
+
+# cleanings completed or deleted longer ago than this move to the archive tables
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", cast=int, default=30)
+ARCHIVE_BATCH_SIZE = config("ARCHIVE_BATCH_SIZE", cast=int, default=500)
+ARCHIVE_INTERVAL_SECONDS = config(
+    "ARCHIVE_INTERVAL_SECONDS", cast=float, default=60*60)
+
+# the cleaning_details projection is checked against its sources and repaired
+CLEANING_DETAILS_CHECK_INTERVAL_SECONDS = config(
+    "CLEANING_DETAILS_CHECK_INTERVAL_SECONDS", cast=float, default=24*60*60)
+CLEANING_DETAILS_CHECK_BATCH_SIZE = config(
+    "CLEANING_DETAILS_CHECK_BATCH_SIZE", cast=int, default=1000)
+
+# evaluation stats over the last days come from the cleaner_daily_ratings rollup
+EVALUATION_STATS_MAX_WINDOW_DAYS = config(
+    "EVALUATION_STATS_MAX_WINDOW_DAYS", cast=int, default=365)
+CLEANER_RATINGS_BACKFILL_BATCH_DAYS = config(
+    "CLEANER_RATINGS_BACKFILL_BATCH_DAYS", cast=int, default=31)
+
+# head of the cleaning feed kept in memory by every worker, 0 disables it
+FEED_SNAPSHOT_SIZE = config("FEED_SNAPSHOT_SIZE", cast=int, default=100)
+FEED_SNAPSHOT_TTL_SECONDS = config(
+    "FEED_SNAPSHOT_TTL_SECONDS", cast=float, default=5.0)
+
+# response compression, encodings in order of preference
+COMPRESSION_ENCODINGS = config(
+    "COMPRESSION_ENCODINGS", cast=CommaSeparatedStrings, default="zstd,br,gzip")
+COMPRESSION_MINIMUM_SIZE = config(
+    "COMPRESSION_MINIMUM_SIZE", cast=int, default=1024)
+# fast, balanced or best, trades CPU per response for smaller bodies
+COMPRESSION_PROFILE = config("COMPRESSION_PROFILE", cast=str, default="balanced")
+COMPRESSION_CONTENT_TYPES = config(
+    "COMPRESSION_CONTENT_TYPES",
+    cast=CommaSeparatedStrings,
+    default="application/json,text/plain,text/html,text/css,application/javascript",
+)
+COMPRESSION_CACHE_SIZE = config(
+    "COMPRESSION_CACHE_SIZE", cast=int, default=256)
+
+# token bucket rate limits as "<requests>/<seconds>", checked before any password hashing
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", cast=bool, default=True)
+# memory keeps buckets per worker, postgres shares them between workers and hosts
+RATE_LIMIT_BACKEND = config("RATE_LIMIT_BACKEND", cast=str, default="memory")
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", cast=int, default=100_000)
+RATE_LIMIT_LOGIN_PER_IP = config(
+    "RATE_LIMIT_LOGIN_PER_IP", cast=str, default="20/60")
+RATE_LIMIT_LOGIN_PER_ACCOUNT = config(
+    "RATE_LIMIT_LOGIN_PER_ACCOUNT", cast=str, default="10/600")
+RATE_LIMIT_REGISTER_PER_IP = config(
+    "RATE_LIMIT_REGISTER_PER_IP", cast=str, default="10/3600")
+RATE_LIMIT_WRITES_PER_USER = config(
+    "RATE_LIMIT_WRITES_PER_USER", cast=str, default="120/60")
+
+# adaptive concurrency limit, backs off while requests wait for a pool connection
+LOAD_SHEDDING_ENABLED = config("LOAD_SHEDDING_ENABLED", cast=bool, default=True)
+LOAD_SHEDDING_INITIAL_LIMIT = config(
+    "LOAD_SHEDDING_INITIAL_LIMIT", cast=int, default=20)
+LOAD_SHEDDING_MIN_LIMIT = config("LOAD_SHEDDING_MIN_LIMIT", cast=int, default=4)
+LOAD_SHEDDING_MAX_LIMIT = config("LOAD_SHEDDING_MAX_LIMIT", cast=int, default=200)
+LOAD_SHEDDING_TARGET_POOL_WAIT_MS = config(
+    "LOAD_SHEDDING_TARGET_POOL_WAIT_MS", cast=float, default=50.0)
+# share of the limit feed and stats requests may take up
+LOAD_SHEDDING_LOW_PRIORITY_SHARE = config(
+    "LOAD_SHEDDING_LOW_PRIORITY_SHARE", cast=float, default=0.5)
+
+# per request deadline, clients may ask for a shorter one through the header
+REQUEST_TIMEOUT_SECONDS = config(
+    "REQUEST_TIMEOUT_SECONDS", cast=float, default=30.0)
+REQUEST_TIMEOUT_HEADER = config(
+    "REQUEST_TIMEOUT_HEADER", cast=str, default="X-Request-Timeout")
+ANALYTICAL_REQUEST_TIMEOUT_SECONDS = config(
+    "ANALYTICAL_REQUEST_TIMEOUT_SECONDS", cast=float, default=10.0)
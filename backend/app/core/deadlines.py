@@ -0,0 +1,39 @@
+import time
+import asyncio
+from contextvars import ContextVar
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class RequestDeadline:
+    """
+    Point in time by which a request has to be answered. Routes can only
+    tighten it, `changed` lets the middleware enforcing it pick that up.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.expires_at = time.monotonic() + timeout
+        self.changed = asyncio.Event()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def tighten(self, timeout: float) -> None:
+        expires_at = time.monotonic() + timeout
+        if expires_at < self.expires_at:
+            self.expires_at = expires_at
+            self.changed.set()
+
+
+request_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar("request_deadline", default=None)
+
+
+def get_request_deadline() -> Optional[RequestDeadline]:
+    return request_deadline.get()
@@ -1,18 +1,66 @@
+import logging
 from typing import Callable
 from fastapi import FastAPI
 
+from app.core.config import JOBS_RUN_IN_PROCESS, RATE_LIMIT_BACKEND
 from app.db.tasks import connect_to_db, close_db_connection
+from app.services.jobs import JobWorker, jobs_run_eagerly
+from app.services.archive import CleaningArchiver
+from app.services.cleaning_details import CleaningDetailsChecker
+from app.services.partitions import PartitionMaintainer, maintain_partitions
+
+logger = logging.getLogger(__name__)
 
 
 def create_start_app_handler(app: FastAPI) -> Callable:
     async def start_app() -> None:
         await connect_to_db(app)
 
+        rate_limiter = getattr(app.state, "rate_limiter", None)
+        if rate_limiter and RATE_LIMIT_BACKEND == "postgres" and hasattr(app.state, "_db"):
+            rate_limiter.use_postgres(app.state._db)
+
+        if hasattr(app.state, "_db"):
+            # offers and evaluations can only be written into an existing partition,
+            # so every web process makes sure of the months ahead, worker or not
+            try:
+                await maintain_partitions(app.state._db)
+            except Exception as e:
+                logger.warning(f"Partition maintenance failed on startup: {e}")
+
+        if not jobs_run_eagerly() and hasattr(app.state, "_db"):
+            app.state._periodic_tasks = [PartitionMaintainer(app.state._db, run_on_start=False)]
+
+            if JOBS_RUN_IN_PROCESS:
+                app.state._job_worker = JobWorker(app.state._db)
+                await app.state._job_worker.start()
+
+                app.state._periodic_tasks += [
+                    CleaningArchiver(app.state._db),
+                    CleaningDetailsChecker(app.state._db),
+                ]
+
+            for task in app.state._periodic_tasks:
+                await task.start()
+
     return start_app
 
 
 def create_stop_app_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
+        # uvicorn has drained in-flight requests, up to its timeout_graceful_shutdown, before this
+        # runs. Anything still counted here outlived that timeout and loses its database pool.
+        tracker = getattr(app.state, "in_flight_requests", None)
+        if tracker and tracker.in_flight:
+            logger.warning(
+                f"Shutting down with {tracker.in_flight} requests still in flight")
+
+        if getattr(app.state, "_job_worker", None):
+            await app.state._job_worker.stop()
+
+        for task in getattr(app.state, "_periodic_tasks", []):
+            await task.stop()
+
         await close_db_connection(app)
 
     return stop_app
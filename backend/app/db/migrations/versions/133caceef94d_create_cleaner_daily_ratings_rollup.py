@@ -0,0 +1,141 @@
+"""create_cleaner_daily_ratings_rollup
+Revision ID: 133caceef94d
+Revises: 97b3cac2cac4
+Create Date: 2026-10-20 00:07:31.582940
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = '133caceef94d'
+down_revision = '97b3cac2cac4'
+branch_labels = None
+depends_on = None
+
+STARS = ("one_stars", "two_stars", "three_stars", "four_stars", "five_stars")
+RATINGS = ("professionalism", "completeness", "efficiency")
+# rollup column and what one evaluation adds to it
+ROLLUP_COLUMNS = (
+    ("evaluations", "1"),
+    ("no_shows", "CAST(no_show AS int)"),
+    *(
+        column
+        for rating in RATINGS
+        for column in (
+            (f"{rating}_sum", f"COALESCE({rating}, 0)"),
+            (f"{rating}_count", f"CAST({rating} IS NOT NULL AS int)"),
+        )
+    ),
+    ("overall_rating_sum", "overall_rating"),
+    *((stars, f"CAST(overall_rating = {i} AS int)") for i, stars in enumerate(STARS, start=1)),
+)
+# evaluations are bucketed by the UTC day they were left on
+EVALUATION_DAY = "CAST(created_at AT TIME ZONE 'UTC' AS date)"
+
+
+def roll_up(changes: str) -> str:
+    """
+    Adds `changes`, evaluations with a `sign` of 1 or -1, to their cleaner's
+    day. Rows go in key order, so concurrent statements lock days in the same order.
+    """
+    columns = ", ".join(column for column, _ in ROLLUP_COLUMNS)
+    sums = ",\n                       ".join(f"sum(sign * {value})" for _, value in ROLLUP_COLUMNS)
+    assignments = ",\n                    ".join(
+        f"{column} = r.{column} + EXCLUDED.{column}" for column, _ in ROLLUP_COLUMNS
+    )
+
+    return f"""
+                INSERT INTO cleaner_daily_ratings AS r (cleaner_id, day, {columns})
+                SELECT cleaner_id,
+                       {EVALUATION_DAY} AS day,
+                       {sums}
+                FROM ({changes}) AS changes
+                GROUP BY cleaner_id, day
+                ORDER BY cleaner_id, day
+                ON CONFLICT (cleaner_id, day) DO UPDATE
+                SET {assignments};
+    """
+
+
+def create_cleaner_daily_ratings_table() -> None:
+    op.create_table(
+        "cleaner_daily_ratings",
+        sa.Column("cleaner_id", postgresql.UUID, primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        *(
+            sa.Column(column, sa.Integer, nullable=False, server_default="0")
+            for column, _ in ROLLUP_COLUMNS
+        ),
+    )
+
+
+def create_roll_up_triggers() -> None:
+    """
+    Statement level like the offer counters, moving each cleaner and day
+    once per statement. Sums and counts only, so an evaluation can be taken
+    back out as exactly as it went in.
+    """
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION roll_up_cleaner_ratings()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {roll_up("SELECT *, 1 AS sign FROM new_evaluations")}
+            ELSIF TG_OP = 'DELETE' THEN
+                {roll_up("SELECT *, -1 AS sign FROM old_evaluations")}
+            ELSE
+                {roll_up(
+                    "SELECT *, -1 AS sign FROM old_evaluations UNION ALL SELECT *, 1 AS sign FROM new_evaluations"
+                )}
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER roll_up_cleaner_ratings_on_insert
+            AFTER INSERT
+            ON cleaning_to_cleaner_evaluations
+            REFERENCING NEW TABLE AS new_evaluations
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE roll_up_cleaner_ratings();
+
+        CREATE TRIGGER roll_up_cleaner_ratings_on_update
+            AFTER UPDATE
+            ON cleaning_to_cleaner_evaluations
+            REFERENCING OLD TABLE AS old_evaluations NEW TABLE AS new_evaluations
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE roll_up_cleaner_ratings();
+
+        CREATE TRIGGER roll_up_cleaner_ratings_on_delete
+            AFTER DELETE
+            ON cleaning_to_cleaner_evaluations
+            REFERENCING OLD TABLE AS old_evaluations
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE roll_up_cleaner_ratings();
+        """
+    )
+
+
+def upgrade() -> None:
+    """
+    Per cleaner and day sums, counts and star histograms of their
+    evaluations, so stats over the last weeks or months add up a few dozen
+    rows instead of every evaluation in the window.
+    """
+    create_cleaner_daily_ratings_table()
+    create_roll_up_triggers()
+
+    # creating the triggers locked evaluations against writes until this commits, so nothing is counted twice
+    op.execute(roll_up("SELECT *, 1 AS sign FROM cleaning_to_cleaner_evaluations"))
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER roll_up_cleaner_ratings_on_delete ON cleaning_to_cleaner_evaluations;")
+    op.execute("DROP TRIGGER roll_up_cleaner_ratings_on_update ON cleaning_to_cleaner_evaluations;")
+    op.execute("DROP TRIGGER roll_up_cleaner_ratings_on_insert ON cleaning_to_cleaner_evaluations;")
+    op.execute("DROP FUNCTION roll_up_cleaner_ratings();")
+    op.drop_table("cleaner_daily_ratings")
@@ -0,0 +1,62 @@
+"""create_refresh_tokens_table
+Revision ID: 1fe505cb413a
+Revises: ae1368dae786
+Create Date: 2026-10-19 11:02:17.403816
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '1fe505cb413a'
+down_revision = 'ae1368dae786'
+branch_labels = None
+depends_on = None
+
+
+def create_refresh_tokens_table() -> None:
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", sa.CHAR(36), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.CHAR(36),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        ),
+        # every token rotated out of the same login shares a family
+        sa.Column("family_id", sa.CHAR(36), nullable=False, index=True),
+        sa.Column("token_hash", sa.Text, nullable=False, unique=True),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("replaced_by", sa.CHAR(36), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_refresh_tokens_modtime
+            BEFORE UPDATE
+            ON refresh_tokens
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_updated_at_column();
+        """
+    )
+
+
+def upgrade() -> None:
+    create_refresh_tokens_table()
+
+
+def downgrade() -> None:
+    op.drop_table("refresh_tokens")
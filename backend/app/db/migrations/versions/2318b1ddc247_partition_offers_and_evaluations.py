@@ -0,0 +1,230 @@
+"""partition_offers_and_evaluations
+Revision ID: 2318b1ddc247
+Revises: f8afeb36f10f
+Create Date: 2026-10-19 17:24:05.118730
+"""
+import datetime
+from typing import NamedTuple, Optional, Tuple
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = '2318b1ddc247'
+down_revision = 'f8afeb36f10f'
+branch_labels = None
+depends_on = None
+
+LOCK_TIMEOUT = "5s"
+# monthly partitions created up front, the app keeps adding them from then on
+MONTHS_AHEAD = 3
+
+
+class ForeignKey(NamedTuple):
+    name: str
+    column: str
+    referred_table: str
+    ondelete: str
+
+
+class PartitionedTable(NamedTuple):
+    name: str
+    primary_key: str
+    key_columns: Tuple[str, ...]
+    indexed_columns: Tuple[str, ...]
+    foreign_keys: Tuple[ForeignKey, ...]
+
+    @property
+    def legacy(self) -> str:
+        return f"{self.name}_legacy"
+
+    @property
+    def legacy_check(self) -> str:
+        return f"ck_{self.legacy}_range"
+
+    def index(self, column: str, *, table: Optional[str] = None) -> str:
+        return f"ix_{table or self.name}_{column}"
+
+
+TABLES = [
+    PartitionedTable(
+        name="user_offers_for_cleanings",
+        primary_key="pk_user_offers_for_cleanings",
+        key_columns=("user_id", "cleaning_id"),
+        indexed_columns=("user_id", "cleaning_id", "status"),
+        foreign_keys=(
+            ForeignKey("user_offers_for_cleanings_user_id_fkey", "user_id", "users", "CASCADE"),
+            ForeignKey("user_offers_for_cleanings_cleaning_id_fkey", "cleaning_id", "cleanings", "CASCADE"),
+        ),
+    ),
+    PartitionedTable(
+        name="cleaning_to_cleaner_evaluations",
+        primary_key="pk_cleaning_to_cleaner_evaluations",
+        key_columns=("cleaning_id", "cleaner_id"),
+        indexed_columns=("cleaning_id", "cleaner_id"),
+        foreign_keys=(
+            ForeignKey("cleaning_to_cleaner_evaluations_cleaning_id_fkey", "cleaning_id", "cleanings", "SET NULL"),
+            ForeignKey("cleaning_to_cleaner_evaluations_cleaner_id_fkey", "cleaner_id", "users", "SET NULL"),
+        ),
+    ),
+]
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def get_legacy_boundary() -> datetime.date:
+    # the current table keeps taking rows until the end of next month, so a
+    # migration started on the last day of a month can't reject inserts
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return add_months(today.replace(day=1), 2)
+
+
+def timestamp(day: datetime.date) -> str:
+    return f"'{day.isoformat()} 00:00:00+00'"
+
+
+def add_legacy_range_checks(boundary: datetime.date) -> None:
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}';")
+
+    for table in TABLES:
+        op.execute(
+            f"""
+            ALTER TABLE {table.name}
+                DROP CONSTRAINT IF EXISTS {table.legacy_check},
+                ADD CONSTRAINT {table.legacy_check} CHECK (created_at < {timestamp(boundary)}) NOT VALID;
+            """
+        )
+
+
+def prepare_legacy_tables() -> None:
+    """
+    Everything ATTACH PARTITION would otherwise build or check under an
+    exclusive lock: the range check it can trust instead of scanning, and
+    the primary key and BRIN indexes matching the partitioned table's.
+    """
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table.name} VALIDATE CONSTRAINT {table.legacy_check};")
+
+        key = ", ".join(table.key_columns + ("created_at",))
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {table.primary_key}_legacy;")
+        op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {table.primary_key}_legacy ON {table.name} ({key});")
+
+        brin = table.index("created_at", table=table.legacy)
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {brin};")
+        op.execute(f"CREATE INDEX CONCURRENTLY {brin} ON {table.name} USING brin (created_at);")
+
+
+def create_partitioned_table(table: PartitionedTable, boundary: datetime.date) -> None:
+    op.execute(f"ALTER TABLE {table.name} RENAME TO {table.legacy};")
+    op.execute(f"DROP TRIGGER update_{table.name}_modtime ON {table.legacy};")
+    op.execute(f"ALTER TABLE {table.legacy} DROP CONSTRAINT {table.primary_key};")
+    op.execute(
+        f"""
+        ALTER TABLE {table.legacy}
+            ADD CONSTRAINT {table.primary_key}_legacy PRIMARY KEY USING INDEX {table.primary_key}_legacy;
+        """
+    )
+    for column in table.indexed_columns:
+        op.execute(f"ALTER INDEX {table.index(column)} RENAME TO {table.index(column, table=table.legacy)};")
+
+    # unique constraints on a partitioned table have to include the partition key
+    op.execute(f"CREATE TABLE {table.name} (LIKE {table.legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at);")
+    op.execute(
+        f"""
+        ALTER TABLE {table.name}
+            ADD CONSTRAINT {table.primary_key} PRIMARY KEY ({", ".join(table.key_columns + ("created_at",))});
+        """
+    )
+    for column in table.indexed_columns:
+        op.execute(f"CREATE INDEX {table.index(column)} ON {table.name} ({column});")
+    # rows arrive in created_at order, so block ranges summarize it well at a fraction of a btree's size
+    op.execute(f"CREATE INDEX {table.index('created_at')} ON {table.name} USING brin (created_at);")
+
+    for fk in table.foreign_keys:
+        op.execute(
+            f"""
+            ALTER TABLE {table.name}
+                ADD CONSTRAINT {fk.name} FOREIGN KEY ({fk.column})
+                REFERENCES {fk.referred_table} (id) ON DELETE {fk.ondelete};
+            """
+        )
+    op.execute(
+        f"""
+        CREATE TRIGGER update_{table.name}_modtime
+            BEFORE UPDATE
+            ON {table.name}
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_updated_at_column();
+        """
+    )
+
+    # the validated check lets this skip the scan, indexes and foreign keys are matched, not rebuilt
+    op.execute(
+        f"""
+        ALTER TABLE {table.name}
+            ATTACH PARTITION {table.legacy} FOR VALUES FROM (MINVALUE) TO ({timestamp(boundary)});
+        """
+    )
+    op.execute(f"ALTER TABLE {table.legacy} DROP CONSTRAINT {table.legacy_check};")
+
+    for months in range(MONTHS_AHEAD):
+        start = add_months(boundary, months)
+        op.execute(
+            f"""
+            CREATE TABLE {table.name}_p{start.year}_{start.month:02d}
+                PARTITION OF {table.name}
+                FOR VALUES FROM ({timestamp(start)}) TO ({timestamp(add_months(start, 1))});
+            """
+        )
+
+
+def upgrade() -> None:
+    """
+    Turns offers and evaluations into tables range partitioned by month on
+    created_at. The existing table becomes the partition holding everything
+    up to the end of next month, so no rows are copied.
+    """
+    boundary = get_legacy_boundary()
+    add_legacy_range_checks(boundary)
+
+    with op.get_context().autocommit_block():
+        prepare_legacy_tables()
+
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}';")
+    for table in TABLES:
+        create_partitioned_table(table, boundary)
+
+
+def downgrade() -> None:
+    # copies every row back into a plain table, take the API offline first
+    for table in TABLES:
+        plain = f"{table.name}_plain"
+
+        op.execute(f"CREATE TABLE {plain} (LIKE {table.name} INCLUDING DEFAULTS);")
+        op.execute(f"INSERT INTO {plain} SELECT * FROM {table.name};")
+        op.execute(f"DROP TABLE {table.name} CASCADE;")
+        op.execute(f"ALTER TABLE {plain} RENAME TO {table.name};")
+
+        op.execute(
+            f"ALTER TABLE {table.name} ADD CONSTRAINT {table.primary_key} PRIMARY KEY ({', '.join(table.key_columns)});"
+        )
+        for column in table.indexed_columns:
+            op.execute(f"CREATE INDEX {table.index(column)} ON {table.name} ({column});")
+        for fk in table.foreign_keys:
+            op.execute(
+                f"""
+                ALTER TABLE {table.name}
+                    ADD CONSTRAINT {fk.name} FOREIGN KEY ({fk.column})
+                    REFERENCES {fk.referred_table} (id) ON DELETE {fk.ondelete};
+                """
+            )
+        op.execute(
+            f"""
+            CREATE TRIGGER update_{table.name}_modtime
+                BEFORE UPDATE
+                ON {table.name}
+                FOR EACH ROW
+            EXECUTE PROCEDURE update_updated_at_column();
+            """
+        )
@@ -0,0 +1,63 @@
+"""index_offers_by_user_and_created_at
+Revision ID: 246b22be7a58
+Revises: 8e2f8131fb93
+Create Date: 2026-10-19 22:03:18.552214
+"""
+from typing import List
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '246b22be7a58'
+down_revision = '8e2f8131fb93'
+branch_labels = None
+depends_on = None
+
+TABLE = "user_offers_for_cleanings"
+INDEX = "ix_user_offers_for_cleanings_user_keyset"
+# a cleaner's offers in (created_at, cleaning_id) order, so a page is a range scan
+COLUMNS = "user_id, created_at, cleaning_id"
+
+
+def list_partitions(table: str) -> List[str]:
+    return [
+        name for (name,) in op.get_bind().execute(
+            sa.text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                    INNER JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+                ORDER BY c.relname;
+                """
+            ),
+            {"table": table},
+        )
+    ]
+
+
+def upgrade() -> None:
+    """
+    Indexes a partitioned table without blocking writes: an invalid index on
+    the parent only, each partition's built concurrently and attached, after
+    which the parent's becomes valid. Partitions created later get their own
+    copy from the parent.
+    """
+    if op.get_context().as_sql:
+        op.execute(f"CREATE INDEX {INDEX} ON {TABLE} ({COLUMNS});")
+        return
+
+    partitions = list_partitions(TABLE)
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY {TABLE} ({COLUMNS});")
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {partition}_user_keyset;")
+            op.execute(f"CREATE INDEX CONCURRENTLY {partition}_user_keyset ON {partition} ({COLUMNS});")
+
+    for partition in partitions:
+        op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_user_keyset;")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX {INDEX};")
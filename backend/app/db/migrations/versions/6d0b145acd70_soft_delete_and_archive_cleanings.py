@@ -0,0 +1,139 @@
+"""soft_delete_and_archive_cleanings
+Revision ID: 6d0b145acd70
+Revises: 2318b1ddc247
+Create Date: 2026-10-19 18:41:52.306117
+"""
+from typing import Tuple
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = '6d0b145acd70'
+down_revision = '2318b1ddc247'
+branch_labels = None
+depends_on = None
+
+LOCK_TIMEOUT = "5s"
+
+# every index the API reads cleanings through leaves soft deleted rows out
+LIVE_INDEXES = {
+    "ix_cleanings_owner_live": "ON cleanings (owner, id) WHERE deleted_at IS NULL",
+    "ix_cleanings_created_at_live": "ON cleanings (created_at) WHERE deleted_at IS NULL",
+    "ix_cleanings_updated_at_live": (
+        "ON cleanings (updated_at) WHERE deleted_at IS NULL AND updated_at <> created_at"
+    ),
+    # only the archiver looks for deleted cleanings
+    "ix_cleanings_deleted_at": "ON cleanings (deleted_at) WHERE deleted_at IS NOT NULL",
+}
+
+
+def timestamps() -> Tuple[sa.Column, sa.Column]:
+    return (
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+    )
+
+
+def archived_at() -> sa.Column:
+    return sa.Column(
+        "archived_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False
+    )
+
+
+def create_archive_tables() -> None:
+    op.create_table(
+        "cleanings_archive",
+        sa.Column("id", postgresql.UUID, primary_key=True),
+        sa.Column("name", sa.Text, nullable=False),
+        sa.Column("description", sa.Text, nullable=True),
+        sa.Column("cleaning_type", sa.Text, nullable=False),
+        sa.Column("price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("owner", postgresql.UUID, sa.ForeignKey("users.id", ondelete="CASCADE"), index=True),
+        *timestamps(),
+        sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        archived_at(),
+    )
+    op.create_table(
+        "user_offers_for_cleanings_archive",
+        sa.Column("user_id", postgresql.UUID, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False,
+                  index=True),
+        sa.Column("cleaning_id", postgresql.UUID, sa.ForeignKey("cleanings_archive.id", ondelete="CASCADE"),
+                  nullable=False, index=True),
+        sa.Column("status", sa.Text, nullable=False),
+        *timestamps(),
+        archived_at(),
+        sa.PrimaryKeyConstraint("user_id", "cleaning_id", name="pk_user_offers_for_cleanings_archive"),
+    )
+
+
+def upgrade() -> None:
+    """
+    Cleanings get a deleted_at flag instead of being deleted, and archive
+    tables the archiver moves completed and deleted cleanings into, along
+    with their offers. Evaluations stay where they are and keep pointing at
+    archived cleanings, so their foreign key to cleanings goes.
+    """
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}';")
+    # nullable without a default, so this only touches the catalog
+    op.add_column("cleanings", sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.drop_constraint(
+        "cleaning_to_cleaner_evaluations_cleaning_id_fkey", "cleaning_to_cleaner_evaluations", type_="foreignkey"
+    )
+    create_archive_tables()
+
+    with op.get_context().autocommit_block():
+        for name, definition in LIVE_INDEXES.items():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+            op.execute(f"CREATE INDEX CONCURRENTLY {name} {definition};")
+
+
+def downgrade() -> None:
+    """
+    Archived cleanings and offers go back where they came from. Before this
+    revision a cleaning was either there or gone, so rather than delete
+    soft deleted cleanings, and evaluations with them, this refuses to run
+    while there are any.
+    """
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM cleanings WHERE deleted_at IS NOT NULL)
+                OR EXISTS (SELECT 1 FROM cleanings_archive WHERE deleted_at IS NOT NULL) THEN
+                RAISE EXCEPTION 'Soft deleted cleanings exist, there is nowhere to keep them below this revision.'
+                    USING HINT = 'Restore or delete them, and their evaluations, before downgrading.';
+            END IF;
+        END;
+        $$;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO cleanings (id, name, description, cleaning_type, price, owner, created_at, updated_at)
+        SELECT id, name, description, cleaning_type, price, owner, created_at, updated_at
+        FROM cleanings_archive;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_offers_for_cleanings (user_id, cleaning_id, status, created_at, updated_at)
+        SELECT user_id, cleaning_id, status, created_at, updated_at
+        FROM user_offers_for_cleanings_archive;
+        """
+    )
+    op.drop_table("user_offers_for_cleanings_archive")
+    op.drop_table("cleanings_archive")
+
+    op.create_foreign_key(
+        "cleaning_to_cleaner_evaluations_cleaning_id_fkey",
+        "cleaning_to_cleaner_evaluations",
+        "cleanings",
+        ["cleaning_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    for name in LIVE_INDEXES:
+        op.drop_index(name, table_name="cleanings")
+    op.drop_column("cleanings", "deleted_at")
@@ -0,0 +1,343 @@
+"""count_offers_by_status_on_cleanings
+Revision ID: 8e2f8131fb93
+Revises: c62905372aec
+Create Date: 2026-10-19 21:12:40.731906
+"""
+from typing import Optional
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '8e2f8131fb93'
+down_revision = 'c62905372aec'
+branch_labels = None
+depends_on = None
+
+OFFER_STATUSES = ("pending", "accepted", "rejected", "cancelled", "completed")
+COUNTER_COLUMNS = tuple(f"{status}_offers" for status in OFFER_STATUSES)
+# moved with the counters, so conditional requests see counts change without updated_at moving
+COUNTERS_UPDATED_AT = "offer_counts_updated_at"
+# what a detail document is built from on the cleanings row, the counters are read next to it instead
+PROJECTED_CLEANING_COLUMNS = (
+    "name", "description", "price", "cleaning_type", "owner", "created_at", "updated_at", "deleted_at",
+)
+
+# what the projection built offer_counts from before the counters existed
+AGGREGATED_OFFER_COUNTS = "COALESCE(offer_counts.by_status, '{}'::jsonb)"
+AGGREGATED_OFFER_COUNTS_JOIN = """
+            LEFT JOIN LATERAL (
+                SELECT jsonb_object_agg(status, total) AS by_status
+                FROM (
+                    -- offers can't predate their cleaning, which prunes older partitions
+                    SELECT status, count(*) AS total
+                    FROM user_offers_for_cleanings
+                    WHERE cleaning_id = c.id AND created_at >= c.created_at
+                    GROUP BY status
+                ) AS counts
+            ) AS offer_counts ON TRUE
+"""
+
+
+def replace_cleaning_detail_documents_view(*, offer_counts: Optional[str] = None, joins: str = "") -> None:
+    offer_counts_field = f",\n                   'offer_counts', {offer_counts}" if offer_counts else ""
+    op.execute(
+        f"""
+        CREATE OR REPLACE VIEW cleaning_detail_documents AS
+        SELECT c.id,
+               c.owner,
+               jsonb_build_object(
+                   'id', c.id,
+                   'name', c.name,
+                   'description', c.description,
+                   'price', c.price,
+                   'cleaning_type', c.cleaning_type,
+                   'created_at', c.created_at,
+                   'updated_at', c.updated_at,
+                   'owner', CASE WHEN u.id IS NULL THEN to_jsonb(c.owner) ELSE jsonb_build_object(
+                       'id', u.id,
+                       'username', u.username,
+                       'email', u.email,
+                       'email_verified', u.email_verified,
+                       'is_active', u.is_active,
+                       'is_superuser', u.is_superuser,
+                       'created_at', u.created_at,
+                       'profile', CASE WHEN p.id IS NULL THEN NULL ELSE jsonb_build_object(
+                           'id', p.id,
+                           'full_name', p.full_name,
+                           'phone_number', p.phone_number,
+                           'bio', p.bio,
+                           'image', p.image,
+                           'user_id', u.id,
+                           'username', u.username,
+                           'email', u.email,
+                           'created_at', p.created_at,
+                           'updated_at', p.updated_at
+                       ) END
+                   ) END{offer_counts_field}
+               ) AS document
+        FROM cleanings c
+            LEFT JOIN users u ON u.id = c.owner
+            LEFT JOIN profiles p ON p.user_id = u.id
+            {joins}
+        WHERE c.deleted_at IS NULL;
+        """
+    )
+
+
+def refresh_all_cleaning_details() -> None:
+    op.execute(
+        "SELECT refresh_cleaning_details(ARRAY(SELECT id FROM cleanings WHERE deleted_at IS NULL));"
+    )
+
+
+def create_cleanings_modtime_trigger(*, when: str = "") -> None:
+    op.execute("DROP TRIGGER update_cleanings_modtime ON cleanings;")
+    op.execute(
+        f"""
+        CREATE TRIGGER update_cleanings_modtime
+            BEFORE UPDATE
+            ON cleanings
+            FOR EACH ROW
+            {when}
+        EXECUTE PROCEDURE update_updated_at_column();
+        """
+    )
+
+
+def create_cleanings_projection_triggers(*, when: str = "") -> None:
+    """
+    With `when`, updates only refresh the document when it matches, which
+    needs a trigger of their own as inserts have no OLD row to compare.
+    """
+    op.execute("DROP TRIGGER IF EXISTS sync_cleaning_details_on_update ON cleanings;")
+    op.execute("DROP TRIGGER sync_cleaning_details ON cleanings;")
+
+    if not when:
+        op.execute(
+            """
+            CREATE TRIGGER sync_cleaning_details
+                AFTER INSERT OR UPDATE
+                ON cleanings
+                FOR EACH ROW
+            EXECUTE PROCEDURE sync_cleaning_details_from_cleanings();
+            """
+        )
+        return
+
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_cleaning_details
+            AFTER INSERT
+            ON cleanings
+            FOR EACH ROW
+        EXECUTE PROCEDURE sync_cleaning_details_from_cleanings();
+
+        CREATE TRIGGER sync_cleaning_details_on_update
+            AFTER UPDATE
+            ON cleanings
+            FOR EACH ROW
+            {when}
+        EXECUTE PROCEDURE sync_cleaning_details_from_cleanings();
+        """
+    )
+
+
+def create_offer_counter_triggers() -> None:
+    """
+    Statement level, so accepting an offer and rejecting every other one
+    moves each cleaning's counters with a single update.
+    """
+    deltas = ",\n".join(
+        f"COALESCE(sum(delta) FILTER (WHERE status = '{status}'), 0) AS {column}"
+        for status, column in zip(OFFER_STATUSES, COUNTER_COLUMNS)
+    )
+    assignments = ",\n".join(
+        [f"{column} = c.{column} + d.{column}" for column in COUNTER_COLUMNS] + [f"{COUNTERS_UPDATED_AT} = now()"]
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION count_offers_by_status()
+            RETURNS TRIGGER AS
+        $$
+        DECLARE
+            cleaning_ids uuid[];
+            statuses text[];
+            deltas int[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(cleaning_id), array_agg(status), array_agg(1)
+                INTO cleaning_ids, statuses, deltas
+                FROM new_offers;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(cleaning_id), array_agg(status), array_agg(-1)
+                INTO cleaning_ids, statuses, deltas
+                FROM old_offers;
+            ELSE
+                -- only offers whose status changed move between counters
+                SELECT array_agg(changes.cleaning_id), array_agg(changes.status), array_agg(changes.delta)
+                INTO cleaning_ids, statuses, deltas
+                FROM (
+                    SELECT n.cleaning_id, unnest(ARRAY[o.status, n.status]) AS status, unnest(ARRAY[-1, 1]) AS delta
+                    FROM new_offers n
+                        INNER JOIN old_offers o USING (cleaning_id, user_id, created_at)
+                    WHERE n.status IS DISTINCT FROM o.status
+                ) AS changes;
+            END IF;
+
+            UPDATE cleanings c
+            SET {assignments}
+            FROM (
+                SELECT cleaning_id,
+                       {deltas}
+                FROM unnest(cleaning_ids, statuses, deltas) AS changes(cleaning_id, status, delta)
+                GROUP BY cleaning_id
+            ) AS d
+            WHERE c.id = d.cleaning_id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER count_offers_by_status_on_insert
+            AFTER INSERT
+            ON user_offers_for_cleanings
+            REFERENCING NEW TABLE AS new_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE count_offers_by_status();
+
+        CREATE TRIGGER count_offers_by_status_on_update
+            AFTER UPDATE
+            ON user_offers_for_cleanings
+            REFERENCING OLD TABLE AS old_offers NEW TABLE AS new_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE count_offers_by_status();
+
+        CREATE TRIGGER count_offers_by_status_on_delete
+            AFTER DELETE
+            ON user_offers_for_cleanings
+            REFERENCING OLD TABLE AS old_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE count_offers_by_status();
+        """
+    )
+
+
+def create_offer_projection_triggers() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_cleaning_details_from_offers()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM refresh_cleaning_details(ARRAY(SELECT DISTINCT cleaning_id FROM old_offers));
+            ELSE
+                PERFORM refresh_cleaning_details(ARRAY(SELECT DISTINCT cleaning_id FROM new_offers));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER sync_cleaning_details_on_insert
+            AFTER INSERT
+            ON user_offers_for_cleanings
+            REFERENCING NEW TABLE AS new_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE sync_cleaning_details_from_offers();
+
+        CREATE TRIGGER sync_cleaning_details_on_update
+            AFTER UPDATE
+            ON user_offers_for_cleanings
+            REFERENCING NEW TABLE AS new_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE sync_cleaning_details_from_offers();
+
+        CREATE TRIGGER sync_cleaning_details_on_delete
+            AFTER DELETE
+            ON user_offers_for_cleanings
+            REFERENCING OLD TABLE AS old_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE sync_cleaning_details_from_offers();
+        """
+    )
+
+
+def drop_offer_projection_triggers() -> None:
+    op.execute("DROP TRIGGER sync_cleaning_details_on_delete ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER sync_cleaning_details_on_update ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER sync_cleaning_details_on_insert ON user_offers_for_cleanings;")
+    op.execute("DROP FUNCTION sync_cleaning_details_from_offers();")
+
+
+def upgrade() -> None:
+    """
+    One counter per offer status on every cleaning, moved by triggers in the
+    same transaction as the offer writes, so nothing has to scan offers to
+    know how many are pending or whether one was accepted.
+    """
+    for table in ("cleanings", "cleanings_archive"):
+        for column in COUNTER_COLUMNS:
+            op.add_column(table, sa.Column(column, sa.Integer, server_default="0", nullable=False))
+    op.add_column("cleanings", sa.Column(COUNTERS_UPDATED_AT, sa.TIMESTAMP(timezone=True), nullable=True))
+
+    # counters moving is not an edit of the cleaning, so it mustn't reach the feed's updated events
+    counters = (*COUNTER_COLUMNS, COUNTERS_UPDATED_AT)
+    create_cleanings_modtime_trigger(
+        when="WHEN (({old}) IS NOT DISTINCT FROM ({new}))".format(
+            old=", ".join(f"OLD.{column}" for column in counters),
+            new=", ".join(f"NEW.{column}" for column in counters),
+        )
+    )
+    # nor re-render the document: offer writes would all queue behind rebuilding it. Counts are
+    # read from the cleanings row next to the document instead
+    create_cleanings_projection_triggers(
+        when="WHEN (({old}) IS DISTINCT FROM ({new}))".format(
+            old=", ".join(f"OLD.{column}" for column in PROJECTED_CLEANING_COLUMNS),
+            new=", ".join(f"NEW.{column}" for column in PROJECTED_CLEANING_COLUMNS),
+        )
+    )
+    replace_cleaning_detail_documents_view()
+    drop_offer_projection_triggers()
+    create_offer_counter_triggers()
+
+    # creating the triggers locked offers against writes until this commits, so nothing is counted twice
+    counts = ",\n".join(
+        f"count(*) FILTER (WHERE status = '{status}') AS {column}"
+        for status, column in zip(OFFER_STATUSES, COUNTER_COLUMNS)
+    )
+    op.execute(
+        f"""
+        UPDATE cleanings c
+        SET {", ".join(f"{column} = o.{column}" for column in COUNTER_COLUMNS)}
+        FROM (
+            SELECT cleaning_id,
+                   {counts}
+            FROM user_offers_for_cleanings
+            GROUP BY cleaning_id
+        ) AS o
+        WHERE c.id = o.cleaning_id;
+        """
+    )
+
+    # every document loses offer_counts, they are read from the counters next to it now
+    refresh_all_cleaning_details()
+
+
+def downgrade() -> None:
+    create_offer_projection_triggers()
+    replace_cleaning_detail_documents_view(
+        offer_counts=AGGREGATED_OFFER_COUNTS, joins=AGGREGATED_OFFER_COUNTS_JOIN
+    )
+    refresh_all_cleaning_details()
+
+    op.execute("DROP TRIGGER count_offers_by_status_on_delete ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER count_offers_by_status_on_update ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER count_offers_by_status_on_insert ON user_offers_for_cleanings;")
+    op.execute("DROP FUNCTION count_offers_by_status();")
+    create_cleanings_projection_triggers()
+    create_cleanings_modtime_trigger()
+    op.drop_column("cleanings", COUNTERS_UPDATED_AT)
+
+    for table in ("cleanings", "cleanings_archive"):
+        for column in COUNTER_COLUMNS:
+            op.drop_column(table, column)
@@ -0,0 +1,74 @@
+"""index_evaluations_by_cleaner_keyset
+Revision ID: 97b3cac2cac4
+Revises: b739e98ae7d0
+Create Date: 2026-10-19 23:18:52.361047
+"""
+from typing import List
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = '97b3cac2cac4'
+down_revision = 'b739e98ae7d0'
+branch_labels = None
+depends_on = None
+
+TABLE = "cleaning_to_cleaner_evaluations"
+# index name, partition index suffix and columns, one per way a cleaner's evaluations are listed
+INDEXES = (
+    # newest or oldest first
+    ("ix_cleaning_to_cleaner_evaluations_cleaner_keyset", "cleaner_keyset", "cleaner_id, created_at, cleaning_id"),
+    # highest or lowest rated first
+    (
+        "ix_cleaning_to_cleaner_evaluations_rating_keyset",
+        "rating_keyset",
+        "cleaner_id, overall_rating, created_at, cleaning_id",
+    ),
+)
+
+
+def list_partitions(table: str) -> List[str]:
+    return [
+        name for (name,) in op.get_bind().execute(
+            sa.text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                    INNER JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+                ORDER BY c.relname;
+                """
+            ),
+            {"table": table},
+        )
+    ]
+
+
+def upgrade() -> None:
+    """
+    Built the same way as ix_user_offers_for_cleanings_user_keyset: every
+    partition's index concurrently, then attached to the parent's.
+    """
+    if op.get_context().as_sql:
+        for index, _, columns in INDEXES:
+            op.execute(f"CREATE INDEX {index} ON {TABLE} ({columns});")
+        return
+
+    partitions = list_partitions(TABLE)
+    for index, _, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index} ON ONLY {TABLE} ({columns});")
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            for _, suffix, columns in INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {partition}_{suffix};")
+                op.execute(f"CREATE INDEX CONCURRENTLY {partition}_{suffix} ON {partition} ({columns});")
+
+    for partition in partitions:
+        for index, suffix, _ in INDEXES:
+            op.execute(f"ALTER INDEX {index} ATTACH PARTITION {partition}_{suffix};")
+
+
+def downgrade() -> None:
+    for index, _, _ in INDEXES:
+        op.execute(f"DROP INDEX {index};")
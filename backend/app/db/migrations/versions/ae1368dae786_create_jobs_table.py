@@ -0,0 +1,82 @@
+"""create_jobs_table
+Revision ID: ae1368dae786
+Revises: b732937fb214
+Create Date: 2026-10-19 09:12:41.118203
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'ae1368dae786'
+down_revision = 'b732937fb214'
+branch_labels = None
+depends_on = None
+
+
+def create_jobs_table() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.BigInteger, primary_key=True),
+        sa.Column("task", sa.Text, nullable=False),
+        sa.Column("payload", postgresql.JSONB, nullable=False,
+                  server_default="{}"),
+        sa.Column("status", sa.Text, nullable=False,
+                  server_default="queued"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer,
+                  nullable=False, server_default="5"),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column(
+            "run_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("locked_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    # workers only ever look for runnable jobs, so keep the index limited to those
+    op.execute(
+        """
+        CREATE INDEX ix_jobs_queued_run_at
+            ON jobs (run_at)
+            WHERE status = 'queued';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER update_jobs_modtime
+            BEFORE UPDATE
+            ON jobs
+            FOR EACH ROW
+        EXECUTE PROCEDURE update_updated_at_column();
+        """
+    )
+
+
+def create_unique_profile_per_user_index() -> None:
+    # profile creation is retried by the job worker, so it has to be idempotent
+    op.create_index("ix_profiles_user_id_unique", "profiles",
+                    ["user_id"], unique=True)
+
+
+def upgrade() -> None:
+    create_jobs_table()
+    create_unique_profile_per_user_index()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profiles_user_id_unique", table_name="profiles")
+    op.drop_table("jobs")
@@ -0,0 +1,39 @@
+"""create_rate_limit_buckets_table
+Revision ID: b1e6c40208e2
+Revises: 1fe505cb413a
+Create Date: 2026-10-19 14:12:41.530219
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'b1e6c40208e2'
+down_revision = '1fe505cb413a'
+branch_labels = None
+depends_on = None
+
+
+def create_rate_limit_buckets_table() -> None:
+    # buckets are cheap to lose on a crash, so skip the WAL
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.Text, primary_key=True),
+        sa.Column("tokens", sa.Float, nullable=False),
+        sa.Column("allowed", sa.Boolean, nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+            index=True,
+        ),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def upgrade() -> None:
+    create_rate_limit_buckets_table()
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
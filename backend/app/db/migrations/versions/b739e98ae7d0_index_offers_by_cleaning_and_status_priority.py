@@ -0,0 +1,88 @@
+"""index_offers_by_cleaning_and_status_priority
+Revision ID: b739e98ae7d0
+Revises: 246b22be7a58
+Create Date: 2026-10-19 22:41:07.904385
+"""
+from typing import List
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'b739e98ae7d0'
+down_revision = '246b22be7a58'
+branch_labels = None
+depends_on = None
+
+TABLE = "user_offers_for_cleanings"
+INDEX = "ix_user_offers_for_cleanings_cleaning_keyset"
+# a cleaning's offers in the order its owner pages through them
+COLUMNS = "cleaning_id, offer_status_priority(status), created_at, user_id"
+
+
+def create_status_priority_function() -> None:
+    """
+    Where each status sorts when an owner looks at their cleaning's offers,
+    the one they accepted first and the ones they rejected last. Immutable,
+    so it can be indexed, and NULL for NULL, so a missing cursor falls
+    through to a COALESCE.
+    """
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION offer_status_priority(status text)
+            RETURNS smallint AS
+        $$
+            SELECT CAST(CASE status
+                WHEN 'accepted' THEN 0
+                WHEN 'pending' THEN 1
+                WHEN 'completed' THEN 2
+                WHEN 'cancelled' THEN 3
+                WHEN 'rejected' THEN 4
+            END AS smallint);
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+        """
+    )
+
+
+def list_partitions(table: str) -> List[str]:
+    return [
+        name for (name,) in op.get_bind().execute(
+            sa.text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                    INNER JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+                ORDER BY c.relname;
+                """
+            ),
+            {"table": table},
+        )
+    ]
+
+
+def upgrade() -> None:
+    """
+    Built the same way as ix_user_offers_for_cleanings_user_keyset: every
+    partition's index concurrently, then attached to the parent's.
+    """
+    create_status_priority_function()
+
+    if op.get_context().as_sql:
+        op.execute(f"CREATE INDEX {INDEX} ON {TABLE} ({COLUMNS});")
+        return
+
+    partitions = list_partitions(TABLE)
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY {TABLE} ({COLUMNS});")
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {partition}_cleaning_keyset;")
+            op.execute(f"CREATE INDEX CONCURRENTLY {partition}_cleaning_keyset ON {partition} ({COLUMNS});")
+
+    for partition in partitions:
+        op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_cleaning_keyset;")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX {INDEX};")
+    op.execute("DROP FUNCTION offer_status_priority(text);")
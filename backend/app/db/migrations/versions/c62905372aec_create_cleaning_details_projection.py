@@ -0,0 +1,250 @@
+"""create_cleaning_details_projection
+Revision ID: c62905372aec
+Revises: 6d0b145acd70
+Create Date: 2026-10-19 19:56:13.480251
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = 'c62905372aec'
+down_revision = '6d0b145acd70'
+branch_labels = None
+depends_on = None
+
+# the owner fields a detail document carries, only changes to these re-render the owner's cleanings
+PROJECTED_USER_COLUMNS = ("username", "email", "email_verified", "is_active", "is_superuser")
+
+
+def create_cleaning_detail_documents_view() -> None:
+    """
+    What every live cleaning's detail document should be, shaped like a
+    CleaningPublic with its owner populated. The projection is refreshed
+    from it and checked against it. The owner's updated_at is left out, it
+    moves with password changes that shouldn't re-render their cleanings.
+    """
+    op.execute(
+        """
+        CREATE VIEW cleaning_detail_documents AS
+        SELECT c.id,
+               c.owner,
+               jsonb_build_object(
+                   'id', c.id,
+                   'name', c.name,
+                   'description', c.description,
+                   'price', c.price,
+                   'cleaning_type', c.cleaning_type,
+                   'created_at', c.created_at,
+                   'updated_at', c.updated_at,
+                   'owner', CASE WHEN u.id IS NULL THEN to_jsonb(c.owner) ELSE jsonb_build_object(
+                       'id', u.id,
+                       'username', u.username,
+                       'email', u.email,
+                       'email_verified', u.email_verified,
+                       'is_active', u.is_active,
+                       'is_superuser', u.is_superuser,
+                       'created_at', u.created_at,
+                       'profile', CASE WHEN p.id IS NULL THEN NULL ELSE jsonb_build_object(
+                           'id', p.id,
+                           'full_name', p.full_name,
+                           'phone_number', p.phone_number,
+                           'bio', p.bio,
+                           'image', p.image,
+                           'user_id', u.id,
+                           'username', u.username,
+                           'email', u.email,
+                           'created_at', p.created_at,
+                           'updated_at', p.updated_at
+                       ) END
+                   ) END,
+                   'offer_counts', COALESCE(offer_counts.by_status, '{}'::jsonb)
+               ) AS document
+        FROM cleanings c
+            LEFT JOIN users u ON u.id = c.owner
+            LEFT JOIN profiles p ON p.user_id = u.id
+            LEFT JOIN LATERAL (
+                SELECT jsonb_object_agg(status, total) AS by_status
+                FROM (
+                    -- offers can't predate their cleaning, which prunes older partitions
+                    SELECT status, count(*) AS total
+                    FROM user_offers_for_cleanings
+                    WHERE cleaning_id = c.id AND created_at >= c.created_at
+                    GROUP BY status
+                ) AS counts
+            ) AS offer_counts ON TRUE
+        WHERE c.deleted_at IS NULL;
+        """
+    )
+
+
+def create_refresh_function() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION refresh_cleaning_details(cleaning_ids uuid[])
+            RETURNS void AS
+        $$
+        BEGIN
+            DELETE FROM cleaning_details d
+            WHERE d.id = ANY(cleaning_ids)
+            AND NOT EXISTS (SELECT 1 FROM cleanings c WHERE c.id = d.id AND c.deleted_at IS NULL);
+
+            -- rows are locked in id order, so concurrent refreshes of overlapping cleanings can't deadlock
+            INSERT INTO cleaning_details (id, owner, document, refreshed_at)
+            SELECT id, owner, document, now()
+            FROM cleaning_detail_documents
+            WHERE id = ANY(cleaning_ids)
+            ORDER BY id
+            ON CONFLICT (id) DO UPDATE
+            SET owner        = EXCLUDED.owner,
+                document     = EXCLUDED.document,
+                refreshed_at = EXCLUDED.refreshed_at
+            WHERE cleaning_details.document IS DISTINCT FROM EXCLUDED.document;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+
+def create_sync_triggers() -> None:
+    """
+    Every write to the tables a detail document is built from refreshes the
+    documents it touches, in the same transaction.
+    """
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_cleaning_details_from_cleanings()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            PERFORM refresh_cleaning_details(ARRAY[NEW.id]);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER sync_cleaning_details
+            AFTER INSERT OR UPDATE
+            ON cleanings
+            FOR EACH ROW
+        EXECUTE PROCEDURE sync_cleaning_details_from_cleanings();
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_cleaning_details_from_owner()
+            RETURNS TRIGGER AS
+        $$
+        DECLARE
+            owner_id uuid;
+        BEGIN
+            -- NEW has no user_id on users, so it's only read on the branch that has one
+            IF TG_TABLE_NAME = 'users' THEN
+                owner_id := NEW.id;
+            ELSE
+                owner_id := NEW.user_id;
+            END IF;
+
+            PERFORM refresh_cleaning_details(ARRAY(
+                SELECT id FROM cleanings WHERE owner = owner_id AND deleted_at IS NULL
+            ));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER sync_cleaning_details
+            AFTER UPDATE OF {columns}
+            ON users
+            FOR EACH ROW
+            WHEN (({old}) IS DISTINCT FROM ({new}))
+        EXECUTE PROCEDURE sync_cleaning_details_from_owner();
+
+        CREATE TRIGGER sync_cleaning_details
+            AFTER INSERT OR UPDATE
+            ON profiles
+            FOR EACH ROW
+        EXECUTE PROCEDURE sync_cleaning_details_from_owner();
+        """.format(
+            columns=", ".join(PROJECTED_USER_COLUMNS),
+            old=", ".join(f"OLD.{column}" for column in PROJECTED_USER_COLUMNS),
+            new=", ".join(f"NEW.{column}" for column in PROJECTED_USER_COLUMNS),
+        )
+    )
+    # statement level, so rejecting every other offer refreshes the cleaning once, not once per offer
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION sync_cleaning_details_from_offers()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM refresh_cleaning_details(ARRAY(SELECT DISTINCT cleaning_id FROM old_offers));
+            ELSE
+                PERFORM refresh_cleaning_details(ARRAY(SELECT DISTINCT cleaning_id FROM new_offers));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER sync_cleaning_details_on_insert
+            AFTER INSERT
+            ON user_offers_for_cleanings
+            REFERENCING NEW TABLE AS new_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE sync_cleaning_details_from_offers();
+
+        CREATE TRIGGER sync_cleaning_details_on_update
+            AFTER UPDATE
+            ON user_offers_for_cleanings
+            REFERENCING NEW TABLE AS new_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE sync_cleaning_details_from_offers();
+
+        CREATE TRIGGER sync_cleaning_details_on_delete
+            AFTER DELETE
+            ON user_offers_for_cleanings
+            REFERENCING OLD TABLE AS old_offers
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE sync_cleaning_details_from_offers();
+        """
+    )
+
+
+def upgrade() -> None:
+    """
+    A cleaning_details row per live cleaning, holding the cleaning, its
+    owner with their profile and its offer counts as one JSONB document,
+    so a cleaning's detail page is a single primary key read.
+    """
+    op.create_table(
+        "cleaning_details",
+        sa.Column("id", postgresql.UUID, sa.ForeignKey("cleanings.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("owner", postgresql.UUID, nullable=True, index=True),
+        sa.Column("document", postgresql.JSONB, nullable=False),
+        sa.Column("refreshed_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    create_cleaning_detail_documents_view()
+    create_refresh_function()
+
+    op.execute(
+        """
+        INSERT INTO cleaning_details (id, owner, document)
+        SELECT id, owner, document
+        FROM cleaning_detail_documents;
+        """
+    )
+    create_sync_triggers()
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER sync_cleaning_details_on_delete ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER sync_cleaning_details_on_update ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER sync_cleaning_details_on_insert ON user_offers_for_cleanings;")
+    op.execute("DROP TRIGGER sync_cleaning_details ON profiles;")
+    op.execute("DROP TRIGGER sync_cleaning_details ON users;")
+    op.execute("DROP TRIGGER sync_cleaning_details ON cleanings;")
+    op.execute("DROP FUNCTION sync_cleaning_details_from_offers();")
+    op.execute("DROP FUNCTION sync_cleaning_details_from_owner();")
+    op.execute("DROP FUNCTION sync_cleaning_details_from_cleanings();")
+    op.execute("DROP FUNCTION refresh_cleaning_details(uuid[]);")
+    op.execute("DROP VIEW cleaning_detail_documents;")
+    op.drop_table("cleaning_details")
@@ -0,0 +1,61 @@
+"""index_completed_offers_by_updated_at
+Revision ID: d41f3b27c9e5
+Revises: 133caceef94d
+Create Date: 2026-10-20 09:12:44.108392
+"""
+from typing import List
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'd41f3b27c9e5'
+down_revision = '133caceef94d'
+branch_labels = None
+depends_on = None
+
+TABLE = "user_offers_for_cleanings"
+INDEX = "ix_user_offers_for_cleanings_completed_updated_at"
+# the archiver looks for offers completed before a cutoff, ix_cleanings_deleted_at covers deleted cleanings
+DEFINITION = "(updated_at) WHERE status = 'completed'"
+
+
+def list_partitions(table: str) -> List[str]:
+    return [
+        name for (name,) in op.get_bind().execute(
+            sa.text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                    INNER JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+                ORDER BY c.relname;
+                """
+            ),
+            {"table": table},
+        )
+    ]
+
+
+def upgrade() -> None:
+    """
+    Built the same way as ix_user_offers_for_cleanings_user_keyset: every
+    partition's index concurrently, then attached to the parent's.
+    """
+    if op.get_context().as_sql:
+        op.execute(f"CREATE INDEX {INDEX} ON {TABLE} {DEFINITION};")
+        return
+
+    partitions = list_partitions(TABLE)
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY {TABLE} {DEFINITION};")
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {partition}_completed_updated_at;")
+            op.execute(f"CREATE INDEX CONCURRENTLY {partition}_completed_updated_at ON {partition} {DEFINITION};")
+
+    for partition in partitions:
+        op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_completed_updated_at;")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX {INDEX};")
@@ -0,0 +1,27 @@
+"""index_archived_offers_by_user_keyset
+Revision ID: e7a0c5d2b913
+Revises: d41f3b27c9e5
+Create Date: 2026-10-20 10:03:27.915604
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'e7a0c5d2b913'
+down_revision = 'd41f3b27c9e5'
+branch_labels = None
+depends_on = None
+
+TABLE = "user_offers_for_cleanings_archive"
+INDEX = "ix_user_offers_for_cleanings_archive_user_keyset"
+# same order as ix_user_offers_for_cleanings_user_keyset, so a cleaner's archived offers page the same way
+COLUMNS = "user_id, created_at, cleaning_id"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX};")
+        op.execute(f"CREATE INDEX CONCURRENTLY {INDEX} ON {TABLE} ({COLUMNS});")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX {INDEX};")
@@ -0,0 +1,346 @@
+"""migrate_ids_to_native_uuid
+Revision ID: f8afeb36f10f
+Revises: b1e6c40208e2
+Create Date: 2026-10-19 16:02:18.311472
+"""
+from typing import Dict, List, NamedTuple, Tuple
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = 'f8afeb36f10f'
+down_revision = 'b1e6c40208e2'
+branch_labels = None
+depends_on = None
+
+# rows updated per backfill statement, each batch commits on its own
+BACKFILL_BATCH_SIZE = 5000
+# the swap gives up instead of queueing every request behind its locks,
+# everything before it can be re-run, so retry the migration when it does
+SWAP_LOCK_TIMEOUT = "5s"
+
+
+class KeyColumn(NamedTuple):
+    table: str
+    column: str
+    nullable: bool = False
+
+
+class Index(NamedTuple):
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+
+
+class ForeignKey(NamedTuple):
+    name: str
+    table: str
+    column: str
+    referred_table: str
+    ondelete: str
+
+
+KEY_COLUMNS = [
+    KeyColumn("users", "id"),
+    KeyColumn("profiles", "id"),
+    KeyColumn("profiles", "user_id", nullable=True),
+    KeyColumn("cleanings", "id"),
+    KeyColumn("cleanings", "owner", nullable=True),
+    KeyColumn("user_offers_for_cleanings", "user_id"),
+    KeyColumn("user_offers_for_cleanings", "cleaning_id"),
+    KeyColumn("cleaning_to_cleaner_evaluations", "cleaning_id"),
+    KeyColumn("cleaning_to_cleaner_evaluations", "cleaner_id"),
+    KeyColumn("refresh_tokens", "id"),
+    KeyColumn("refresh_tokens", "user_id"),
+    KeyColumn("refresh_tokens", "family_id"),
+    KeyColumn("refresh_tokens", "replaced_by", nullable=True),
+]
+
+PRIMARY_KEYS = [
+    Index("users_pkey", "users", ("id",)),
+    Index("profiles_pkey", "profiles", ("id",)),
+    Index("cleanings_pkey", "cleanings", ("id",)),
+    Index("pk_user_offers_for_cleanings", "user_offers_for_cleanings", ("user_id", "cleaning_id")),
+    Index("pk_cleaning_to_cleaner_evaluations", "cleaning_to_cleaner_evaluations", ("cleaning_id", "cleaner_id")),
+    Index("refresh_tokens_pkey", "refresh_tokens", ("id",)),
+]
+
+INDEXES = [
+    Index("ix_profiles_user_id_unique", "profiles", ("user_id",), unique=True),
+    Index("ix_user_offers_for_cleanings_user_id", "user_offers_for_cleanings", ("user_id",)),
+    Index("ix_user_offers_for_cleanings_cleaning_id", "user_offers_for_cleanings", ("cleaning_id",)),
+    Index("ix_cleaning_to_cleaner_evaluations_cleaning_id", "cleaning_to_cleaner_evaluations", ("cleaning_id",)),
+    Index("ix_cleaning_to_cleaner_evaluations_cleaner_id", "cleaning_to_cleaner_evaluations", ("cleaner_id",)),
+    Index("ix_refresh_tokens_user_id", "refresh_tokens", ("user_id",)),
+    Index("ix_refresh_tokens_family_id", "refresh_tokens", ("family_id",)),
+]
+
+FOREIGN_KEYS = [
+    ForeignKey("profiles_user_id_fkey", "profiles", "user_id", "users", "CASCADE"),
+    ForeignKey("cleanings_owner_fkey", "cleanings", "owner", "users", "CASCADE"),
+    ForeignKey("user_offers_for_cleanings_user_id_fkey", "user_offers_for_cleanings", "user_id", "users", "CASCADE"),
+    ForeignKey(
+        "user_offers_for_cleanings_cleaning_id_fkey", "user_offers_for_cleanings", "cleaning_id", "cleanings", "CASCADE"
+    ),
+    ForeignKey(
+        "cleaning_to_cleaner_evaluations_cleaning_id_fkey",
+        "cleaning_to_cleaner_evaluations", "cleaning_id", "cleanings", "SET NULL",
+    ),
+    ForeignKey(
+        "cleaning_to_cleaner_evaluations_cleaner_id_fkey",
+        "cleaning_to_cleaner_evaluations", "cleaner_id", "users", "SET NULL",
+    ),
+    ForeignKey("refresh_tokens_user_id_fkey", "refresh_tokens", "user_id", "users", "CASCADE"),
+]
+
+
+def shadow(column: str) -> str:
+    return f"{column}__uuid"
+
+
+def shadow_index(name: str) -> str:
+    return f"{name}__uuid"
+
+
+def not_null_check(key_column: KeyColumn) -> str:
+    return f"ck_{key_column.table}_{key_column.column}__uuid_not_null"
+
+
+def key_columns_by_table() -> Dict[str, List[KeyColumn]]:
+    tables: Dict[str, List[KeyColumn]] = {}
+    for key_column in KEY_COLUMNS:
+        tables.setdefault(key_column.table, []).append(key_column)
+    return tables
+
+
+def set_updated_at_trigger(*, skip_while_backfilling: bool) -> None:
+    # the backfill rewrites every row, which mustn't look like an edit to
+    # conditional requests, caches or the feed
+    skip = (
+        "IF current_setting('app.backfilling', true) = 'on' THEN RETURN NEW; END IF;"
+        if skip_while_backfilling else ""
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION update_updated_at_column()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            {skip}
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+
+
+def add_shadow_columns() -> None:
+    """
+    Adds an empty uuid column next to every CHAR(36) key, a catalog-only
+    change, and a trigger that keeps it in step with whatever the running
+    app writes to the old column.
+    """
+    op.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}';")
+
+    for table, key_columns in key_columns_by_table().items():
+        columns = ", ".join(f"ADD COLUMN IF NOT EXISTS {shadow(c.column)} uuid" for c in key_columns)
+        op.execute(f"ALTER TABLE {table} {columns};")
+
+        assignments = "\n".join(
+            f"NEW.{shadow(c.column)} = CAST(NEW.{c.column} AS uuid);" for c in key_columns
+        )
+        op.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION sync_{table}_uuid_keys()
+                RETURNS TRIGGER AS
+            $$
+            BEGIN
+                {assignments}
+                RETURN NEW;
+            END;
+            $$ language 'plpgsql';
+            """
+        )
+        op.execute(f"DROP TRIGGER IF EXISTS sync_{table}_uuid_keys ON {table};")
+        op.execute(
+            f"""
+            CREATE TRIGGER sync_{table}_uuid_keys
+                BEFORE INSERT OR UPDATE
+                ON {table}
+                FOR EACH ROW
+            EXECUTE PROCEDURE sync_{table}_uuid_keys();
+            """
+        )
+
+
+def backfill_table(table: str, key_columns: List[KeyColumn], primary_key: Tuple[str, ...]) -> None:
+    """
+    Walks the table in primary key order, one short committed UPDATE per
+    batch, so no statement holds row locks for long or bloats a single
+    transaction.
+    """
+    assignments = ", ".join(f"{shadow(c.column)} = CAST({c.column} AS uuid)" for c in key_columns)
+    key = ", ".join(primary_key)
+
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} SET {assignments};")
+        return
+
+    connection = op.get_bind()
+    after, after_params = None, {}
+
+    while True:
+        upper = connection.execute(
+            sa.text(
+                f"SELECT {key} FROM {table} {f'WHERE {after}' if after else ''} "
+                f"ORDER BY {key} OFFSET :offset LIMIT 1"
+            ),
+            {**after_params, "offset": BACKFILL_BATCH_SIZE - 1},
+        ).fetchone()
+
+        conditions = [after] if after else []
+        upper_params = {f"upper_{c}": value for c, value in zip(primary_key, upper or ())}
+        if upper is not None:
+            conditions.append(f"({key}) <= ({', '.join(':' + p for p in upper_params)})")
+
+        connection.execute(
+            sa.text(f"UPDATE {table} SET {assignments} {'WHERE ' + ' AND '.join(conditions) if conditions else ''}"),
+            {**after_params, **upper_params},
+        )
+
+        if upper is None:
+            return
+
+        after_params = {f"after_{c}": value for c, value in zip(primary_key, upper)}
+        after = f"({key}) > ({', '.join(':' + p for p in after_params)})"
+
+
+def backfill_shadow_columns() -> None:
+    primary_keys = {pk.table: pk.columns for pk in PRIMARY_KEYS}
+
+    op.execute("SET app.backfilling = 'on';")
+    for table, key_columns in key_columns_by_table().items():
+        backfill_table(table, key_columns, primary_keys[table])
+    op.execute("RESET app.backfilling;")
+
+
+def validate_shadow_columns() -> None:
+    # lets SET NOT NULL during the swap skip its full table scan
+    op.execute(f"SET lock_timeout = '{SWAP_LOCK_TIMEOUT}';")
+    for key_column in KEY_COLUMNS:
+        if key_column.nullable:
+            continue
+
+        check = not_null_check(key_column)
+        op.execute(
+            f"""
+            ALTER TABLE {key_column.table}
+                DROP CONSTRAINT IF EXISTS {check},
+                ADD CONSTRAINT {check} CHECK ({shadow(key_column.column)} IS NOT NULL) NOT VALID;
+            """
+        )
+        op.execute(f"ALTER TABLE {key_column.table} VALIDATE CONSTRAINT {check};")
+    op.execute("RESET lock_timeout;")
+
+
+def build_shadow_indexes() -> None:
+    for index in PRIMARY_KEYS + INDEXES:
+        unique = "UNIQUE " if index.unique or index in PRIMARY_KEYS else ""
+        columns = ", ".join(shadow(c) for c in index.columns)
+
+        # an earlier, interrupted run leaves an invalid index behind
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {shadow_index(index.name)};")
+        op.execute(
+            f"CREATE {unique}INDEX CONCURRENTLY {shadow_index(index.name)} ON {index.table} ({columns});"
+        )
+
+
+def swap_columns() -> None:
+    """
+    Everything here is catalog work on already built and validated objects,
+    the only scan left is the foreign key validation that runs afterwards.
+    """
+    op.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}';")
+
+    for fk in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {fk.table} DROP CONSTRAINT {fk.name};")
+    for pk in PRIMARY_KEYS:
+        op.execute(f"ALTER TABLE {pk.table} DROP CONSTRAINT {pk.name};")
+    for table in key_columns_by_table():
+        op.execute(f"DROP TRIGGER sync_{table}_uuid_keys ON {table};")
+        op.execute(f"DROP FUNCTION sync_{table}_uuid_keys;")
+
+    for key_column in KEY_COLUMNS:
+        table, column = key_column.table, key_column.column
+        # drops the old indexes with it
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {column};")
+        op.execute(f"ALTER TABLE {table} RENAME COLUMN {shadow(column)} TO {column};")
+
+        if not key_column.nullable:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL;")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {not_null_check(key_column)};")
+
+    for pk in PRIMARY_KEYS:
+        op.execute(f"ALTER TABLE {pk.table} ADD CONSTRAINT {pk.name} PRIMARY KEY USING INDEX {shadow_index(pk.name)};")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {shadow_index(index.name)} RENAME TO {index.name};")
+    for fk in FOREIGN_KEYS:
+        op.execute(
+            f"""
+            ALTER TABLE {fk.table}
+                ADD CONSTRAINT {fk.name} FOREIGN KEY ({fk.column})
+                REFERENCES {fk.referred_table} (id) ON DELETE {fk.ondelete}
+                NOT VALID;
+            """
+        )
+
+
+def validate_foreign_keys() -> None:
+    # SHARE UPDATE EXCLUSIVE only, reads and writes carry on while it scans
+    for fk in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {fk.table} VALIDATE CONSTRAINT {fk.name};")
+
+
+def upgrade() -> None:
+    """
+    Moves every CHAR(36) id to a native uuid column without rewriting a
+    table under an exclusive lock: expand with synced shadow columns,
+    backfill in batches, build indexes concurrently, then swap in one short
+    transaction.
+    """
+    set_updated_at_trigger(skip_while_backfilling=True)
+    add_shadow_columns()
+
+    with op.get_context().autocommit_block():
+        backfill_shadow_columns()
+        validate_shadow_columns()
+        build_shadow_indexes()
+
+    swap_columns()
+    set_updated_at_trigger(skip_while_backfilling=False)
+
+    with op.get_context().autocommit_block():
+        validate_foreign_keys()
+
+
+def downgrade() -> None:
+    # rewrites the tables under an exclusive lock, take the API offline first
+    for fk in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {fk.table} DROP CONSTRAINT {fk.name};")
+
+    for table, key_columns in key_columns_by_table().items():
+        columns = ", ".join(
+            f"ALTER COLUMN {c.column} TYPE CHAR(36) USING CAST({c.column} AS text)" for c in key_columns
+        )
+        op.execute(f"ALTER TABLE {table} {columns};")
+
+    for fk in FOREIGN_KEYS:
+        op.execute(
+            f"""
+            ALTER TABLE {fk.table}
+                ADD CONSTRAINT {fk.name} FOREIGN KEY ({fk.column})
+                REFERENCES {fk.referred_table} (id) ON DELETE {fk.ondelete};
+            """
+        )
@@ -0,0 +1,192 @@
+import time
+import asyncio
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from databases import Database, DatabaseURL
+
+from app.core.config import (
+    DB_ANALYTICAL_POOL_SIZE,
+    DB_ANALYTICAL_STATEMENT_TIMEOUT_MS,
+    DB_AUTH_POOL_SIZE,
+    DB_AUTH_STATEMENT_TIMEOUT_MS,
+    DB_TRANSACTIONAL_POOL_SIZE,
+    DB_TRANSACTIONAL_STATEMENT_TIMEOUT_MS,
+)
+from app.core.deadlines import DeadlineExceeded, get_request_deadline
+
+# token lookups and logins, small, fast and never behind a slow query
+AUTH_POOL = "auth"
+# everything else a request does, the default
+TRANSACTIONAL_POOL = "transactional"
+# the feed union query, evaluation aggregates and other heavy reads
+ANALYTICAL_POOL = "analytical"
+
+
+class PoolSettings(NamedTuple):
+    max_size: int
+    statement_timeout_ms: int
+
+    @property
+    def min_size(self) -> int:
+        return min(2, self.max_size)
+
+
+def get_pool_settings() -> Dict[str, PoolSettings]:
+    return {
+        AUTH_POOL: PoolSettings(DB_AUTH_POOL_SIZE, DB_AUTH_STATEMENT_TIMEOUT_MS),
+        TRANSACTIONAL_POOL: PoolSettings(DB_TRANSACTIONAL_POOL_SIZE, DB_TRANSACTIONAL_STATEMENT_TIMEOUT_MS),
+        ANALYTICAL_POOL: PoolSettings(DB_ANALYTICAL_POOL_SIZE, DB_ANALYTICAL_STATEMENT_TIMEOUT_MS),
+    }
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.acquisitions = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquisitions += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "acquisitions": self.acquisitions,
+            "wait_avg_ms": round(self.wait_total / self.acquisitions * 1000, 2) if self.acquisitions else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+def get_asyncpg_pool(database: Database) -> Optional[Any]:
+    pool = getattr(getattr(database, "_backend", None), "_pool", None)
+    return pool if hasattr(pool, "acquire") else None
+
+
+def instrument_pool_wait(database: Database, on_wait: Callable[[float], None]) -> None:
+    """
+    Reports how long every connection checkout waited on the pool. `databases`
+    acquires a connection per query, or per transaction, through
+    `await pool.acquire()`.
+    """
+    pool = get_asyncpg_pool(database)
+    if pool is None:
+        return
+
+    acquire = pool.acquire
+
+    async def timed_acquire(*args, **kwargs):
+        started = time.monotonic()
+        try:
+            return await acquire(*args, **kwargs)
+        finally:
+            on_wait(time.monotonic() - started)
+
+    pool.acquire = timed_acquire
+
+
+def apply_request_deadlines(database: Database, *, statement_timeout_ms: int) -> None:
+    """
+    Bounds the checkout by the current request's deadline and lowers the
+    connection's statement_timeout to what is left of it. The pool's
+    `RESET ALL` on release restores the pool's own timeout.
+    """
+    pool = get_asyncpg_pool(database)
+    if pool is None:
+        return
+
+    acquire = pool.acquire
+
+    async def acquire_within_deadline(*args, **kwargs):
+        deadline = get_request_deadline()
+        if deadline is None:
+            return await acquire(*args, **kwargs)
+
+        try:
+            connection = await acquire(*args, timeout=max(deadline.remaining(), 0.001), **kwargs)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded()
+
+        timeout_ms = int(deadline.remaining() * 1000)
+        try:
+            if timeout_ms <= 0:
+                raise DeadlineExceeded()
+            if timeout_ms < statement_timeout_ms:
+                await connection.execute(
+                    "SELECT set_config('statement_timeout', $1, false);", str(timeout_ms))
+        except BaseException:
+            await pool.release(connection)
+            raise
+
+        return connection
+
+    pool.acquire = acquire_within_deadline
+
+
+class DatabasePools:
+    """
+    Named connection pools, each with its own size and statement timeout, so
+    a burst of slow analytical queries can't starve token lookups. A pool
+    configured with size 0 is served by the transactional pool.
+    """
+
+    def __init__(self, url: DatabaseURL, *, settings: Optional[Dict[str, PoolSettings]] = None) -> None:
+        self.settings = settings if settings is not None else get_pool_settings()
+        self.databases: Dict[str, Database] = {}
+        self.metrics: Dict[str, PoolMetrics] = {}
+
+        for name, pool_settings in self.settings.items():
+            if pool_settings.max_size <= 0 and name != TRANSACTIONAL_POOL:
+                continue
+
+            self.databases[name] = Database(
+                url,
+                min_size=pool_settings.min_size,
+                max_size=max(pool_settings.max_size, 1),
+                server_settings={"statement_timeout": str(pool_settings.statement_timeout_ms)},
+            )
+            self.metrics[name] = PoolMetrics()
+
+    @property
+    def default(self) -> Database:
+        return self.databases[TRANSACTIONAL_POOL]
+
+    def get(self, name: str) -> Database:
+        return self.databases.get(name, self.default)
+
+    async def connect(self, *, on_wait: Optional[Callable[[float], None]] = None) -> None:
+        connected: List[Database] = []
+        try:
+            for name, database in self.databases.items():
+                await database.connect()
+                connected.append(database)
+
+                instrument_pool_wait(database, self.metrics[name].record_wait)
+                if on_wait:
+                    instrument_pool_wait(database, on_wait)
+                # outermost, so the waits above don't include the SET it may issue
+                apply_request_deadlines(
+                    database, statement_timeout_ms=self.settings[name].statement_timeout_ms)
+        except Exception:
+            for database in connected:
+                await database.disconnect()
+            raise
+
+    async def disconnect(self) -> None:
+        for database in self.databases.values():
+            await database.disconnect()
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        stats = {}
+
+        for name, database in self.databases.items():
+            pool = get_asyncpg_pool(database)
+            stats[name] = {
+                "max_size": self.settings[name].max_size,
+                "statement_timeout_ms": self.settings[name].statement_timeout_ms,
+                "size": pool.get_size() if pool is not None else 0,
+                "idle": pool.get_idle_size() if pool is not None else 0,
+                **self.metrics[name].stats(),
+            }
+
+        return stats
@@ -1,6 +1,14 @@
 from databases import Database
 
+from app.db.ids import IdGenerator, get_id_generator
+from app.db.pools import TRANSACTIONAL_POOL
+
 
 class BaseRepository:
+    # which of the named connection pools get_repository hands this repository
+    pool = TRANSACTIONAL_POOL
+    # ids for new rows, shared by every repository
+    generate_id: IdGenerator = staticmethod(get_id_generator())
+
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -0,0 +1,83 @@
+import datetime
+from typing import Optional
+
+from app.db.repositories.base import BaseRepository
+
+GET_FIRST_EVALUATION_DAY_QUERY = """
+    SELECT CAST(min(created_at) AT TIME ZONE 'UTC' AS date)
+    FROM cleaning_to_cleaner_evaluations;
+"""
+
+# holds off new evaluations, and the trigger rolling them up, until the rebuilt days commit
+LOCK_EVALUATIONS_QUERY = """
+    LOCK TABLE cleaning_to_cleaner_evaluations IN SHARE MODE;
+"""
+
+DELETE_CLEANER_DAILY_RATINGS_QUERY = """
+    DELETE FROM cleaner_daily_ratings
+    WHERE day >= :first_day AND day < :end_day;
+"""
+
+ROLL_UP_CLEANER_DAILY_RATINGS_QUERY = """
+    WITH rolled_up AS (
+        INSERT INTO cleaner_daily_ratings (
+            cleaner_id,
+            day,
+            evaluations,
+            no_shows,
+            professionalism_sum,
+            professionalism_count,
+            completeness_sum,
+            completeness_count,
+            efficiency_sum,
+            efficiency_count,
+            overall_rating_sum,
+            one_stars,
+            two_stars,
+            three_stars,
+            four_stars,
+            five_stars
+        )
+        SELECT cleaner_id,
+               CAST(created_at AT TIME ZONE 'UTC' AS date) AS day,
+               count(*),
+               count(*) FILTER (WHERE no_show),
+               COALESCE(sum(professionalism), 0),
+               count(professionalism),
+               COALESCE(sum(completeness), 0),
+               count(completeness),
+               COALESCE(sum(efficiency), 0),
+               count(efficiency),
+               sum(overall_rating),
+               count(*) FILTER (WHERE overall_rating = 1),
+               count(*) FILTER (WHERE overall_rating = 2),
+               count(*) FILTER (WHERE overall_rating = 3),
+               count(*) FILTER (WHERE overall_rating = 4),
+               count(*) FILTER (WHERE overall_rating = 5)
+        FROM cleaning_to_cleaner_evaluations
+        -- bounds on created_at itself, so only the partitions holding these days are read
+        WHERE created_at >= CAST(CAST(:first_day AS date) AS timestamp) AT TIME ZONE 'UTC'
+        AND created_at < CAST(CAST(:end_day AS date) AS timestamp) AT TIME ZONE 'UTC'
+        GROUP BY cleaner_id, day
+        RETURNING 1
+    )
+    SELECT count(*) FROM rolled_up;
+"""
+
+
+class CleanerRatingsRepository(BaseRepository):
+    async def get_first_evaluation_day(self) -> Optional[datetime.date]:
+        return await self.db.fetch_val(query=GET_FIRST_EVALUATION_DAY_QUERY)
+
+    async def rebuild_days(self, *, first_day: datetime.date, end_day: datetime.date) -> int:
+        """
+        Replaces the rollup rows of every day from `first_day` up to, not
+        including, `end_day` with ones counted from the evaluations themselves.
+        Returns how many rows were written.
+        """
+        values = {"first_day": first_day, "end_day": end_day}
+
+        async with self.db.transaction():
+            await self.db.execute(query=LOCK_EVALUATIONS_QUERY)
+            await self.db.execute(query=DELETE_CLEANER_DAILY_RATINGS_QUERY, values=values)
+            return await self.db.fetch_val(query=ROLL_UP_CLEANER_DAILY_RATINGS_QUERY, values=values)
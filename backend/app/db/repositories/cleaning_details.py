@@ -0,0 +1,62 @@
+from typing import List, Optional
+
+from app.db.repositories.base import BaseRepository
+from app.models.cleaning import CleaningDetailDrift
+
+# compares one keyset batch of live cleanings with what their documents should be
+FIND_DRIFTED_CLEANING_DETAILS_QUERY = """
+    WITH batch AS (
+        SELECT id
+        FROM cleanings
+        WHERE id > CAST(:after AS uuid) AND deleted_at IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+    )
+    SELECT b.id,
+           CASE WHEN d.id IS NULL THEN 'missing'
+                WHEN d.document IS DISTINCT FROM s.document THEN 'stale'
+           END AS drift
+    FROM batch b
+        INNER JOIN cleaning_detail_documents s ON s.id = b.id
+        LEFT JOIN cleaning_details d ON d.id = b.id
+    ORDER BY b.id;
+"""
+
+# rows the cleanings trigger should have removed when their cleaning was deleted
+FIND_ORPHANED_CLEANING_DETAILS_QUERY = """
+    SELECT d.id, 'orphaned' AS drift
+    FROM cleaning_details d
+        INNER JOIN cleanings c ON c.id = d.id
+    WHERE c.deleted_at IS NOT NULL;
+"""
+
+REFRESH_CLEANING_DETAILS_QUERY = """
+    SELECT refresh_cleaning_details(CAST(:ids AS uuid[]));
+"""
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+class CleaningDetailsRepository(BaseRepository):
+    async def find_drift(
+        self, *, after: Optional[str] = None, batch_size: int
+    ) -> List[CleaningDetailDrift]:
+        """
+        Checks up to `batch_size` live cleanings with ids above `after` and
+        returns every one of them, with `drift` set where the projection is off.
+        """
+        records = await self.db.fetch_all(
+            query=FIND_DRIFTED_CLEANING_DETAILS_QUERY,
+            values={"after": after or NIL_UUID, "batch_size": batch_size}
+        )
+
+        return [CleaningDetailDrift(**r) for r in records]
+
+    async def find_orphans(self) -> List[CleaningDetailDrift]:
+        records = await self.db.fetch_all(query=FIND_ORPHANED_CLEANING_DETAILS_QUERY)
+
+        return [CleaningDetailDrift(**r) for r in records]
+
+    async def refresh(self, *, ids: List[str]) -> None:
+        if ids:
+            await self.db.execute(query=REFRESH_CLEANING_DETAILS_QUERY, values={"ids": ids})
@@ -1,4 +1,6 @@
-from typing import List, Union
+import json
+import datetime
+from typing import Dict, List, Optional, Union
 from databases.core import Database
 
 from fastapi.exceptions import HTTPException
@@ -6,7 +8,7 @@ from starlette import status
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN
 from app.db.repositories.base import BaseRepository
 from app.models.cleaning import CleaningCreate, CleaningPublic, CleaningUpdate, CleaningInDB
-from uuid import uuid4
+from app.models.core import is_valid_uuid
 
 from app.models.user import UserInDB
 from app.db.repositories.users import UsersRepository
@@ -15,24 +17,77 @@ from app.db.repositories.users import UsersRepository
 CREATE_CLEANING_QUERY = """
     INSERT INTO cleanings (id, name, description, price, cleaning_type, owner)
     VALUES (:id, :name, :description, :price, :cleaning_type, :owner)
-    RETURNING id, name, description, price, cleaning_type, owner, created_at ,updated_at;
+    RETURNING id, name, description, price, cleaning_type, owner, created_at ,updated_at,
+              pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers;
 """
 
+# soft deleted cleanings are left out everywhere, the partial indexes skip them too
 GET_CLEANING_BY_ID_QUERY = """
-    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
     FROM cleanings
-    WHERE id = :id;
+    WHERE id = :id AND deleted_at IS NULL;
+"""
+
+# the cleaning with its owner and profile, kept in sync by triggers. Offer counts
+# move too often to re-render the document for, so they come from the cleanings row
+GET_CLEANING_DETAIL_BY_ID_QUERY = """
+    SELECT d.document,
+           c.pending_offers, c.accepted_offers, c.rejected_offers, c.cancelled_offers, c.completed_offers
+    FROM cleaning_details d
+        INNER JOIN cleanings c ON c.id = d.id
+    WHERE d.id = :id;
+"""
+
+GET_ARCHIVED_CLEANING_BY_ID_QUERY = """
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
+    FROM cleanings_archive
+    WHERE id = :id AND deleted_at IS NULL;
+"""
+
+GET_CLEANINGS_BY_IDS_QUERY = """
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
+    FROM cleanings
+    WHERE id = ANY(:ids) AND deleted_at IS NULL;
+"""
+
+GET_ARCHIVED_CLEANINGS_BY_IDS_QUERY = """
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
+    FROM cleanings_archive
+    WHERE id = ANY(:ids) AND deleted_at IS NULL;
+"""
+
+# covers the embedded owner, profile and offer counts too, so their edits change the validators
+GET_CLEANING_LAST_MODIFIED_QUERY = """
+    SELECT GREATEST(c.updated_at, c.offer_counts_updated_at, u.updated_at, p.updated_at, d.refreshed_at)
+           AS last_modified
+    FROM (
+        SELECT owner, updated_at, offer_counts_updated_at FROM cleanings WHERE id = :id AND deleted_at IS NULL
+        UNION ALL
+        SELECT owner, updated_at, NULL FROM cleanings_archive WHERE id = :id AND deleted_at IS NULL
+    ) c
+        INNER JOIN users u ON u.id = c.owner
+        LEFT JOIN profiles p ON p.user_id = u.id
+        LEFT JOIN cleaning_details d ON d.id = :id
+    LIMIT 1;
 """
 
 GET_ALL_CLEANINGS_QUERY = """
     SELECT id, name, description, price, cleaning_type  
-    FROM cleanings;  
+    FROM cleanings
+    WHERE deleted_at IS NULL;  
 """
 
+# UUIDv7 ids sort in creation order
 LIST_ALL_USER_CLEANINGS_QUERY = """
-    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
     FROM cleanings
-    WHERE owner = :owner;
+    WHERE owner = :owner AND deleted_at IS NULL
+    ORDER BY id;
 """
 
 UPDATE_CLEANING_BY_ID_QUERY = """
@@ -41,16 +96,70 @@ UPDATE_CLEANING_BY_ID_QUERY = """
         description  = :description,
         price        = :price,
         cleaning_type = :cleaning_type
-    WHERE id = :id
-    RETURNING id, name, description, price, cleaning_type, owner, created_at, updated_at;  
+    WHERE id = :id AND deleted_at IS NULL
+    RETURNING id, name, description, price, cleaning_type, owner, created_at, updated_at,
+              pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers;
 """
 
+# offers and evaluations stay put until the archiver moves the cleaning away
 DELETE_CLEANING_BY_ID_QUERY = """
-    DELETE FROM cleanings  
-    WHERE id = :id AND owner = :owner
+    UPDATE cleanings
+    SET deleted_at = now()
+    WHERE id = :id AND owner = :owner AND deleted_at IS NULL
     RETURNING id;  
 """
 
+# completed at least one offer, or deleted, longer than :archive_after_days ago
+# each half has its own partial index: completed offers by updated_at and ix_cleanings_deleted_at.
+# :ids, when given, limits the candidates to those cleanings
+SELECT_CLEANINGS_TO_ARCHIVE_QUERY = """
+    SELECT id
+    FROM cleanings
+    WHERE id IN (
+        SELECT cleaning_id
+        FROM user_offers_for_cleanings
+        WHERE status = 'completed'
+        AND updated_at < now() - make_interval(days => :archive_after_days)
+        UNION
+        SELECT id
+        FROM cleanings
+        WHERE deleted_at < now() - make_interval(days => :archive_after_days)
+    )
+    AND (CAST(:ids AS uuid[]) IS NULL OR id = ANY(CAST(:ids AS uuid[])))
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED;
+"""
+
+# cleanings are copied first so the archived offers have something to point at,
+# and deleted last so the cascade finds no offers left behind
+COPY_CLEANINGS_TO_ARCHIVE_QUERY = """
+    INSERT INTO cleanings_archive (
+        id, name, description, price, cleaning_type, owner, created_at, updated_at, deleted_at,
+        pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
+    )
+    SELECT id, name, description, price, cleaning_type, owner, created_at, updated_at, deleted_at,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
+    FROM cleanings
+    WHERE id = ANY(:ids);
+"""
+
+MOVE_OFFERS_TO_ARCHIVE_QUERY = """
+    WITH archived_offers AS (
+        DELETE FROM user_offers_for_cleanings
+        WHERE cleaning_id = ANY(:ids)
+        RETURNING user_id, cleaning_id, status, created_at, updated_at
+    )
+    INSERT INTO user_offers_for_cleanings_archive (user_id, cleaning_id, status, created_at, updated_at)
+    SELECT user_id, cleaning_id, status, created_at, updated_at
+    FROM archived_offers;
+"""
+
+DELETE_ARCHIVED_CLEANINGS_QUERY = """
+    DELETE FROM cleanings
+    WHERE id = ANY(:ids);
+"""
+
 
 class CleaningsRepository(BaseRepository):
     """"
@@ -66,30 +175,86 @@ class CleaningsRepository(BaseRepository):
             query=CREATE_CLEANING_QUERY,
             values={
                 **new_cleaning.dict(),
-                "id": str(uuid4()),
+                "id": self.generate_id(),
                 "owner": requesting_user.id
             }
         )
         return CleaningInDB(**cleaning)
 
     async def get_cleaning_by_id(
-        self, *, id: str, requesting_user: UserInDB, populate: bool = True
+        self, *, id: str, requesting_user: UserInDB, populate: bool = True, include_archived: bool = False
     ) -> Union[CleaningInDB, CleaningPublic]:
+        """
+        Populated cleanings come straight from the cleaning_details projection.
+        With include_archived, cleanings the archiver has moved away are
+        still found, for read only lookups.
+        """
+        # ids are uuid columns, anything else can't match and would only make Postgres raise
+        if not is_valid_uuid(id):
+            return None
+
+        if populate:
+            detail_record = await self.db.fetch_one(query=GET_CLEANING_DETAIL_BY_ID_QUERY, values={"id": id})
+            if detail_record:
+                counters = dict(detail_record)
+                return CleaningPublic(**json.loads(counters.pop("document")), **counters)
+
         cleaning_record = await self.db.fetch_one(query=GET_CLEANING_BY_ID_QUERY, values={"id": id})
 
+        if not cleaning_record and include_archived:
+            cleaning_record = await self.db.fetch_one(query=GET_ARCHIVED_CLEANING_BY_ID_QUERY, values={"id": id})
+
         if cleaning_record:
             cleaning = CleaningInDB(**cleaning_record)
             if populate:
                 return await self.populate_cleaning(cleaning=cleaning, requesting_user=requesting_user)
             return cleaning
 
-    async def list_all_user_cleanings(self, requesting_user: UserInDB) -> List[CleaningInDB]:
+    async def get_cleaning_last_modified(self, *, id: str) -> Optional[datetime.datetime]:
+        if not is_valid_uuid(id):
+            return None
+
+        return await self.db.fetch_val(query=GET_CLEANING_LAST_MODIFIED_QUERY, values={"id": id})
+
+    async def get_cleanings_by_ids(self, *, ids: List[str]) -> Dict[str, CleaningInDB]:
+        # ids are uuid columns, anything else can't match and would only make Postgres raise
+        unique_ids = [id for id in set(ids) if is_valid_uuid(id)]
+
+        if not unique_ids:
+            return {}
+
+        cleaning_records = await self.db.fetch_all(
+            query=GET_CLEANINGS_BY_IDS_QUERY,
+            values={"ids": unique_ids}
+        )
+
+        found_ids = {str(c["id"]) for c in cleaning_records}
+
+        # offers and evaluations of archived cleanings still point at them
+        archived_ids = [id for id in unique_ids if id not in found_ids]
+        if archived_ids:
+            cleaning_records += await self.db.fetch_all(
+                query=GET_ARCHIVED_CLEANINGS_BY_IDS_QUERY,
+                values={"ids": archived_ids}
+            )
+
+        cleanings = [CleaningInDB(**c) for c in cleaning_records]
+
+        return {cleaning.id: cleaning for cleaning in cleanings}
+
+    async def list_all_user_cleanings(
+        self, requesting_user: UserInDB, populate: bool = False
+    ) -> List[Union[CleaningInDB, CleaningPublic]]:
         cleanings_records = await self.db.fetch_all(
             query=LIST_ALL_USER_CLEANINGS_QUERY, values={
                 "owner": requesting_user.id}
         )
+        cleanings = [CleaningInDB(**l) for l in cleanings_records]
+
+        if populate:
+            return await self.populate_cleanings(cleanings=cleanings)
 
-        return [CleaningInDB(**l) for l in cleanings_records]
+        return cleanings
 
     async def get_all_cleanings(self) -> List[CleaningInDB]:
         cleaning_records = await self.db.fetch_all(
@@ -112,19 +277,54 @@ class CleaningsRepository(BaseRepository):
         updated_cleaning = await self.db.fetch_one(
             query=UPDATE_CLEANING_BY_ID_QUERY,
             values=cleaning_update_params.dict(
-                exclude={"owner", "created_at", "updated_at"})
+                exclude={"owner", "offer_counts", "created_at", "updated_at"})
         )
 
         return CleaningInDB(**updated_cleaning)
 
-    async def delete_cleaning_by_id(self, *, id: str, requesting_user: UserInDB) -> int:
-        return await self.db.execute(
+    async def delete_cleaning_by_id(self, *, id: str, requesting_user: UserInDB) -> str:
+        deleted_id = await self.db.execute(
             query=DELETE_CLEANING_BY_ID_QUERY,
             values={"id": id, "owner": requesting_user.id},
         )
 
+        return str(deleted_id) if deleted_id is not None else None
+
+    async def archive_cleanings(
+        self, *, archive_after_days: int, batch_size: int, ids: Optional[List[str]] = None
+    ) -> int:
+        """
+        Moves one batch of completed or deleted cleanings and their offers
+        into the archive tables, only among `ids` when given. Returns how many
+        cleanings were moved.
+        """
+        async with self.db.transaction():
+            records = await self.db.fetch_all(
+                query=SELECT_CLEANINGS_TO_ARCHIVE_QUERY,
+                values={"archive_after_days": archive_after_days, "batch_size": batch_size, "ids": ids}
+            )
+            ids = [str(r["id"]) for r in records]
+
+            if ids:
+                await self.db.execute(query=COPY_CLEANINGS_TO_ARCHIVE_QUERY, values={"ids": ids})
+                await self.db.execute(query=MOVE_OFFERS_TO_ARCHIVE_QUERY, values={"ids": ids})
+                await self.db.execute(query=DELETE_ARCHIVED_CLEANINGS_QUERY, values={"ids": ids})
+
+        return len(ids)
+
     async def populate_cleaning(self, *, cleaning: CleaningInDB, requesting_user: UserInDB = None) -> CleaningPublic:
         return CleaningPublic(
             **cleaning.dict(exclude={"owner"}),
             owner=await self.users_repo.get_user_by_id(user_id=cleaning.owner),
         )
+
+    async def populate_cleanings(self, *, cleanings: List[CleaningInDB]) -> List[CleaningPublic]:
+        owners = await self.users_repo.get_users_by_ids(user_ids=[c.owner for c in cleanings])
+
+        return [
+            CleaningPublic(
+                **cleaning.dict(exclude={"owner"}),
+                owner=owners.get(cleaning.owner, cleaning.owner),
+            )
+            for cleaning in cleanings
+        ]
@@ -1,12 +1,31 @@
 
 
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 from databases.core import Database
+from fastapi import HTTPException
+from starlette.status import HTTP_400_BAD_REQUEST
 from app.db.repositories.base import BaseRepository
 from app.db.repositories.offers import OffersRepository
-from app.models.cleaning import CleaningInDB
-from app.models.evaluation import EvaluationAggregate, EvaluationCreate, EvaluationInDB
+from app.db.repositories.cleanings import CleaningsRepository
+from app.db.repositories.users import UsersRepository
+from app.models.cleaning import CleaningInDB, CleaningPublic
+from app.models.evaluation import (
+    EvaluationAggregate,
+    EvaluationCreate,
+    EvaluationCursor,
+    EvaluationExpansion,
+    EvaluationInDB,
+    EvaluationPublic,
+    EvaluationSort,
+)
 from app.models.user import UserInDB
+from app.services.jobs import enqueue_job
+
+# like offers, evaluations are partitioned by created_at, so the one evaluation
+# per cleaner and cleaning rule is enforced here rather than by the primary key
+LOCK_EVALUATION_KEY_QUERY = """
+    SELECT pg_advisory_xact_lock(hashtextextended(CAST(:cleaning_id AS text) || ':' || CAST(:cleaner_id AS text), 0));
+"""
 
 CREATE_OWNER_EVALUATION_FOR_CLEANER_QUERY = """
     INSERT INTO cleaning_to_cleaner_evaluations (
@@ -20,16 +39,21 @@ CREATE_OWNER_EVALUATION_FOR_CLEANER_QUERY = """
         efficiency,
         overall_rating
     )
-    VALUES (
-        :cleaning_id,
-        :cleaner_id,
-        :no_show,
-        :headline,
-        :comment,
-        :professionalism,
-        :completeness,
-        :efficiency,
-        :overall_rating
+    SELECT CAST(:cleaning_id AS uuid),
+           CAST(:cleaner_id AS uuid),
+           :no_show,
+           :headline,
+           :comment,
+           :professionalism,
+           :completeness,
+           :efficiency,
+           :overall_rating
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM cleaning_to_cleaner_evaluations
+        WHERE cleaning_id = CAST(:cleaning_id AS uuid)
+        AND cleaner_id = CAST(:cleaner_id AS uuid)
+        AND created_at >= (SELECT created_at FROM cleanings WHERE id = CAST(:cleaning_id AS uuid))
     )
     RETURNING no_show,
               cleaning_id,
@@ -58,7 +82,8 @@ GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY = """
            created_at,
            updated_at
     FROM cleaning_to_cleaner_evaluations
-    WHERE cleaning_id = :cleaning_id AND cleaner_id = :cleaner_id;
+    WHERE cleaning_id = :cleaning_id AND cleaner_id = :cleaner_id
+    AND created_at >= :cleaning_created_at;
 """
 LIST_EVALUATIONS_FOR_CLEANER_QUERY = """
     SELECT no_show,
@@ -73,8 +98,47 @@ LIST_EVALUATIONS_FOR_CLEANER_QUERY = """
            created_at,
            updated_at
     FROM cleaning_to_cleaner_evaluations
-    WHERE cleaner_id = :cleaner_id;
+    WHERE cleaner_id = :cleaner_id
+    AND overall_rating BETWEEN COALESCE(CAST(:min_rating AS int), 0) AND COALESCE(CAST(:max_rating AS int), 5)
+    AND no_show = COALESCE(CAST(:no_show AS boolean), no_show)
+    AND ({keyset}) {comparison} (
+        {after}
+    )
+    ORDER BY {order}
+    LIMIT :limit;
 """
+# every sort walks one index in one direction, from the row after the cursor,
+# or from the first row when there is no cursor
+NEWEST_FIRST = """COALESCE(CAST(:after_created_at AS timestamptz), 'infinity'),
+        COALESCE(CAST(:after_cleaning_id AS uuid), 'ffffffff-ffff-ffff-ffff-ffffffffffff')"""
+OLDEST_FIRST = """COALESCE(CAST(:after_created_at AS timestamptz), '-infinity'),
+        COALESCE(CAST(:after_cleaning_id AS uuid), '00000000-0000-0000-0000-000000000000')"""
+LIST_EVALUATIONS_FOR_CLEANER_QUERIES = {
+    EvaluationSort.newest: LIST_EVALUATIONS_FOR_CLEANER_QUERY.format(
+        keyset="created_at, cleaning_id",
+        comparison="<",
+        after=NEWEST_FIRST,
+        order="created_at DESC, cleaning_id DESC",
+    ),
+    EvaluationSort.oldest: LIST_EVALUATIONS_FOR_CLEANER_QUERY.format(
+        keyset="created_at, cleaning_id",
+        comparison=">",
+        after=OLDEST_FIRST,
+        order="created_at, cleaning_id",
+    ),
+    EvaluationSort.highest_rated: LIST_EVALUATIONS_FOR_CLEANER_QUERY.format(
+        keyset="overall_rating, created_at, cleaning_id",
+        comparison="<",
+        after=f"COALESCE(CAST(:after_overall_rating AS int), 6),\n        {NEWEST_FIRST}",
+        order="overall_rating DESC, created_at DESC, cleaning_id DESC",
+    ),
+    EvaluationSort.lowest_rated: LIST_EVALUATIONS_FOR_CLEANER_QUERY.format(
+        keyset="overall_rating, created_at, cleaning_id",
+        comparison=">",
+        after=f"COALESCE(CAST(:after_overall_rating AS int), -1),\n        {OLDEST_FIRST}",
+        order="overall_rating, created_at, cleaning_id",
+    ),
+}
 GET_CLEANER_AGGREGATE_RATINGS_QUERY = """
     SELECT        
         AVG(professionalism) AS avg_professionalism,
@@ -84,7 +148,7 @@ GET_CLEANER_AGGREGATE_RATINGS_QUERY = """
         MIN(overall_rating)  AS min_overall_rating,
         MAX(overall_rating)  AS max_overall_rating,
         COUNT(cleaning_id)   AS total_evaluations,
-        SUM(no_show::int)    AS total_no_show,
+        COALESCE(SUM(no_show::int), 0) AS total_no_show,
         COUNT(overall_rating) FILTER(WHERE overall_rating = 1) AS one_stars,
         COUNT(overall_rating) FILTER(WHERE overall_rating = 2) AS two_stars,
         COUNT(overall_rating) FILTER(WHERE overall_rating = 3) AS three_stars,
@@ -94,16 +158,53 @@ GET_CLEANER_AGGREGATE_RATINGS_QUERY = """
     WHERE cleaner_id = :cleaner_id;
 """
 
+# the same aggregates over the last :days UTC days, today included, added up from
+# the daily rollup; ratings only go from 1 to 5, so the histogram has the extremes
+GET_CLEANER_WINDOW_AGGREGATE_RATINGS_QUERY = """
+    SELECT
+        CAST(sum(professionalism_sum) AS numeric) / NULLIF(sum(professionalism_count), 0) AS avg_professionalism,
+        CAST(sum(completeness_sum) AS numeric) / NULLIF(sum(completeness_count), 0)       AS avg_completeness,
+        CAST(sum(efficiency_sum) AS numeric) / NULLIF(sum(efficiency_count), 0)           AS avg_efficiency,
+        CAST(sum(overall_rating_sum) AS numeric) / NULLIF(sum(evaluations), 0)            AS avg_overall_rating,
+        CASE WHEN sum(one_stars) > 0 THEN 1
+             WHEN sum(two_stars) > 0 THEN 2
+             WHEN sum(three_stars) > 0 THEN 3
+             WHEN sum(four_stars) > 0 THEN 4
+             WHEN sum(five_stars) > 0 THEN 5
+        END AS min_overall_rating,
+        CASE WHEN sum(five_stars) > 0 THEN 5
+             WHEN sum(four_stars) > 0 THEN 4
+             WHEN sum(three_stars) > 0 THEN 3
+             WHEN sum(two_stars) > 0 THEN 2
+             WHEN sum(one_stars) > 0 THEN 1
+        END AS max_overall_rating,
+        COALESCE(sum(evaluations), 0) AS total_evaluations,
+        COALESCE(sum(no_shows), 0)    AS total_no_show,
+        COALESCE(sum(one_stars), 0)   AS one_stars,
+        COALESCE(sum(two_stars), 0)   AS two_stars,
+        COALESCE(sum(three_stars), 0) AS three_stars,
+        COALESCE(sum(four_stars), 0)  AS four_stars,
+        COALESCE(sum(five_stars), 0)  AS five_stars
+    FROM cleaner_daily_ratings
+    WHERE cleaner_id = :cleaner_id
+    AND day > CAST(now() AT TIME ZONE 'UTC' AS date) - CAST(:days AS int);
+"""
 
 class EvaluationsRepository(BaseRepository):
     def __init__(self, db: Database) -> None:
         super().__init__(db)
         self.offers_repo = OffersRepository(db)
+        self.cleanings_repo = CleaningsRepository(db)
+        self.users_repo = UsersRepository(db)
 
     async def create_evaluation_for_cleaner(
         self, *, evaluation_create: EvaluationCreate, cleaner: CleaningInDB, cleaning: UserInDB
     ) -> EvaluationInDB:
         async with self.db.transaction():
+            await self.db.execute(
+                query=LOCK_EVALUATION_KEY_QUERY,
+                values={"cleaning_id": cleaning.id, "cleaner_id": cleaner.id}
+            )
             created_eval = await self.db.fetch_one(
                 query=CREATE_OWNER_EVALUATION_FOR_CLEANER_QUERY,
                 values={
@@ -113,29 +214,71 @@ class EvaluationsRepository(BaseRepository):
                 }
             )
 
-            await self.offers_repo.mark_as_completed(
-                cleaning=cleaning,
-                cleaner=cleaner
+            if not created_eval:
+                raise HTTPException(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    detail="That cleaner has already been evaluated for this cleaning job."
+                )
+
+            await enqueue_job(
+                self.db,
+                task="offers:mark-as-completed",
+                payload={"cleaning_id": cleaning.id, "user_id": cleaner.id}
             )
 
             return EvaluationInDB(**created_eval)
 
     async def list_evaluations_for_cleaner(
-        self, *, cleaner: UserInDB
-    ) -> List[EvaluationInDB]:
+        self,
+        *,
+        cleaner: UserInDB,
+        sort: EvaluationSort = EvaluationSort.newest,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        no_show: Optional[bool] = None,
+        limit: Optional[int] = None,
+        after: Optional[EvaluationCursor] = None,
+        expand: Iterable[EvaluationExpansion] = (),
+    ) -> List[EvaluationPublic]:
+        values = {
+            "cleaner_id": cleaner.id,
+            "min_rating": min_rating,
+            "max_rating": max_rating,
+            "no_show": no_show,
+            "limit": limit,
+            "after_created_at": after.created_at if after else None,
+            "after_cleaning_id": after.cleaning_id if after else None,
+        }
+        if sort in (EvaluationSort.highest_rated, EvaluationSort.lowest_rated):
+            values["after_overall_rating"] = after.overall_rating if after else None
+
         evaluations = await self.db.fetch_all(
-            query=LIST_EVALUATIONS_FOR_CLEANER_QUERY,
-            values={"cleaner_id": cleaner.id}
+            query=LIST_EVALUATIONS_FOR_CLEANER_QUERIES[sort], values=values
         )
 
-        return [EvaluationInDB(**e) for e in evaluations]
+        return await self.populate_evaluations(
+            evaluations=[EvaluationInDB(**e) for e in evaluations], expand=expand
+        )
+
+    async def list_evaluations_for_cleaner_with_stats(
+        self, *, cleaner: UserInDB, **kwargs
+    ) -> Tuple[List[EvaluationPublic], EvaluationAggregate]:
+        """
+        Reads the page and the aggregates from one snapshot, so an evaluation
+        created in between can't show up in one and not the other.
+        """
+        async with self.db.transaction(isolation="repeatable_read", readonly=True):
+            evaluations = await self.list_evaluations_for_cleaner(cleaner=cleaner, **kwargs)
+            stats = await self.get_cleaner_aggregates(cleaner=cleaner)
+
+        return evaluations, EvaluationAggregate(**stats)
 
     async def get_cleaner_evaluation_for_cleaning(
         self, *, cleaning: CleaningInDB, cleaner: UserInDB
     ) -> EvaluationInDB:
         evaluation = await self.db.fetch_one(
             query=GET_CLEANER_EVALUATION_FOR_CLEANING_QUERY,
-            values={"cleaning_id": cleaning.id, "cleaner_id": cleaner.id}
+            values={"cleaning_id": cleaning.id, "cleaner_id": cleaner.id, "cleaning_created_at": cleaning.created_at}
         )
 
         if not evaluation:
@@ -144,9 +287,57 @@ class EvaluationsRepository(BaseRepository):
         return EvaluationInDB(**evaluation)
 
     async def get_cleaner_aggregates(
-        self, *, cleaner: UserInDB
+        self, *, cleaner: UserInDB, days: Optional[int] = None
     ) -> EvaluationAggregate:
+        if days is not None:
+            return await self.db.fetch_one(
+                query=GET_CLEANER_WINDOW_AGGREGATE_RATINGS_QUERY,
+                values={"cleaner_id": cleaner.id, "days": days}
+            )
+
         return await self.db.fetch_one(
             query=GET_CLEANER_AGGREGATE_RATINGS_QUERY,
             values={"cleaner_id": cleaner.id}
         )
+
+    async def populate_evaluations(
+        self, *, evaluations: List[EvaluationInDB], expand: Iterable[EvaluationExpansion] = ()
+    ) -> List[EvaluationPublic]:
+        """
+        Fills cleaner, cleaning and owner for a whole list of evaluations
+        with at most one query for cleanings and one for users.
+        """
+        expand = set(expand)
+        cleanings, users = {}, {}
+
+        if EvaluationExpansion.cleaning in expand or EvaluationExpansion.owner in expand:
+            cleanings = await self.cleanings_repo.get_cleanings_by_ids(
+                ids=[e.cleaning_id for e in evaluations]
+            )
+
+        user_ids = []
+        if EvaluationExpansion.cleaner in expand:
+            user_ids += [e.cleaner_id for e in evaluations]
+        if EvaluationExpansion.owner in expand:
+            user_ids += [c.owner for c in cleanings.values()]
+
+        if user_ids:
+            users = await self.users_repo.get_users_by_ids(user_ids=user_ids)
+
+        populated_evaluations = []
+        for evaluation in evaluations:
+            cleaning = cleanings.get(evaluation.cleaning_id)
+
+            populated_evaluations.append(
+                EvaluationPublic(
+                    **evaluation.dict(),
+                    cleaner=users.get(evaluation.cleaner_id)
+                    if EvaluationExpansion.cleaner in expand else None,
+                    cleaning=CleaningPublic(**cleaning.dict())
+                    if cleaning and EvaluationExpansion.cleaning in expand else None,
+                    owner=users.get(cleaning.owner)
+                    if cleaning and EvaluationExpansion.owner in expand else None,
+                )
+            )
+
+        return populated_evaluations
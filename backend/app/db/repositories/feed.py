@@ -1,10 +1,10 @@
 from typing import List
 import datetime
 from databases import Database
+from app.db.pools import ANALYTICAL_POOL
 from app.db.repositories.base import BaseRepository
 from app.db.repositories.users import UsersRepository
 from app.models.feed import CleaningFeedItem
-from asyncpg import Record
 
 FETCH_CLEANING_JOBS_FOR_FEED_QUERY = """
     SELECT  id,
@@ -15,6 +15,11 @@ FETCH_CLEANING_JOBS_FOR_FEED_QUERY = """
             owner,
             created_at,
             updated_at,
+            pending_offers,
+            accepted_offers,
+            rejected_offers,
+            cancelled_offers,
+            completed_offers,
             event_type,
             event_timestamp,
             ROW_NUMBER() OVER ( ORDER BY event_timestamp DESC ) AS row_number
@@ -28,10 +33,15 @@ FETCH_CLEANING_JOBS_FOR_FEED_QUERY = """
                     owner,
                     created_at,
                     updated_at,
+                    pending_offers,
+                    accepted_offers,
+                    rejected_offers,
+                    cancelled_offers,
+                    completed_offers,
                     updated_at as event_timestamp,
                     'is_update' AS event_type
             FROM cleanings
-            WHERE updated_at < :starting_date AND updated_at != created_at
+            WHERE updated_at < :starting_date AND updated_at != created_at AND deleted_at IS NULL
             ORDER BY updated_at DESC
             LIMIT :page_chunk_size
         ) UNION (
@@ -43,10 +53,15 @@ FETCH_CLEANING_JOBS_FOR_FEED_QUERY = """
                     owner,
                     created_at,
                     updated_at,
+                    pending_offers,
+                    accepted_offers,
+                    rejected_offers,
+                    cancelled_offers,
+                    completed_offers,
                     created_at AS event_timestamp,
                     'is_create' AS event_type
             FROM cleanings
-            WHERE created_at < :starting_date
+            WHERE created_at < :starting_date AND deleted_at IS NULL
             ORDER BY created_at DESC
             LIMIT :page_chunk_size
         )
@@ -57,12 +72,14 @@ FETCH_CLEANING_JOBS_FOR_FEED_QUERY = """
 
 
 class FeedRepository(BaseRepository):
+    pool = ANALYTICAL_POOL
+
     def __init__(self, db: Database) -> None:
         super().__init__(db)
         self.users_repo = UsersRepository(db)
 
     async def fetch_cleaning_jobs_feed(
-            self, *, page_chunk_size: int = 20, starting_date: datetime.datetime,
+            self, *, page_chunk_size: int = 20, starting_date: datetime.datetime, populate: bool = True,
     ) -> List[CleaningFeedItem]:
         cleaning_feed_item_records = await self.db.fetch_all(
             query=FETCH_CLEANING_JOBS_FOR_FEED_QUERY,
@@ -74,10 +91,22 @@ class FeedRepository(BaseRepository):
 
         cleaning_feed = [CleaningFeedItem(**f) for f in cleaning_feed_item_records]
 
-        return [await self.populate_cleaning_feed_item(cleaning_feed_item=item) for item in cleaning_feed]
+        if populate:
+            return await self.populate_cleaning_feed_items(cleaning_feed_items=cleaning_feed)
+
+        return cleaning_feed
 
-    async def populate_cleaning_feed_item(self, *, cleaning_feed_item: CleaningFeedItem) -> CleaningFeedItem:
-        return CleaningFeedItem(
-            **cleaning_feed_item.dict(exclude={"owner"}),
-            owner=await self.users_repo.get_user_by_id(user_id=cleaning_feed_item.owner)
+    async def populate_cleaning_feed_items(
+        self, *, cleaning_feed_items: List[CleaningFeedItem]
+    ) -> List[CleaningFeedItem]:
+        owners = await self.users_repo.get_users_by_ids(
+            user_ids=[item.owner for item in cleaning_feed_items]
         )
+
+        return [
+            CleaningFeedItem(
+                **item.dict(exclude={"owner"}),
+                owner=owners.get(item.owner, item.owner)
+            )
+            for item in cleaning_feed_items
+        ]
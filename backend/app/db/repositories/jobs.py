@@ -0,0 +1,117 @@
+import json
+from typing import Dict, List
+
+from app.db.repositories.base import BaseRepository
+from app.models.job import JobCreate, JobInDB
+
+ENQUEUE_JOB_QUERY = """
+    INSERT INTO jobs (task, payload, max_attempts)
+    VALUES (:task, CAST(:payload AS JSONB), :max_attempts)
+    RETURNING id, task, payload, status, attempts, max_attempts, last_error, run_at, locked_at, created_at, updated_at;
+"""
+
+CLAIM_JOBS_QUERY = """
+    UPDATE jobs
+    SET status    = 'running',
+        attempts  = attempts + 1,
+        locked_at = now()
+    WHERE id IN (
+        SELECT id
+        FROM jobs
+        WHERE status = 'queued' AND run_at <= now()
+        ORDER BY run_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, task, payload, status, attempts, max_attempts, last_error, run_at, locked_at, created_at, updated_at;
+"""
+
+MARK_JOB_SUCCEEDED_QUERY = """
+    UPDATE jobs
+    SET status     = 'succeeded',
+        locked_at  = NULL,
+        last_error = NULL
+    WHERE id = :id;
+"""
+
+RETRY_JOB_QUERY = """
+    UPDATE jobs
+    SET status     = 'queued',
+        locked_at  = NULL,
+        last_error = :last_error,
+        run_at     = now() + make_interval(secs => :delay)
+    WHERE id = :id;
+"""
+
+MARK_JOB_FAILED_QUERY = """
+    UPDATE jobs
+    SET status     = 'failed',
+        locked_at  = NULL,
+        last_error = :last_error
+    WHERE id = :id;
+"""
+
+REQUEUE_STALE_JOBS_QUERY = """
+    UPDATE jobs
+    SET status    = 'queued',
+        locked_at = NULL
+    WHERE status = 'running'
+    AND locked_at < now() - make_interval(secs => :stale_after)
+    RETURNING id;
+"""
+
+COUNT_JOBS_BY_STATUS_QUERY = """
+    SELECT status, COUNT(*) AS total
+    FROM jobs
+    GROUP BY status;
+"""
+
+
+class JobsRepository(BaseRepository):
+    async def enqueue_job(self, *, job_create: JobCreate) -> JobInDB:
+        job = await self.db.fetch_one(
+            query=ENQUEUE_JOB_QUERY,
+            values={
+                "task": job_create.task,
+                "payload": json.dumps(job_create.payload),
+                "max_attempts": job_create.max_attempts,
+            }
+        )
+
+        return JobInDB(**job)
+
+    async def claim_jobs(self, *, limit: int = 1) -> List[JobInDB]:
+        jobs = await self.db.fetch_all(
+            query=CLAIM_JOBS_QUERY,
+            values={"limit": limit}
+        )
+
+        return [JobInDB(**j) for j in jobs]
+
+    async def mark_job_succeeded(self, *, job: JobInDB) -> None:
+        await self.db.execute(query=MARK_JOB_SUCCEEDED_QUERY, values={"id": job.id})
+
+    async def retry_job(self, *, job: JobInDB, error: str, delay: float) -> None:
+        await self.db.execute(
+            query=RETRY_JOB_QUERY,
+            values={"id": job.id, "last_error": error, "delay": delay}
+        )
+
+    async def mark_job_failed(self, *, job: JobInDB, error: str) -> None:
+        await self.db.execute(
+            query=MARK_JOB_FAILED_QUERY,
+            values={"id": job.id, "last_error": error}
+        )
+
+    async def requeue_stale_jobs(self, *, stale_after: float) -> int:
+        requeued = await self.db.fetch_all(
+            query=REQUEUE_STALE_JOBS_QUERY,
+            values={"stale_after": stale_after}
+        )
+
+        return len(requeued)
+
+    async def count_jobs_by_status(self) -> Dict[str, int]:
+        records = await self.db.fetch_all(query=COUNT_JOBS_BY_STATUS_QUERY)
+
+        return {r["status"]: r["total"] for r in records}
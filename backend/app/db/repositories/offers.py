@@ -1,71 +1,152 @@
-from typing import List, Union
+from typing import Iterable, List, Optional, Union
 from databases.core import Database
+from fastapi import HTTPException
+from starlette.status import HTTP_400_BAD_REQUEST
 
 from app.db.repositories.base import BaseRepository
 from app.db.repositories.users import UsersRepository
+from app.db.repositories.cleanings import CleaningsRepository
 
-from app.models.offer import OfferCreate, OfferPublic, OfferUpdate, OfferInDB
-from app.models.cleaning import CleaningInDB
+from app.models.offer import (
+    CleaningOfferCursor, OfferCreate, OfferCursor, OfferExpansion, OfferPublic, OfferStatus, OfferUpdate, OfferInDB
+)
+from app.models.cleaning import CleaningInDB, CleaningPublic
 from app.models.user import UserInDB
+from app.services.jobs import job_handler
 
-CREATE_OFFER_FOR_CLEANING_QUERY = """
+# offers are partitioned by created_at and can't predate their cleaning, so
+# bounding created_at by the cleaning's lets postgres skip older partitions
+CLEANING_CREATED_AT = "(SELECT created_at FROM cleanings WHERE id = :cleaning_id)"
+
+# the primary key has to include created_at on a partitioned table, so one
+# offer per cleaner and cleaning is kept by serializing the check and insert
+LOCK_OFFER_KEY_QUERY = """
+    SELECT pg_advisory_xact_lock(hashtextextended(CAST(:cleaning_id AS text) || ':' || CAST(:user_id AS text), 0));
+"""
+
+CREATE_OFFER_FOR_CLEANING_QUERY = f"""
     INSERT INTO user_offers_for_cleanings (cleaning_id, user_id, status)
-    VALUES (:cleaning_id, :user_id, :status)
+    SELECT CAST(:cleaning_id AS uuid), CAST(:user_id AS uuid), :status
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM user_offers_for_cleanings
+        WHERE cleaning_id = CAST(:cleaning_id AS uuid)
+        AND user_id = CAST(:user_id AS uuid)
+        AND created_at >= {CLEANING_CREATED_AT}
+    )
     RETURNING cleaning_id, user_id, status, created_at, updated_at;
 """
 
+# accepted offers first, then pending, completed, cancelled and rejected ones,
+# oldest first within a status. One page after the cursor, walking
+# ix_user_offers_for_cleanings_cleaning_keyset; a NULL limit returns them all.
 LIST_OFFERS_FOR_CLEANING_QUERY = """
     SELECT cleaning_id, user_id, status, created_at, updated_at
     FROM user_offers_for_cleanings
-    WHERE cleaning_id = :cleaning_id;
+    WHERE cleaning_id = :cleaning_id
+    AND created_at >= :cleaning_created_at
+    AND (offer_status_priority(status), created_at, user_id) > (
+        COALESCE(offer_status_priority(:after_status), -1),
+        COALESCE(CAST(:after_created_at AS timestamptz), '-infinity'),
+        COALESCE(CAST(:after_user_id AS uuid), '00000000-0000-0000-0000-000000000000')
+    )
+    ORDER BY offer_status_priority(status), created_at, user_id
+    LIMIT :limit;
 """
 
+# one page of a cleaner's offers from one offers table, summarised with the cleaning from its matching table
+OFFERS_FOR_USER_PAGE_QUERY = """
+        SELECT o.cleaning_id, o.user_id, o.status, o.created_at, o.updated_at,
+               c.name, c.description, c.price, c.cleaning_type, c.owner,
+               c.pending_offers, c.accepted_offers, c.rejected_offers, c.cancelled_offers, c.completed_offers
+        FROM {offers} o
+            INNER JOIN {cleanings} c ON c.id = o.cleaning_id AND c.deleted_at IS NULL
+        WHERE o.user_id = :user_id
+        AND o.status = ANY(:statuses)
+        AND (o.created_at, o.cleaning_id) < (
+            COALESCE(CAST(:after_created_at AS timestamptz), 'infinity'),
+            COALESCE(CAST(:after_cleaning_id AS uuid), 'ffffffff-ffff-ffff-ffff-ffffffffffff')
+        )
+        ORDER BY o.created_at DESC, o.cleaning_id DESC
+        LIMIT :limit
+"""
+
+# a cleaner's offers newest first, one page after the (created_at, cleaning_id)
+# cursor. Live and archived offers are each read a page at a time through their
+# user keyset index and merged, so completed jobs stay listed once archived.
+# Each offer comes with its cleaning's summary, and offers on deleted cleanings are left out.
+LIST_OFFERS_FOR_USER_QUERY = f"""
+    SELECT cleaning_id, user_id, status, created_at, updated_at,
+           name, description, price, cleaning_type, owner,
+           pending_offers, accepted_offers, rejected_offers, cancelled_offers, completed_offers
+    FROM (
+        ({OFFERS_FOR_USER_PAGE_QUERY.format(offers="user_offers_for_cleanings", cleanings="cleanings")})
+        UNION ALL
+        ({OFFERS_FOR_USER_PAGE_QUERY.format(offers="user_offers_for_cleanings_archive", cleanings="cleanings_archive")})
+    ) offers
+    ORDER BY created_at DESC, cleaning_id DESC
+    LIMIT :limit;
+"""
+
+CLEANING_SUMMARY_COLUMNS = (
+    "name", "description", "price", "cleaning_type", "owner",
+    "pending_offers", "accepted_offers", "rejected_offers", "cancelled_offers", "completed_offers",
+)
+
 GET_OFFER_FOR_CLEANING_FROM_USER_QUERY = """
     SELECT cleaning_id, user_id, status, created_at, updated_at
     FROM user_offers_for_cleanings
-    WHERE cleaning_id = :cleaning_id AND user_id = :user_id;
+    WHERE cleaning_id = :cleaning_id AND user_id = :user_id
+    AND created_at >= :cleaning_created_at;
 """
 
 ACCEPT_OFFER_QUERY = """
     UPDATE user_offers_for_cleanings
     SET status = 'accepted'
     WHERE cleaning_id = :cleaning_id AND user_id = :user_id
+    AND created_at = :created_at
     RETURNING cleaning_id, user_id, status, created_at, updated_at;
 """
 
-REJECT_ALL_OTHER_OFFERS_QUERY = """
+REJECT_ALL_OTHER_OFFERS_QUERY = f"""
     UPDATE user_offers_for_cleanings
     SET status = 'rejected'
     WHERE cleaning_id = :cleaning_id
     AND user_id != :user_id
-    AND status = 'pending';
+    AND status = 'pending'
+    AND created_at >= {CLEANING_CREATED_AT};
 """
 
 CANCEL_OFFER_QUERY = """
     UPDATE user_offers_for_cleanings
     SET status = 'cancelled'
     WHERE cleaning_id = :cleaning_id AND user_id = :user_id
+    AND created_at = :created_at
     RETURNING cleaning_id, user_id, status, created_at, updated_at;
 """
 
-SET_ALL_OTHER_OFFERS_AS_PENDING_QUERY = """
+SET_ALL_OTHER_OFFERS_AS_PENDING_QUERY = f"""
     UPDATE user_offers_for_cleanings
     SET status = 'pending'
     WHERE cleaning_id = :cleaning_id 
     AND user_id != :user_id 
     AND status = 'rejected'
+    AND created_at >= {CLEANING_CREATED_AT}
 """
 
 RESCIND_OFFER_QUERY = """
     DELETE FROM user_offers_for_cleanings
     WHERE cleaning_id = :cleaning_id
     AND user_id = :user_id
+    AND created_at = :created_at
 """
 
-MARK_AS_COMPLETED_QUERY = """
+MARK_AS_COMPLETED_QUERY = f"""
     UPDATE user_offers_for_cleanings
     SET status = 'completed'
     WHERE cleaning_id = :cleaning_id AND user_id = :user_id
+    AND status = 'accepted'
+    AND created_at >= {CLEANING_CREATED_AT}
 """
 
 
@@ -73,32 +154,106 @@ class OffersRepository(BaseRepository):
     def __init__(self, db: Database) -> None:
         super().__init__(db)
         self.users_repo = UsersRepository(db)
+        self.cleanings_repo = CleaningsRepository(db)
 
     async def create_offer_for_cleaning(self, *, new_offer: OfferCreate) -> OfferInDB:
-        created_offer = await self.db.fetch_one(
-            query=CREATE_OFFER_FOR_CLEANING_QUERY,
-            values={**new_offer.dict(), "status": "pending"}
-        )
+        async with self.db.transaction():
+            await self.db.execute(
+                query=LOCK_OFFER_KEY_QUERY,
+                values={"cleaning_id": new_offer.cleaning_id, "user_id": new_offer.user_id}
+            )
+            created_offer = await self.db.fetch_one(
+                query=CREATE_OFFER_FOR_CLEANING_QUERY,
+                values={**new_offer.dict(), "status": "pending"}
+            )
+
+        if not created_offer:
+            raise HTTPException(
+                status_code=HTTP_400_BAD_REQUEST,
+                detail="Users aren't allowed to create more than one offer for a cleaning job."
+            )
+
         return OfferInDB(**created_offer)
 
     async def list_offers_for_cleaning(
-        self, *, cleaning: CleaningInDB, populate: bool = True
+        self,
+        *,
+        cleaning: CleaningInDB,
+        populate: bool = True,
+        expand: Iterable[OfferExpansion] = (OfferExpansion.user,),
+        limit: Optional[int] = None,
+        after: Optional[CleaningOfferCursor] = None,
     ) -> List[Union[OfferInDB, OfferPublic]]:
+        """
+        Up to `limit` of a cleaning's offers starting after `after`, by status
+        priority then age. Without a limit every offer is returned.
+        """
         offer_records = await self.db.fetch_all(
             query=LIST_OFFERS_FOR_CLEANING_QUERY,
-            values={"cleaning_id": cleaning.id}
+            values={
+                "cleaning_id": cleaning.id,
+                "cleaning_created_at": cleaning.created_at,
+                "after_status": after.status.value if after else None,
+                "after_created_at": after.created_at if after else None,
+                "after_user_id": after.user_id if after else None,
+                "limit": limit,
+            }
         )
         offers = [OfferInDB(**o) for o in offer_records]
 
         if populate:
-            return [await self.populate_offer(offer=offer) for offer in offers]
+            return await self.populate_offers(offers=offers, expand=expand)
 
         return offers
 
+    async def list_offers_for_user(
+        self,
+        *,
+        user: UserInDB,
+        statuses: Optional[Iterable[OfferStatus]] = None,
+        limit: int,
+        after: Optional[OfferCursor] = None,
+        populate: bool = True,
+        expand: Iterable[OfferExpansion] = (OfferExpansion.cleaning,),
+    ) -> List[Union[OfferInDB, OfferPublic]]:
+        """
+        Up to `limit` of a cleaner's offers across all cleanings, newest first,
+        starting after `after`. Populated cleanings come from the same query.
+        """
+        offer_records = await self.db.fetch_all(
+            query=LIST_OFFERS_FOR_USER_QUERY,
+            values={
+                "user_id": user.id,
+                "statuses": [OfferStatus(s).value for s in statuses or OfferStatus],
+                "after_created_at": after.created_at if after else None,
+                "after_cleaning_id": after.cleaning_id if after else None,
+                "limit": limit,
+            }
+        )
+
+        if not populate:
+            return [OfferInDB(**o) for o in offer_records]
+
+        expand = set(expand)
+        users = {}
+
+        if OfferExpansion.user in expand:
+            users = await self.users_repo.get_users_by_ids(user_ids=[user.id])
+
+        return [
+            OfferPublic(
+                **OfferInDB(**o).dict(),
+                user=users.get(user.id),
+                cleaning=CleaningPublic(id=o["cleaning_id"], **{c: o[c] for c in CLEANING_SUMMARY_COLUMNS})
+                if OfferExpansion.cleaning in expand else None,
+            )
+            for o in offer_records
+        ]
+
     async def get_offer_for_cleaning_from_user(self, *, cleaning: CleaningInDB, user: UserInDB) -> OfferInDB:
         offer_record = await self.db.fetch_one(
             query=GET_OFFER_FOR_CLEANING_FROM_USER_QUERY,
-            values={"cleaning_id": cleaning.id, "user_id": user.id}
+            values={"cleaning_id": cleaning.id, "user_id": user.id, "cleaning_created_at": cleaning.created_at}
         )
 
         if not offer_record:
@@ -111,7 +266,8 @@ class OffersRepository(BaseRepository):
             accepted_offer = await self.db.fetch_one(
                 query=ACCEPT_OFFER_QUERY,
                 values={"cleaning_id": offer.cleaning_id,
-                        "user_id": offer.user_id}
+                        "user_id": offer.user_id,
+                        "created_at": offer.created_at}
             )
 
             await self.db.execute(
@@ -127,7 +283,8 @@ class OffersRepository(BaseRepository):
             canceled_offer = await self.db.fetch_one(
                 query=CANCEL_OFFER_QUERY,
                 values={"cleaning_id": offer.cleaning_id,
-                        "user_id": offer.user_id}
+                        "user_id": offer.user_id,
+                        "created_at": offer.created_at}
             )
 
             await self.db.execute(
@@ -143,7 +300,8 @@ class OffersRepository(BaseRepository):
             query=RESCIND_OFFER_QUERY,
             values={
                 "cleaning_id": offer.cleaning_id,
-                "user_id": offer.user_id
+                "user_id": offer.user_id,
+                "created_at": offer.created_at
             }
         )
 
@@ -156,6 +314,32 @@ class OffersRepository(BaseRepository):
             }
         )
 
+    async def populate_offers(
+        self, *, offers: List[OfferInDB], expand: Iterable[OfferExpansion] = (OfferExpansion.user,)
+    ) -> List[OfferPublic]:
+        """
+        Fills the requested relations for a whole list of offers with at most
+        one query per relation, no matter how many offers there are.
+        """
+        expand = set(expand)
+        users, cleanings = {}, {}
+
+        if OfferExpansion.user in expand:
+            users = await self.users_repo.get_users_by_ids(user_ids=[o.user_id for o in offers])
+
+        if OfferExpansion.cleaning in expand:
+            cleanings = await self.cleanings_repo.get_cleanings_by_ids(ids=[o.cleaning_id for o in offers])
+
+        return [
+            OfferPublic(
+                **offer.dict(),
+                user=users.get(offer.user_id),
+                cleaning=CleaningPublic(**cleanings[offer.cleaning_id].dict())
+                if offer.cleaning_id in cleanings else None,
+            )
+            for offer in offers
+        ]
+
     async def populate_offer(self, *, offer: OfferInDB) -> OfferPublic:
         return OfferPublic(
             **offer.dict(),
@@ -163,3 +347,11 @@ class OffersRepository(BaseRepository):
                 user_id=offer.user_id
             )
         )
+
+
+@job_handler("offers:mark-as-completed")
+async def mark_as_completed_job(db: Database, *, cleaning_id: str, user_id: str) -> None:
+    await db.execute(
+        query=MARK_AS_COMPLETED_QUERY,
+        values={"cleaning_id": cleaning_id, "user_id": user_id}
+    )
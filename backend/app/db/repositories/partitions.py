@@ -0,0 +1,72 @@
+from typing import List
+from datetime import datetime
+
+from app.db.repositories.base import BaseRepository
+from app.models.partition import PartitionInDB
+
+LIST_PARTITIONS_QUERY = """
+    SELECT CAST(:table AS text) AS table, c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bounds
+    FROM pg_inherits i
+        INNER JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(:table)
+    ORDER BY c.relname;
+"""
+
+# only one process maintains partitions at a time, the others skip their turn
+TRY_LOCK_PARTITION_MAINTENANCE_QUERY = """
+    SELECT pg_try_advisory_xact_lock(hashtext('partition_maintenance')) AS locked;
+"""
+
+# creating or detaching a partition locks the whole table, give up instead of
+# queueing every offer and evaluation query behind it
+SET_LOCK_TIMEOUT_QUERY = """
+    SELECT set_config('lock_timeout', :lock_timeout, true);
+"""
+
+# DDL takes no bind parameters, table names only ever come from PARTITIONED_TABLES
+CREATE_PARTITION_QUERY = """
+    CREATE TABLE IF NOT EXISTS {name}
+        PARTITION OF {table}
+        FOR VALUES FROM ('{lower}') TO ('{upper}');
+"""
+
+DETACH_PARTITION_QUERY = """
+    ALTER TABLE {table} DETACH PARTITION {name};
+"""
+
+
+class PartitionsRepository(BaseRepository):
+    async def list_partitions(self, *, table: str) -> List[PartitionInDB]:
+        partitions = await self.db.fetch_all(
+            query=LIST_PARTITIONS_QUERY,
+            values={"table": table}
+        )
+
+        return [PartitionInDB(**p) for p in partitions]
+
+    async def try_lock_maintenance(self, *, lock_timeout_ms: int) -> bool:
+        """
+        Takes the maintenance lock for the current transaction, False when
+        another process already holds it.
+        """
+        locked = await self.db.fetch_val(query=TRY_LOCK_PARTITION_MAINTENANCE_QUERY)
+
+        if locked:
+            await self.db.execute(
+                query=SET_LOCK_TIMEOUT_QUERY,
+                values={"lock_timeout": f"{lock_timeout_ms}ms"}
+            )
+
+        return locked
+
+    async def create_partition(self, *, table: str, name: str, lower: datetime, upper: datetime) -> None:
+        await self.db.execute(
+            query=CREATE_PARTITION_QUERY.format(
+                table=table, name=name, lower=lower.isoformat(), upper=upper.isoformat()
+            )
+        )
+
+    async def detach_partition(self, *, partition: PartitionInDB) -> None:
+        await self.db.execute(
+            query=DETACH_PARTITION_QUERY.format(table=partition.table, name=partition.name)
+        )
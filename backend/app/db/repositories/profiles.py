@@ -1,6 +1,6 @@
-from uuid import uuid4
+import datetime
+from typing import Optional
 
-from sqlalchemy.sql.expression import true
 from app.db.repositories.base import BaseRepository
 from app.models.profile import ProfileCreate, ProfileUpdate, ProfileInDB
 from app.models.user import UserInDB
@@ -34,6 +34,14 @@ GET_PROFILE_BY_USERNAME_QUERY = """
     WHERE user_id = (SELECT id FROM users WHERE username = :username);
 """
 
+GET_PROFILE_LAST_MODIFIED_BY_USERNAME_QUERY = """
+    SELECT GREATEST(p.updated_at, u.updated_at) AS last_modified
+    FROM profiles p
+        INNER JOIN users u
+        ON p.user_id = u.id
+    WHERE u.username = :username;
+"""
+
 UPDATE_PROFILE_QUERY = """
     UPDATE profiles
     SET full_name    = :full_name,
@@ -47,7 +55,7 @@ UPDATE_PROFILE_QUERY = """
 
 class ProfilesRepository(BaseRepository):
     async def create_profile_for_user(self, *, profile_create: ProfileCreate) -> ProfileInDB:
-        created_profile = await self.db.fetch_one(query=CREATE_PROFILE_FOR_USER_QUERY, values={**profile_create.dict(), "id": str(uuid4())})
+        created_profile = await self.db.fetch_one(query=CREATE_PROFILE_FOR_USER_QUERY, values={**profile_create.dict(), "id": self.generate_id()})
 
         return created_profile
 
@@ -65,6 +73,12 @@ class ProfilesRepository(BaseRepository):
         if profile_record:
             return ProfileInDB(**profile_record)
 
+    async def get_profile_last_modified_by_username(self, *, username: str) -> Optional[datetime.datetime]:
+        return await self.db.fetch_val(
+            query=GET_PROFILE_LAST_MODIFIED_BY_USERNAME_QUERY,
+            values={"username": username}
+        )
+
     async def update_profile(self, *, profile_update: ProfileUpdate, requesting_user: UserInDB) -> ProfileInDB:
         profile = await self.get_profile_by_user_id(user_id=requesting_user.id)
 
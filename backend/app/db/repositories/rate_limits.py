@@ -0,0 +1,43 @@
+from typing import Tuple
+
+from app.db.repositories.base import BaseRepository
+
+# every SET expression sees the old row, so the refill is spelled out each time
+REFILLED_TOKENS = """
+    LEAST(
+        CAST(:capacity AS DOUBLE PRECISION),
+        b.tokens + CAST(EXTRACT(EPOCH FROM now() - b.updated_at) AS DOUBLE PRECISION)
+                   * CAST(:refill_rate AS DOUBLE PRECISION)
+    )
+"""
+
+CONSUME_RATE_LIMIT_TOKEN_QUERY = f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (:key, CAST(:capacity AS DOUBLE PRECISION) - 1, TRUE, now())
+    ON CONFLICT (key) DO UPDATE
+    SET tokens     = CASE WHEN {REFILLED_TOKENS} >= 1 THEN {REFILLED_TOKENS} - 1 ELSE {REFILLED_TOKENS} END,
+        allowed    = {REFILLED_TOKENS} >= 1,
+        updated_at = now()
+    RETURNING tokens, allowed;
+"""
+
+DELETE_IDLE_RATE_LIMIT_BUCKETS_QUERY = """
+    DELETE FROM rate_limit_buckets
+    WHERE updated_at < now() - make_interval(secs => CAST(:idle_after AS DOUBLE PRECISION));
+"""
+
+
+class RateLimitsRepository(BaseRepository):
+    async def consume_token(self, *, key: str, capacity: int, refill_rate: float) -> Tuple[float, bool]:
+        bucket = await self.db.fetch_one(
+            query=CONSUME_RATE_LIMIT_TOKEN_QUERY,
+            values={"key": key, "capacity": capacity, "refill_rate": refill_rate}
+        )
+
+        return bucket["tokens"], bucket["allowed"]
+
+    async def delete_idle_buckets(self, *, idle_after: float) -> None:
+        await self.db.execute(
+            query=DELETE_IDLE_RATE_LIMIT_BUCKETS_QUERY,
+            values={"idle_after": idle_after}
+        )
@@ -0,0 +1,117 @@
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import REFRESH_TOKEN_EXPIRE_MINUTES
+from app.db.repositories.base import BaseRepository
+from app.models.token import IssuedRefreshToken, RefreshTokenInDB
+from app.models.user import UserInDB
+from app.services import auth_service
+
+CREATE_REFRESH_TOKEN_QUERY = """
+    INSERT INTO refresh_tokens (id, user_id, family_id, token_hash, expires_at)
+    VALUES (:id, :user_id, :family_id, :token_hash, :expires_at)
+    RETURNING id, user_id, family_id, token_hash, expires_at, revoked_at, replaced_by, created_at, updated_at;
+"""
+
+GET_REFRESH_TOKEN_BY_HASH_QUERY = """
+    SELECT id, user_id, family_id, token_hash, expires_at, revoked_at, replaced_by, created_at, updated_at
+    FROM refresh_tokens
+    WHERE token_hash = :token_hash;
+"""
+
+GET_REFRESH_TOKEN_BY_HASH_FOR_UPDATE_QUERY = """
+    SELECT id, user_id, family_id, token_hash, expires_at, revoked_at, replaced_by, created_at, updated_at
+    FROM refresh_tokens
+    WHERE token_hash = :token_hash
+    FOR UPDATE;
+"""
+
+REVOKE_REFRESH_TOKEN_QUERY = """
+    UPDATE refresh_tokens
+    SET revoked_at  = now(),
+        replaced_by = :replaced_by
+    WHERE id = :id;
+"""
+
+REVOKE_REFRESH_TOKEN_FAMILY_QUERY = """
+    UPDATE refresh_tokens
+    SET revoked_at = now()
+    WHERE family_id = :family_id AND revoked_at IS NULL;
+"""
+
+
+class RefreshTokensRepository(BaseRepository):
+    """
+    Rotating refresh tokens. Each token can be exchanged exactly once; presenting
+    an already rotated token revokes every token issued from the same login.
+    """
+
+    async def create_refresh_token_for_user(self, *, user: UserInDB) -> IssuedRefreshToken:
+        return await self._insert_refresh_token(user_id=user.id, family_id=self.generate_id())
+
+    async def get_refresh_token(self, *, refresh_token: str) -> Optional[RefreshTokenInDB]:
+        token_record = await self.db.fetch_one(
+            query=GET_REFRESH_TOKEN_BY_HASH_QUERY,
+            values={"token_hash": auth_service.hash_refresh_token(refresh_token=refresh_token)}
+        )
+
+        if not token_record:
+            return None
+
+        return RefreshTokenInDB(**token_record)
+
+    async def _insert_refresh_token(self, *, user_id: str, family_id: str) -> IssuedRefreshToken:
+        refresh_token = auth_service.generate_refresh_token()
+
+        created_token = await self.db.fetch_one(
+            query=CREATE_REFRESH_TOKEN_QUERY,
+            values={
+                "id": self.generate_id(),
+                "user_id": user_id,
+                "family_id": family_id,
+                "token_hash": auth_service.hash_refresh_token(refresh_token=refresh_token),
+                "expires_at": datetime.now(timezone.utc) + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES),
+            }
+        )
+        created_token = RefreshTokenInDB(**created_token)
+
+        return IssuedRefreshToken(
+            id=created_token.id,
+            refresh_token=refresh_token,
+            user_id=created_token.user_id,
+            expires_at=created_token.expires_at
+        )
+
+    async def rotate_refresh_token(self, *, refresh_token: str) -> Optional[IssuedRefreshToken]:
+        async with self.db.transaction():
+            token_record = await self.db.fetch_one(
+                query=GET_REFRESH_TOKEN_BY_HASH_FOR_UPDATE_QUERY,
+                values={"token_hash": auth_service.hash_refresh_token(refresh_token=refresh_token)}
+            )
+
+            if not token_record:
+                return None
+
+            existing_token = RefreshTokenInDB(**token_record)
+
+            if existing_token.revoked_at is not None:
+                await self.db.execute(
+                    query=REVOKE_REFRESH_TOKEN_FAMILY_QUERY,
+                    values={"family_id": existing_token.family_id}
+                )
+                return None
+
+            if existing_token.expires_at <= datetime.now(timezone.utc):
+                return None
+
+            issued_token = await self._insert_refresh_token(
+                user_id=existing_token.user_id,
+                family_id=existing_token.family_id
+            )
+
+            await self.db.execute(
+                query=REVOKE_REFRESH_TOKEN_QUERY,
+                values={"id": existing_token.id, "replaced_by": issued_token.id}
+            )
+
+            return issued_token
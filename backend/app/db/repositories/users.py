@@ -1,13 +1,11 @@
-from typing import Optional
-from uuid import uuid4
+from typing import Dict, List, Mapping, Optional, Union
 from pydantic import EmailStr
 from fastapi import HTTPException, status
-from sqlalchemy.sql.elements import False_
-from sqlalchemy.sql.expression import false
 from starlette.status import HTTP_400_BAD_REQUEST
 from databases import Database
 
 from app.db.repositories.base import BaseRepository
+from app.models.core import is_valid_uuid
 from app.models.user import UserCreate, UserPublic, UserUpdate, UserInDB
 from app.services import auth_service
 from app.db.repositories.profiles import ProfilesRepository
@@ -36,6 +34,52 @@ GET_USER_BY_ID_QUERY = """
     WHERE id = :id;
 """
 
+# users and their profiles in a single round trip, profile columns are prefixed
+SELECT_USERS_WITH_PROFILES = """
+    SELECT u.id,
+           u.username,
+           u.email,
+           u.email_verified,
+           u.password,
+           u.salt,
+           u.is_active,
+           u.is_superuser,
+           u.created_at,
+           u.updated_at,
+           p.id           AS profile_id,
+           p.full_name    AS profile_full_name,
+           p.phone_number AS profile_phone_number,
+           p.bio          AS profile_bio,
+           p.image        AS profile_image,
+           p.created_at   AS profile_created_at,
+           p.updated_at   AS profile_updated_at
+    FROM users u
+        LEFT JOIN profiles p
+        ON p.user_id = u.id
+"""
+
+GET_POPULATED_USER_BY_EMAIL_QUERY = SELECT_USERS_WITH_PROFILES + """
+    WHERE u.email = :email;
+"""
+
+GET_POPULATED_USER_BY_USERNAME_QUERY = SELECT_USERS_WITH_PROFILES + """
+    WHERE u.username = :username;
+"""
+
+GET_POPULATED_USER_BY_ID_QUERY = SELECT_USERS_WITH_PROFILES + """
+    WHERE u.id = :id;
+"""
+
+GET_POPULATED_USERS_BY_IDS_QUERY = SELECT_USERS_WITH_PROFILES + """
+    WHERE u.id = ANY(:ids);
+"""
+
+GET_USERS_BY_IDS_QUERY = """
+    SELECT id, username, email, email_verified, password, salt, is_active, is_superuser, created_at, updated_at
+    FROM users
+    WHERE id = ANY(:ids);
+"""
+
 
 class UsersRepository(BaseRepository):
     def __init__(self, db: Database) -> None:
@@ -44,49 +88,69 @@ class UsersRepository(BaseRepository):
         self.profiles_repo = ProfilesRepository(db)
 
     async def get_user_by_email(self, *, email: EmailStr, populate: bool = True) -> UserInDB:
+        if populate:
+            return await self._get_populated_user(query=GET_POPULATED_USER_BY_EMAIL_QUERY, values={"email": email})
+
         user_record = await self.db.fetch_one(query=GET_USER_BY_EMAIL_QUERY, values={"email": email})
 
         if user_record:
-            user = UserInDB(**user_record)
-
-            if populate:
-                return await self.populate_user(user=user)
-
-            return user
+            return UserInDB(**user_record)
 
     async def get_user_by_id(self, *, user_id: str, populate: bool = True) -> UserPublic:
+        if populate:
+            return await self._get_populated_user(query=GET_POPULATED_USER_BY_ID_QUERY, values={"id": user_id})
+
         user_record = await self.db.fetch_one(
             query=GET_USER_BY_ID_QUERY,
             values={"id": user_id}
         )
 
         if user_record:
-            user = UserInDB(**user_record)
-
-            if populate:
-                return await self.populate_user(user=user)
-
-            return user
+            return UserInDB(**user_record)
 
     async def get_user_by_username(self, *, username: str, populate: bool = True) -> UserInDB:
+        if populate:
+            return await self._get_populated_user(
+                query=GET_POPULATED_USER_BY_USERNAME_QUERY, values={"username": username}
+            )
+
         user_record = await self.db.fetch_one(query=GET_USER_BY_USERNAME_QUERY, values={"username": username})
 
         if user_record:
-            user = UserInDB(**user_record)
-
-            if populate:
-                return await self.populate_user(user=user)
+            return UserInDB(**user_record)
+
+    async def get_users_by_ids(
+        self, *, user_ids: List[str], populate: bool = True
+    ) -> Dict[str, Union[UserInDB, UserPublic]]:
+        """
+        Loads any number of users (and their profiles) with one query,
+        keyed by user id. Ids that don't match a user are left out.
+        """
+        # ids are uuid columns, anything else can't match and would only make Postgres raise
+        unique_ids = [id for id in set(user_ids) if is_valid_uuid(id)]
+
+        if not unique_ids:
+            return {}
+
+        if populate:
+            user_records = await self.db.fetch_all(
+                query=GET_POPULATED_USERS_BY_IDS_QUERY, values={"ids": unique_ids}
+            )
+            users = [self._populated_user_from_record(record=r) for r in user_records]
+        else:
+            user_records = await self.db.fetch_all(query=GET_USERS_BY_IDS_QUERY, values={"ids": unique_ids})
+            users = [UserInDB(**r) for r in user_records]
 
-            return user
+        return {user.id: user for user in users}
 
     async def register_new_user(self, *, new_user: UserCreate) -> UserInDB:
-        if await self.get_user_by_email(email=new_user.email) is not None:
+        if await self.get_user_by_email(email=new_user.email, populate=False) is not None:
             raise HTTPException(
                 status_code=HTTP_400_BAD_REQUEST,
                 detail="That email is already taken. Please try another one."
             )
 
-        if await self.get_user_by_username(username=new_user.username) is not None:
+        if await self.get_user_by_username(username=new_user.username, populate=False) is not None:
             raise HTTPException(
                 status_code=HTTP_400_BAD_REQUEST,
                 detail="That username is already taken. Please try another one."
@@ -95,9 +159,13 @@ class UsersRepository(BaseRepository):
         user_password_update = self.auth_service.create_salt_and_hashed_password(
             plaintext_password=new_user.password)
         new_user_params = new_user.copy(update=user_password_update.dict())
-        created_user = await self.db.fetch_one(query=REGISTER_NEW_USER_QUERY, values={**new_user_params.dict(), "id": str(uuid4())})
 
-        await self.profiles_repo.create_profile_for_user(profile_create=ProfileCreate(user_id=created_user["id"]))
+        async with self.db.transaction():
+            created_user = await self.db.fetch_one(query=REGISTER_NEW_USER_QUERY, values={**new_user_params.dict(), "id": self.generate_id()})
+
+            # in the same transaction, a registered user always has a profile to show
+            await self.profiles_repo.create_profile_for_user(
+                profile_create=ProfileCreate(user_id=created_user["id"]))
 
         return await self.populate_user(user=UserInDB(**created_user))
 
@@ -112,6 +180,27 @@ class UsersRepository(BaseRepository):
 
         return user
 
+    async def _get_populated_user(self, *, query: str, values: dict) -> Optional[UserPublic]:
+        user_record = await self.db.fetch_one(query=query, values=values)
+
+        if user_record:
+            return self._populated_user_from_record(record=user_record)
+
+    def _populated_user_from_record(self, *, record: Mapping) -> UserPublic:
+        record = dict(record)
+        profile_fields = {
+            key[len("profile_"):]: record.pop(key) for key in list(record) if key.startswith("profile_")
+        }
+        user = UserInDB(**record)
+
+        profile = None
+        if profile_fields["id"] is not None:
+            profile = ProfilePublic(
+                **profile_fields, user_id=user.id, username=user.username, email=user.email
+            )
+
+        return UserPublic(**user.dict(), profile=profile)
+
     async def populate_user(self, *, user: UserInDB) -> UserInDB:
         return UserPublic(
             **user.dict(),
@@ -1,7 +1,7 @@
 import os
 from fastapi import FastAPI
-from databases import Database
 from app.core.config import DATABASE_URL
+from app.db.pools import DatabasePools
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,11 +10,15 @@ logger = logging.getLogger(__name__)
 async def connect_to_db(app: FastAPI) -> None:
     DB_URL = f"{DATABASE_URL}_test" if os.environ.get(
         "TESTING") else DATABASE_URL
-    database = Database(DB_URL, min_size=2, max_size=10)
+    pools = DatabasePools(DB_URL)
+
+    # every pool's checkout wait feeds the adaptive concurrency limit
+    limiter = getattr(app.state, "concurrency_limiter", None)
 
     try:
-        await database.connect()
-        app.state._db = database
+        await pools.connect(on_wait=limiter.record_pool_wait if limiter else None)
+        app.state._db_pools = pools
+        app.state._db = pools.default
     except Exception as e:
         logger.warn("--- DB CONNECTION ERROR ---")
         logger.warn(e)
@@ -23,7 +27,7 @@ async def connect_to_db(app: FastAPI) -> None:
 
 async def close_db_connection(app: FastAPI) -> None:
     try:
-        await app.state._db.disconnect()
+        await app.state._db_pools.disconnect()
     except Exception as e:
         logger.warn("--- DB DISCONNECT ERROR ---")
         logger.warn(e)
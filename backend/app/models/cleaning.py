@@ -1,7 +1,9 @@
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Union
 from enum import Enum
 
-from app.models.core import IDModelMixin, CoreModel, DateTimeModelMixin
+from pydantic import BaseModel, root_validator
+
+from app.models.core import IDModelMixin, CoreModel, DateTimeModelMixin, UUIDStr
 from app.models.user import UserPublic
 
 
@@ -11,6 +13,42 @@ class CleaningType(str, Enum):
     full_clean = "full_clean"
 
 
+class CleaningExpansion(str, Enum):
+    owner = "owner"
+
+
+class CleaningOfferCounts(CoreModel):
+    """
+    How many of a cleaning's offers are in each status
+    """
+    pending: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    cancelled: int = 0
+    completed: int = 0
+
+
+class OfferCountsModelMixin(BaseModel):
+    offer_counts: Optional[CleaningOfferCounts]
+
+    @root_validator(pre=True)
+    def collect_offer_counts(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        cleanings rows carry one <status>_offers counter column per status
+        """
+        values = dict(values)
+        counts = {
+            status: values.pop(f"{status}_offers")
+            for status in CleaningOfferCounts.__fields__
+            if f"{status}_offers" in values
+        }
+
+        if counts:
+            values["offer_counts"] = counts
+
+        return values
+
+
 class CleaningBase(CoreModel):
     """
     All common characteristics of our cleaning resource
@@ -30,12 +68,27 @@ class CleaningUpdate(CleaningBase):
     cleaning_type: Optional[CleaningType]
 
 
-class CleaningInDB(IDModelMixin, CleaningBase, DateTimeModelMixin):
+class CleaningInDB(IDModelMixin, CleaningBase, OfferCountsModelMixin, DateTimeModelMixin):
     name: str
     price: float
     cleaning_type: CleaningType
-    owner: str
+    owner: UUIDStr
+
+
+class CleaningPublic(IDModelMixin, CleaningBase, OfferCountsModelMixin):
+    owner: Union[UUIDStr, UserPublic]
 
 
-class CleaningPublic(IDModelMixin, CleaningBase):
-    owner: Union[str, UserPublic]
+class CleaningDetailDrift(CoreModel):
+    id: UUIDStr
+    drift: Optional[str]
+
+
+class CleaningDetailsCheck(CoreModel):
+    """
+    What a consistency check of the cleaning_details projection found
+    """
+    checked: int = 0
+    missing: int = 0
+    stale: int = 0
+    orphaned: int = 0
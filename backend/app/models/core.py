@@ -1,8 +1,38 @@
-from typing import Optional
+import uuid
+from typing import Any, Dict, Optional
 from pydantic import BaseModel, validator
+from pydantic.validators import str_validator
 from datetime import datetime
 
 
+def is_valid_uuid(value: Any) -> bool:
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+class UUIDStr(str):
+    """
+    Ids are native uuid columns, but stay plain strings in our models and
+    responses, whether asyncpg hands them back as UUID or as text.
+    """
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="string", format="uuid")
+
+    @classmethod
+    def validate(cls, value: Any) -> str:
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str_validator(value)
+
+
 class CoreModel(BaseModel):
     """
     Any common logic to be shared by all models goes here.
@@ -20,4 +50,4 @@ class DateTimeModelMixin(BaseModel):
 
 
 class IDModelMixin(BaseModel):
-    id: str
+    id: UUIDStr
@@ -1,12 +1,28 @@
-from typing import Optional, Union
+import datetime
+from enum import Enum
+from typing import List, Optional, Union
 
 from pydantic import conint, confloat
 
-from app.models.core import DateTimeModelMixin, CoreModel
+from app.models.core import DateTimeModelMixin, CoreModel, UUIDStr
 from app.models.user import UserPublic
 from app.models.cleaning import CleaningPublic
 
 
+class EvaluationExpansion(str, Enum):
+    cleaner = "cleaner"
+    cleaning = "cleaning"
+    owner = "owner"
+
+
+class EvaluationSort(str, Enum):
+    newest = "newest"
+    oldest = "oldest"
+    # ties go newest first when highest rated, oldest first when lowest rated
+    highest_rated = "highest_rated"
+    lowest_rated = "lowest_rated"
+
+
 class EvaluationBase(CoreModel):
     no_show: bool = False
     headline: Optional[str]
@@ -26,17 +42,18 @@ class EvaluationUpdate(EvaluationBase):
 
 
 class EvaluationInDB(DateTimeModelMixin, EvaluationBase):
-    cleaner_id: str
-    cleaning_id: str
+    cleaner_id: UUIDStr
+    cleaning_id: UUIDStr
 
 
 class EvaluationAggregate(CoreModel):
-    avg_professionalism: confloat(ge=0, le=5)
-    avg_completeness: confloat(ge=0, le=5)
-    avg_efficiency: confloat(ge=0, le=5)
-    avg_overall_rating: confloat(ge=0, le=5)
-    max_overall_rating: conint(ge=0, le=5)
-    min_overall_rating: conint(ge=0, le=5)
+    # averages and extremes are null until the cleaner's first evaluation
+    avg_professionalism: Optional[confloat(ge=0, le=5)]
+    avg_completeness: Optional[confloat(ge=0, le=5)]
+    avg_efficiency: Optional[confloat(ge=0, le=5)]
+    avg_overall_rating: Optional[confloat(ge=0, le=5)]
+    max_overall_rating: Optional[conint(ge=0, le=5)]
+    min_overall_rating: Optional[conint(ge=0, le=5)]
     one_stars: conint(ge=0)
     two_stars: conint(ge=0)
     three_stars: conint(ge=0)
@@ -47,6 +64,19 @@ class EvaluationAggregate(CoreModel):
 
 
 class EvaluationPublic(EvaluationInDB):
-    owner: Optional[Union[str, UserPublic]]
+    owner: Optional[Union[UUIDStr, UserPublic]]
     cleaner: Optional[UserPublic]
     cleaning: Optional[CleaningPublic]
+
+
+class EvaluationCursor(CoreModel):
+    # a cursor only continues the sort it was made for
+    sort: EvaluationSort
+    overall_rating: int
+    created_at: datetime.datetime
+    cleaning_id: UUIDStr
+
+
+class EvaluationListWithStats(CoreModel):
+    evaluations: List[EvaluationPublic]
+    stats: EvaluationAggregate
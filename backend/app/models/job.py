@@ -0,0 +1,52 @@
+import json
+from enum import Enum
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+from pydantic import validator
+
+from app.models.core import CoreModel, DateTimeModelMixin
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class JobCreate(CoreModel):
+    task: str
+    payload: Dict[str, Any] = {}
+    max_attempts: int
+
+
+class JobInDB(DateTimeModelMixin, CoreModel):
+    id: int
+    task: str
+    payload: Dict[str, Any]
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str]
+    run_at: datetime
+    locked_at: Optional[datetime]
+
+    @validator("payload", pre=True)
+    def decode_payload(cls, value: Any) -> Dict[str, Any]:
+        # asyncpg hands JSONB columns back as text
+        if isinstance(value, str):
+            return json.loads(value)
+
+        return value
+
+
+class JobMetrics(CoreModel):
+    """
+    Counters kept by a running worker since it was started
+    """
+    claimed: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+    total_run_seconds: float = 0.0
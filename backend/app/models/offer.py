@@ -1,6 +1,7 @@
+import datetime
 from enum import Enum
 from typing import Optional
-from app.models.core import CoreModel, DateTimeModelMixin
+from app.models.core import CoreModel, DateTimeModelMixin, UUIDStr
 from app.models.user import UserPublic
 from app.models.cleaning import CleaningPublic
 
@@ -13,15 +14,20 @@ class OfferStatus(str, Enum):
     completed = "completed"
 
 
+class OfferExpansion(str, Enum):
+    user = "user"
+    cleaning = "cleaning"
+
+
 class OfferBase(CoreModel):
-    user_id: Optional[str]
-    cleaning_id: Optional[str]
+    user_id: Optional[UUIDStr]
+    cleaning_id: Optional[UUIDStr]
     status: Optional[OfferStatus] = OfferStatus.pending
 
 
 class OfferCreate(OfferBase):
-    user_id: str
-    cleaning_id: str
+    user_id: UUIDStr
+    cleaning_id: UUIDStr
 
 
 class OfferUpdate(CoreModel):
@@ -29,10 +35,27 @@ class OfferUpdate(CoreModel):
 
 
 class OfferInDB(DateTimeModelMixin, OfferBase):
-    user_id: str
-    cleaning_id: str
+    user_id: UUIDStr
+    cleaning_id: UUIDStr
 
 
 class OfferPublic(OfferInDB):
     user: Optional[UserPublic]
     cleaning: Optional[CleaningPublic]
+
+
+class OfferCursor(CoreModel):
+    """
+    Where a page of a cleaner's offers, newest first, left off
+    """
+    created_at: datetime.datetime
+    cleaning_id: UUIDStr
+
+
+class CleaningOfferCursor(CoreModel):
+    """
+    Where a page of a cleaning's offers, by status priority then age, left off
+    """
+    status: OfferStatus
+    created_at: datetime.datetime
+    user_id: UUIDStr
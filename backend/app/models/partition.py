@@ -0,0 +1,43 @@
+import re
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+from pydantic import root_validator
+
+from app.models.core import CoreModel
+
+# pg_get_expr renders a range partition's bounds as FOR VALUES FROM (...) TO (...)
+PARTITION_BOUNDS_PATTERN = re.compile(r"FROM \((?P<lower>[^)]+)\) TO \((?P<upper>[^)]+)\)")
+
+
+def parse_partition_bound(value: str) -> Optional[datetime]:
+    """A single timestamptz bound, None for MINVALUE and MAXVALUE."""
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+
+    # postgres writes whole hour offsets as +00, which fromisoformat won't take
+    value = re.sub(r"([+-]\d{2})$", r"\1:00", value.strip("'"))
+    return datetime.fromisoformat(value)
+
+
+class PartitionInDB(CoreModel):
+    table: str
+    name: str
+    lower: Optional[datetime]
+    upper: Optional[datetime]
+
+    @root_validator(pre=True)
+    def parse_bounds(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        values = dict(values)
+        bounds = values.pop("bounds", None)
+
+        if bounds:
+            match = PARTITION_BOUNDS_PATTERN.search(bounds)
+            if not match:
+                raise ValueError(f"Not a range partition: {bounds}")
+
+            values["lower"] = parse_partition_bound(match.group("lower"))
+            values["upper"] = parse_partition_bound(match.group("upper"))
+
+        return values
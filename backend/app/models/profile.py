@@ -2,7 +2,7 @@ from typing import Optional
 
 from pydantic import EmailStr, HttpUrl
 
-from app.models.core import DateTimeModelMixin, IDModelMixin, CoreModel
+from app.models.core import DateTimeModelMixin, IDModelMixin, CoreModel, UUIDStr
 
 
 class ProfileBase(CoreModel):
@@ -13,7 +13,7 @@ class ProfileBase(CoreModel):
 
 
 class ProfileCreate(ProfileBase):
-    user_id: str
+    user_id: UUIDStr
 
 
 class ProfileUpdate(ProfileBase):
@@ -21,7 +21,7 @@ class ProfileUpdate(ProfileBase):
 
 
 class ProfileInDB(IDModelMixin, DateTimeModelMixin, ProfileBase):
-    user_id: str
+    user_id: UUIDStr
     username: Optional[str]
     email: Optional[EmailStr]
 
@@ -1,16 +1,26 @@
+from typing import Optional
 from datetime import datetime, timedelta
-from pydantic import EmailStr
+from pydantic import EmailStr, Field
 
 from app.core.config import JWT_AUDIENCE, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.models.core import CoreModel
+from app.models.core import CoreModel, DateTimeModelMixin, IDModelMixin, UUIDStr
+
+
+def get_issued_at_timestamp() -> float:
+    return datetime.timestamp(datetime.utcnow())
+
+
+def get_expiration_timestamp() -> float:
+    return datetime.timestamp(
+        datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
 
 class JWTMeta(CoreModel):
     iss: str = "stitcher.io"
     aud: str = JWT_AUDIENCE
-    iat: float = datetime.timestamp(datetime.utcnow())
-    exp: float = datetime.timestamp(
-        datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # factories so every token gets timestamps from when it was built, not from import time
+    iat: float = Field(default_factory=get_issued_at_timestamp)
+    exp: float = Field(default_factory=get_expiration_timestamp)
 
 
 class JWTCreds(CoreModel):
@@ -27,3 +37,28 @@ class JWTPayload(JWTMeta, JWTCreds):
 class AccessToken(CoreModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str]
+
+
+class RefreshTokenRequest(CoreModel):
+    refresh_token: str
+
+
+class RefreshTokenInDB(IDModelMixin, DateTimeModelMixin, CoreModel):
+    """
+    Only a hash of the refresh token is stored. Tokens issued from the same
+    login share a family_id so a replayed token can revoke all of them.
+    """
+    user_id: UUIDStr
+    family_id: UUIDStr
+    token_hash: str
+    expires_at: datetime
+    revoked_at: Optional[datetime]
+    replaced_by: Optional[UUIDStr]
+
+
+class IssuedRefreshToken(IDModelMixin, CoreModel):
+    """The plaintext token, only ever available right after it was issued"""
+    refresh_token: str
+    user_id: UUIDStr
+    expires_at: datetime
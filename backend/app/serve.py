@@ -0,0 +1,148 @@
+"""
+Production entry point.
+
+    python -m app.serve
+
+The application is imported once in the supervisor, the listening socket is
+bound once, and SERVER_WORKERS processes are forked from there. Every worker
+inherits the already loaded app and configuration and accepts connections
+on the shared socket. SIGTERM/SIGINT are forwarded to the workers, which
+stop accepting connections and drain in-flight requests before exiting.
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+import importlib.util
+from typing import Dict
+
+import uvicorn
+
+from app.core.config import (
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
+    SERVER_GRACEFUL_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_worker_count() -> int:
+    if SERVER_WORKERS > 0:
+        return SERVER_WORKERS
+
+    # respects cpu limits set through affinity, e.g. docker --cpuset-cpus
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+
+    return os.cpu_count() or 1
+
+
+def get_loop_implementation() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def get_http_implementation() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((SERVER_HOST, SERVER_PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    return sock
+
+
+def run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    # drop the supervisor's handlers, uvicorn installs its own graceful ones
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    uvicorn.Server(config=config).run(sockets=[sock])
+
+
+def spawn_worker(config: uvicorn.Config, sock: socket.socket) -> int:
+    pid = os.fork()
+
+    if pid == 0:
+        try:
+            run_worker(config, sock)
+        except BaseException:
+            logger.exception("Worker crashed")
+            os._exit(1)
+
+        os._exit(0)
+
+    return pid
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    # preload: import the app before forking so workers share the loaded modules
+    from app.api.server import app
+
+    config = uvicorn.Config(
+        app,
+        loop=get_loop_implementation(),
+        http=get_http_implementation(),
+        lifespan="on",
+        proxy_headers=True,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+    sock = bind_socket()
+    worker_count = get_worker_count()
+
+    logger.info(
+        f"Serving on {SERVER_HOST}:{SERVER_PORT} with {worker_count} workers "
+        f"(loop={config.loop}, http={config.http})"
+    )
+
+    workers: Dict[int, int] = {}
+    shutting_down = False
+
+    def shutdown(signum, frame) -> None:
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for slot in range(worker_count):
+        workers[spawn_worker(config, sock)] = slot
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        slot = workers.pop(pid, None)
+        if slot is None:
+            continue
+
+        if not shutting_down:
+            logger.warning(
+                f"Worker {pid} exited with status {status}, restarting it")
+            time.sleep(1)
+            workers[spawn_worker(config, sock)] = slot
+
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import logging
+from typing import List, Optional
+
+from databases import Database
+
+from app.core.config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL_SECONDS
+from app.db.repositories.cleanings import CleaningsRepository
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_cleanings(
+    db: Database,
+    *,
+    archive_after_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    ids: Optional[List[str]] = None,
+) -> int:
+    """
+    Archives batch after batch until nothing is left to archive, each batch
+    in its own short transaction. `ids` limits it to those cleanings. Returns
+    how many cleanings were archived.
+    """
+    cleanings_repo = CleaningsRepository(db)
+    total = 0
+
+    while True:
+        archived = await cleanings_repo.archive_cleanings(
+            archive_after_days=archive_after_days, batch_size=batch_size, ids=ids
+        )
+        total += archived
+
+        if archived < batch_size:
+            break
+
+    if total:
+        logger.info(f"Archived {total} cleanings")
+
+    return total
+
+
+class CleaningArchiver(PeriodicTask):
+    name = "cleaning archiver"
+
+    def __init__(self, db: Database, *, interval: float = ARCHIVE_INTERVAL_SECONDS) -> None:
+        super().__init__(db, interval=interval)
+
+    async def run_once(self) -> None:
+        await archive_cleanings(self.db)
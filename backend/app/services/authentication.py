@@ -1,5 +1,9 @@
-from typing import Optional, Type
-from _pytest.python_api import raises
+import time
+import hashlib
+import secrets
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple, Type
 import bcrypt
 from fastapi.exceptions import HTTPException
 import jwt
@@ -7,14 +11,25 @@ from datetime import datetime, timedelta
 
 from pydantic.error_wrappers import ValidationError
 from starlette import status
-from passlib.context import CryptContext
 
-from app.core.config import SECRET_KEY, JWT_ALGORITHM, JWT_AUDIENCE, JWT_TOKEN_PREFIX, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import (
+    SECRET_KEY,
+    JWT_ALGORITHM,
+    JWT_AUDIENCE,
+    JWT_TOKEN_PREFIX,
+    JWT_CACHE_MAX_SIZE,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+)
 from app.models.token import JWTMeta, JWTCreds, JWTPayload
 from app.models.user import UserPasswordUpdate, UserInDB, UserBase
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache()
+def get_pwd_context():
+    # passlib is only needed to register users and log them in, not on every request
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 class AuthException(BaseException):
@@ -24,7 +39,64 @@ class AuthException(BaseException):
     pass
 
 
+class VerifiedToken(NamedTuple):
+    token: str
+    username: str
+    exp: float
+
+
+class TokenCache:
+    """
+    Bounded LRU of tokens that already passed signature and claims validation.
+    Entries are keyed by the signing secret and the token's signature segment
+    and are dropped as soon as the token expires.
+    """
+
+    def __init__(self, *, max_size: int = JWT_CACHE_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], VerifiedToken]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(*, token: str, secret_key: str) -> Tuple[str, str]:
+        return (secret_key, token.rpartition(".")[2])
+
+    def get(self, *, token: str, secret_key: str) -> Optional[VerifiedToken]:
+        key = self._key(token=token, secret_key=secret_key)
+        entry = self._entries.get(key)
+
+        # the whole token must match, a reused signature on another payload is a miss
+        if entry is None or entry.token != token:
+            return None
+
+        if entry.exp <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, *, token: str, secret_key: str, username: str, exp: float) -> None:
+        if self.max_size <= 0:
+            return
+
+        key = self._key(token=token, secret_key=secret_key)
+        self._entries[key] = VerifiedToken(token=token, username=username, exp=exp)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class AuthService:
+    def __init__(self) -> None:
+        self.token_cache = TokenCache()
+
     def create_salt_and_hashed_password(self, *, plaintext_password: str) -> UserPasswordUpdate:
         salt = self.generate_salt()
         hashed_password = self.hash_password(
@@ -36,10 +108,17 @@ class AuthService:
         return bcrypt.gensalt().decode()
 
     def hash_password(self, *, password: str, salt: str) -> str:
-        return pwd_context.hash(password + salt)
+        return get_pwd_context().hash(password + salt)
 
     def verify_password(self, *, password: str, salt: str, hashed_pwd: str) -> bool:
-        return pwd_context.verify(password+salt, hashed_pwd)
+        return get_pwd_context().verify(password+salt, hashed_pwd)
+
+    def generate_refresh_token(self) -> str:
+        return secrets.token_urlsafe(48)
+
+    def hash_refresh_token(self, *, refresh_token: str) -> str:
+        # refresh tokens are long random strings, a fast digest is enough to store them safely
+        return hashlib.sha256(refresh_token.encode()).hexdigest()
 
     def create_access_token_for_user(
         self,
@@ -72,6 +151,12 @@ class AuthService:
         return access_token
 
     def get_username_from_token(self, *, token: str, secret_key: str) -> Optional[str]:
+        if isinstance(token, str):
+            cached = self.token_cache.get(token=token, secret_key=str(secret_key))
+
+            if cached:
+                return cached.username
+
         try:
             decoded_token = jwt.decode(token, str(
                 secret_key), audience=JWT_AUDIENCE, algorithms=[JWT_ALGORITHM])
@@ -82,4 +167,9 @@ class AuthService:
                 detail="Could not validate token credentials.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+
+        self.token_cache.set(
+            token=token, secret_key=str(secret_key), username=payload.username, exp=payload.exp
+        )
+
         return payload.username
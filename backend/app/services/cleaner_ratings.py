@@ -0,0 +1,38 @@
+import datetime
+import logging
+from typing import Optional
+
+from databases import Database
+
+from app.core.config import CLEANER_RATINGS_BACKFILL_BATCH_DAYS
+from app.db.repositories.cleaner_ratings import CleanerRatingsRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_cleaner_daily_ratings(
+    db: Database,
+    *,
+    since: Optional[datetime.date] = None,
+    batch_days: int = CLEANER_RATINGS_BACKFILL_BATCH_DAYS,
+) -> int:
+    """
+    Rebuilds the cleaner_daily_ratings rollup from `since`, or the first
+    evaluation's day, through today, `batch_days` per transaction. Safe to
+    run next to the API and to run again. Returns the rollup rows written.
+    """
+    ratings_repo = CleanerRatingsRepository(db)
+    first_day = since or await ratings_repo.get_first_evaluation_day()
+    if first_day is None:
+        return 0
+
+    end_day = datetime.datetime.now(datetime.timezone.utc).date() + datetime.timedelta(days=1)
+    written = 0
+
+    while first_day < end_day:
+        batch_end_day = min(first_day + datetime.timedelta(days=batch_days), end_day)
+        written += await ratings_repo.rebuild_days(first_day=first_day, end_day=batch_end_day)
+        logger.info(f"Rebuilt cleaner_daily_ratings from {first_day} up to {batch_end_day}")
+        first_day = batch_end_day
+
+    return written
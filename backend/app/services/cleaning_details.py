@@ -0,0 +1,59 @@
+import logging
+
+from databases import Database
+
+from app.core.config import CLEANING_DETAILS_CHECK_BATCH_SIZE, CLEANING_DETAILS_CHECK_INTERVAL_SECONDS
+from app.db.repositories.cleaning_details import CleaningDetailsRepository
+from app.models.cleaning import CleaningDetailsCheck
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+async def check_cleaning_details(
+    db: Database, *, repair: bool = True, batch_size: int = CLEANING_DETAILS_CHECK_BATCH_SIZE
+) -> CleaningDetailsCheck:
+    """
+    Walks every live cleaning in id order, batch by batch, comparing its
+    cleaning_details row with the document its sources produce now. Missing,
+    stale and orphaned rows are counted and, with `repair`, refreshed.
+    """
+    details_repo = CleaningDetailsRepository(db)
+    check = CleaningDetailsCheck()
+    after = None
+
+    while True:
+        batch = await details_repo.find_drift(after=after, batch_size=batch_size)
+        if not batch:
+            break
+
+        check.checked += len(batch)
+        drifted = [d for d in batch if d.drift]
+        check.missing += sum(d.drift == "missing" for d in drifted)
+        check.stale += sum(d.drift == "stale" for d in drifted)
+
+        if repair:
+            await details_repo.refresh(ids=[d.id for d in drifted])
+
+        after = batch[-1].id
+
+    orphans = await details_repo.find_orphans()
+    check.orphaned = len(orphans)
+    if repair:
+        await details_repo.refresh(ids=[d.id for d in orphans])
+
+    if check.missing or check.stale or check.orphaned:
+        logger.warning(f"cleaning_details drifted from its sources: {check.dict()}")
+
+    return check
+
+
+class CleaningDetailsChecker(PeriodicTask):
+    name = "cleaning details check"
+    run_on_start = False
+
+    def __init__(self, db: Database, *, interval: float = CLEANING_DETAILS_CHECK_INTERVAL_SECONDS) -> None:
+        super().__init__(db, interval=interval)
+
+    async def run_once(self) -> None:
+        await check_cleaning_details(self.db)
@@ -0,0 +1,130 @@
+import json
+import time
+import asyncio
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import FEED_SNAPSHOT_SIZE, FEED_SNAPSHOT_TTL_SECONDS
+from app.db.repositories.feed import FeedRepository
+from app.models.feed import CleaningFeedItem
+from app.models.user import UserPublic
+
+
+def get_default_feed_starting_date() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=10)
+
+
+class CleaningFeedSnapshot:
+    """
+    The newest `size` cleaning feed events with their owners populated.
+
+    The feed is the same for every user, so a worker keeps one copy in memory
+    and serves any page that falls inside it, the default head of the feed as
+    pre-serialized bytes. Deeper pages still go to the database.
+
+    The snapshot is rebuilt on the first request after `ttl` seconds or after
+    a cleaning or one of its offers was written through this worker, offers
+    because feed items carry offer counts. Writes made by other workers show
+    up once the ttl runs out.
+    """
+
+    def __init__(self, *, size: int = FEED_SNAPSHOT_SIZE, ttl: float = FEED_SNAPSHOT_TTL_SECONDS) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.items: List[CleaningFeedItem] = []
+        self.refreshed_at: Optional[float] = None
+        self.stale = True
+        self.hits = 0
+        self.misses = 0
+        self._serialized_pages: Dict[Tuple[int, int], bytes] = {}
+        # created lazily so it binds to the loop of the worker serving requests
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def mark_stale(self) -> None:
+        self.stale = True
+
+    def is_fresh(self) -> bool:
+        return (
+            not self.stale
+            and self.refreshed_at is not None
+            and time.monotonic() - self.refreshed_at < self.ttl
+        )
+
+    async def refresh_if_needed(self, *, feed_repo: FeedRepository) -> None:
+        if self.is_fresh():
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # a single request rebuilds the snapshot, the others wait for it
+        async with self._lock:
+            if self.is_fresh():
+                return
+
+            # reset first, a write landing during the refresh marks it stale again
+            self.stale = False
+            items = await feed_repo.fetch_cleaning_jobs_feed(
+                page_chunk_size=self.size, starting_date=get_default_feed_starting_date(), populate=True,
+            )
+
+            self.items = items
+            self._serialized_pages = {}
+            self.refreshed_at = time.monotonic()
+
+    def find_page(self, *, starting_date: datetime.datetime, page_chunk_size: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the (start, end) slice of the snapshot that answers the page,
+        or None when the page reaches past the end of the snapshot.
+        """
+        start = 0
+        while start < len(self.items) and self.items[start].event_timestamp >= starting_date:
+            start += 1
+
+        end = min(start + page_chunk_size, len(self.items))
+
+        # a short page is only complete when the snapshot holds the whole feed
+        if end - start < page_chunk_size and len(self.items) >= self.size:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return start, end
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "size": len(self.items),
+            "fresh": self.is_fresh(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def get_page(self, *, start: int, end: int, populate: bool = True) -> List[CleaningFeedItem]:
+        page = []
+        for row_number, item in enumerate(self.items[start:end], start=1):
+            update = {}
+            if item.row_number != row_number:
+                update["row_number"] = row_number
+            if not populate and isinstance(item.owner, UserPublic):
+                update["owner"] = item.owner.id
+            page.append(item.copy(update=update) if update else item)
+
+        return page
+
+    def get_serialized_page(self, *, start: int, end: int) -> bytes:
+        if (start, end) not in self._serialized_pages:
+            self._serialized_pages[(start, end)] = json.dumps(
+                jsonable_encoder(self.get_page(start=start, end=end)),
+                ensure_ascii=False,
+                allow_nan=False,
+                indent=None,
+                separators=(",", ":"),
+            ).encode("utf-8")
+
+        return self._serialized_pages[(start, end)]
@@ -0,0 +1,190 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from databases import Database
+
+from app.core.config import (
+    JOBS_ALWAYS_EAGER,
+    JOBS_MAX_ATTEMPTS,
+    JOBS_POLL_INTERVAL_SECONDS,
+    JOBS_RETRY_BACKOFF_MAX_SECONDS,
+    JOBS_RETRY_BACKOFF_SECONDS,
+    JOBS_STALE_AFTER_SECONDS,
+    JOBS_WORKER_CONCURRENCY,
+)
+from app.db.repositories.jobs import JobsRepository
+from app.models.job import JobCreate, JobInDB, JobMetrics
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[None]]
+
+job_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(task: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Registers a coroutine as the handler for a task name. Handlers receive
+    the database followed by the job payload as keyword arguments.
+    """
+    def register(handler: JobHandler) -> JobHandler:
+        job_handlers[task] = handler
+        return handler
+
+    return register
+
+
+def jobs_run_eagerly() -> bool:
+    return JOBS_ALWAYS_EAGER or bool(os.environ.get("TESTING"))
+
+
+async def enqueue_job(
+    db: Database, *, task: str, payload: Optional[Dict[str, Any]] = None, max_attempts: int = JOBS_MAX_ATTEMPTS
+) -> Optional[JobInDB]:
+    """
+    Stores a job to be picked up by a worker. When called inside a transaction
+    the job is only visible once that transaction commits.
+    """
+    if task not in job_handlers:
+        raise KeyError(f"No job handler registered for task '{task}'.")
+
+    payload = payload or {}
+
+    if jobs_run_eagerly():
+        await job_handlers[task](db, **payload)
+        return None
+
+    return await JobsRepository(db).enqueue_job(
+        job_create=JobCreate(task=task, payload=payload,
+                             max_attempts=max_attempts)
+    )
+
+
+def compute_retry_delay(*, attempts: int) -> float:
+    return min(
+        JOBS_RETRY_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0),
+        JOBS_RETRY_BACKOFF_MAX_SECONDS
+    )
+
+
+class JobWorker:
+    """
+    Polls the jobs table and runs claimed jobs with a fixed number of
+    concurrent consumers. Can run inside the API process or on its own.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        *,
+        concurrency: int = JOBS_WORKER_CONCURRENCY,
+        poll_interval: float = JOBS_POLL_INTERVAL_SECONDS,
+        stale_after: float = JOBS_STALE_AFTER_SECONDS,
+    ) -> None:
+        self.db = db
+        self.jobs_repo = JobsRepository(db)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.metrics = JobMetrics()
+        self._stopping = asyncio.Event()
+        self._consumers: List[asyncio.Task] = []
+        self._requeuer: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self.requeue_stale_jobs()
+
+        self._stopping.clear()
+        self._consumers = [
+            asyncio.create_task(self._consume()) for _ in range(self.concurrency)
+        ]
+        self._requeuer = asyncio.create_task(self._requeue_stale())
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        await asyncio.gather(*self._consumers, self._requeuer, return_exceptions=True)
+        self._consumers = []
+        self._requeuer = None
+
+    async def requeue_stale_jobs(self) -> int:
+        """
+        Puts jobs left running longer than `stale_after` back in the queue,
+        whether their worker crashed or another process's did.
+        """
+        requeued = await self.jobs_repo.requeue_stale_jobs(stale_after=self.stale_after)
+        if requeued:
+            logger.info(f"Requeued {requeued} stale jobs")
+
+        return requeued
+
+    async def run_once(self) -> bool:
+        """
+        Claims and runs a single job. Returns False when nothing was runnable.
+        """
+        jobs = await self.jobs_repo.claim_jobs(limit=1)
+
+        if not jobs:
+            return False
+
+        self.metrics.claimed += 1
+        await self.process_job(job=jobs[0])
+
+        return True
+
+    async def process_job(self, *, job: JobInDB) -> None:
+        started = time.perf_counter()
+
+        try:
+            handler = job_handlers[job.task]
+            await handler(self.db, **job.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+            if job.attempts >= job.max_attempts:
+                logger.warning(f"Job {job.id} ({job.task}) failed for good: {error}")
+                self.metrics.failed += 1
+                await self.jobs_repo.mark_job_failed(job=job, error=error)
+            else:
+                self.metrics.retried += 1
+                await self.jobs_repo.retry_job(
+                    job=job, error=error, delay=compute_retry_delay(attempts=job.attempts)
+                )
+        else:
+            self.metrics.succeeded += 1
+            await self.jobs_repo.mark_job_succeeded(job=job)
+        finally:
+            self.metrics.total_run_seconds += time.perf_counter() - started
+
+    async def _consume(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                logger.warning("--- JOB WORKER ERROR ---")
+                logger.warning(e)
+                logger.warning("--- JOB WORKER ERROR ---")
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _requeue_stale(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+
+            try:
+                await self.requeue_stale_jobs()
+            except Exception as e:
+                logger.warning("--- JOB WORKER ERROR ---")
+                logger.warning(e)
+                logger.warning("--- JOB WORKER ERROR ---")
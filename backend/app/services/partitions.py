@@ -0,0 +1,133 @@
+import logging
+from typing import List, NamedTuple, Optional, Tuple
+from datetime import date, datetime, timezone
+
+from databases import Database
+
+from app.core.config import (
+    PARTITION_LOCK_TIMEOUT_MS,
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+    PARTITION_MONTHS_AHEAD,
+    PARTITION_RETENTION_MONTHS,
+)
+from app.db.repositories.partitions import PartitionsRepository
+from app.models.partition import PartitionInDB
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("user_offers_for_cleanings", "cleaning_to_cleaner_evaluations")
+
+
+class PartitionPlan(NamedTuple):
+    create: List[date]
+    detach: List[PartitionInDB]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(moment: datetime) -> date:
+    return moment.astimezone(timezone.utc).date().replace(day=1)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    def to_datetime(day: date) -> datetime:
+        return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+    return to_datetime(month), to_datetime(add_months(month, 1))
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year}_{month.month:02d}"
+
+
+def plan_partitions(
+    partitions: List[PartitionInDB], *, now: datetime, months_ahead: int, retention_months: int
+) -> PartitionPlan:
+    """
+    Monthly partitions from the last existing one up to `months_ahead` past
+    the current month, and the partitions that ended more than
+    `retention_months` ago. A retention of 0 never detaches anything.
+    """
+    current = month_start(now)
+
+    upper_bounds = [p.upper for p in partitions if p.upper]
+    month = month_start(max(upper_bounds)) if upper_bounds else current
+
+    create = []
+    while month <= add_months(current, months_ahead):
+        create.append(month)
+        month = add_months(month, 1)
+
+    detach = []
+    if retention_months > 0:
+        cutoff, _ = month_bounds(add_months(current, -retention_months))
+        detach = [p for p in partitions if p.upper and p.upper <= cutoff]
+
+    return PartitionPlan(create=create, detach=detach)
+
+
+async def maintain_partitions(
+    db: Database,
+    *,
+    now: Optional[datetime] = None,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    retention_months: int = PARTITION_RETENTION_MONTHS,
+) -> Optional[PartitionPlan]:
+    """
+    Creates and detaches partitions of every partitioned table. Returns None
+    when another process is already at it.
+    """
+    partitions_repo = PartitionsRepository(db)
+    now = now or datetime.now(timezone.utc)
+    created, detached = [], []
+
+    async with db.transaction():
+        if not await partitions_repo.try_lock_maintenance(lock_timeout_ms=PARTITION_LOCK_TIMEOUT_MS):
+            return None
+
+        for table in PARTITIONED_TABLES:
+            plan = plan_partitions(
+                await partitions_repo.list_partitions(table=table),
+                now=now, months_ahead=months_ahead, retention_months=retention_months,
+            )
+
+            for month in plan.create:
+                lower, upper = month_bounds(month)
+                await partitions_repo.create_partition(
+                    table=table, name=partition_name(table, month), lower=lower, upper=upper
+                )
+            for partition in plan.detach:
+                await partitions_repo.detach_partition(partition=partition)
+                logger.info(f"Detached partition {partition.name} from {table}")
+
+            created += plan.create
+            detached += plan.detach
+
+    return PartitionPlan(create=created, detach=detached)
+
+
+class PartitionMaintainer(PeriodicTask):
+    """
+    Runs maintain_partitions every `interval` seconds, so there's always a
+    partition ready for the months ahead. The web processes run one too, an
+    advisory lock keeps them from doing the same work at once.
+    """
+    name = "partition maintenance"
+
+    def __init__(
+        self,
+        db: Database,
+        *,
+        interval: float = PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+        run_on_start: bool = True,
+    ) -> None:
+        super().__init__(db, interval=interval)
+        # False where maintain_partitions was just run before starting the loop
+        self.run_on_start = run_on_start
+
+    async def run_once(self) -> None:
+        await maintain_partitions(self.db)
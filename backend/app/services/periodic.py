@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from databases import Database
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(ABC):
+    """
+    Calls `run_once` every `interval` seconds from start() until stop(),
+    logging failures instead of giving up. Runs next to the job worker.
+    """
+    name = "periodic task"
+    # tasks that are costly and rarely urgent wait one interval after startup
+    run_on_start = True
+
+    def __init__(self, db: Database, *, interval: float) -> None:
+        self.db = db
+        self.interval = interval
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def run_once(self) -> None:
+        ...
+
+    async def start(self) -> None:
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        if not self.run_on_start:
+            await self._wait()
+
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"--- {self.name.upper()} ERROR ---")
+                logger.warning(e)
+                logger.warning(f"--- {self.name.upper()} ERROR ---")
+
+            await self._wait()
+
+    async def _wait(self) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+from databases import Database
+
+from app.core.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    RATE_LIMIT_LOGIN_PER_IP,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_REGISTER_PER_IP,
+    RATE_LIMIT_WRITES_PER_USER,
+)
+from app.db.repositories.rate_limits import RateLimitsRepository
+
+
+class RateLimitRule(NamedTuple):
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimitRule":
+        """
+        "20/60" allows bursts of 20 requests, refilled over 60 seconds.
+        """
+        capacity, _, period = value.partition("/")
+        return cls(capacity=int(capacity), period=float(period or 1))
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+def make_result(*, tokens: float, allowed: bool, rule: RateLimitRule) -> RateLimitResult:
+    retry_after = 0.0 if allowed else (1 - tokens) / rule.refill_rate
+    return RateLimitResult(allowed=allowed, remaining=max(tokens, 0.0), retry_after=retry_after)
+
+
+class InMemoryRateLimitBackend:
+    """
+    Buckets for this worker only, bounded so spraying keys can't grow memory.
+    An evicted key simply starts again from a full bucket.
+    """
+
+    def __init__(self, *, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, *, key: str, rule: RateLimitRule) -> RateLimitResult:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(rule.capacity), now))
+
+        tokens = min(float(rule.capacity), tokens + (now - updated_at) * rule.refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return make_result(tokens=tokens, allowed=allowed, rule=rule)
+
+
+class PostgresRateLimitBackend:
+    """
+    Buckets shared by every worker through one atomic upsert per check.
+    Idle buckets are equivalent to full ones and get deleted now and then.
+    """
+
+    def __init__(self, db: Database, *, idle_after: float, cleanup_interval: float = 60.0) -> None:
+        self.rate_limits_repo = RateLimitsRepository(db)
+        self.idle_after = idle_after
+        self.cleanup_interval = cleanup_interval
+        self._last_cleanup = time.monotonic()
+
+    async def consume(self, *, key: str, rule: RateLimitRule) -> RateLimitResult:
+        tokens, allowed = await self.rate_limits_repo.consume_token(
+            key=key, capacity=rule.capacity, refill_rate=rule.refill_rate
+        )
+
+        if time.monotonic() - self._last_cleanup > self.cleanup_interval:
+            self._last_cleanup = time.monotonic()
+            await self.rate_limits_repo.delete_idle_buckets(idle_after=self.idle_after)
+
+        return make_result(tokens=tokens, allowed=allowed, rule=rule)
+
+
+RateLimitBackend = Union[InMemoryRateLimitBackend, PostgresRateLimitBackend]
+
+
+def get_default_rate_limit_rules() -> Dict[str, RateLimitRule]:
+    return {
+        "login-ip": RateLimitRule.parse(RATE_LIMIT_LOGIN_PER_IP),
+        "login-account": RateLimitRule.parse(RATE_LIMIT_LOGIN_PER_ACCOUNT),
+        "register-ip": RateLimitRule.parse(RATE_LIMIT_REGISTER_PER_IP),
+        "writes-user": RateLimitRule.parse(RATE_LIMIT_WRITES_PER_USER),
+    }
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        *,
+        backend: Optional[RateLimitBackend] = None,
+        rules: Optional[Dict[str, RateLimitRule]] = None,
+        enabled: bool = RATE_LIMIT_ENABLED,
+    ) -> None:
+        self.backend: RateLimitBackend = backend or InMemoryRateLimitBackend()
+        self.rules = rules if rules is not None else get_default_rate_limit_rules()
+        self.enabled = enabled
+
+    def use_postgres(self, db: Database) -> None:
+        idle_after = max((rule.period for rule in self.rules.values()), default=60.0)
+        self.backend = PostgresRateLimitBackend(db, idle_after=idle_after)
+
+    async def hit(self, *, rule_name: str, key: str) -> RateLimitResult:
+        rule = self.rules.get(rule_name)
+
+        if not self.enabled or rule is None or rule.capacity <= 0:
+            return RateLimitResult(allowed=True, remaining=float("inf"), retry_after=0.0)
+
+        return await self.backend.consume(key=f"{rule_name}:{key}", rule=rule)
@@ -0,0 +1,67 @@
+"""
+Standalone background job worker.
+
+    python -m app.worker
+
+Runs the same JobWorker the API starts in-process, for deployments that set
+JOBS_RUN_IN_PROCESS=False and scale workers separately from the web processes.
+It also keeps the monthly partitions of offers and evaluations maintained and
+moves completed and deleted cleanings to the archive, and checks the
+cleaning_details projection for drift.
+"""
+import signal
+import asyncio
+import logging
+
+from databases import Database
+
+from app.core.config import DATABASE_URL, JOBS_WORKER_CONCURRENCY
+from app.services.jobs import JobWorker
+from app.services.archive import CleaningArchiver
+from app.services.cleaning_details import CleaningDetailsChecker
+from app.services.partitions import PartitionMaintainer
+
+# importing the repositories registers their job handlers
+import app.db.repositories.evaluations  # noqa
+import app.db.repositories.users  # noqa
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> None:
+    database = Database(str(DATABASE_URL), min_size=1,
+                        max_size=JOBS_WORKER_CONCURRENCY + 1)
+    await database.connect()
+
+    worker = JobWorker(database)
+    periodic_tasks = [
+        PartitionMaintainer(database), CleaningArchiver(database), CleaningDetailsChecker(database)
+    ]
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await worker.start()
+    for task in periodic_tasks:
+        await task.start()
+    logger.info(f"Job worker started with {worker.concurrency} consumers")
+
+    try:
+        await stop.wait()
+    finally:
+        for task in periodic_tasks:
+            await task.stop()
+        await worker.stop()
+        await database.disconnect()
+        logger.info(f"Job worker stopped: {worker.metrics.dict()}")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
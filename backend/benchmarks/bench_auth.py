@@ -0,0 +1,48 @@
+"""
+Measures the CPU cost of resolving a username from an access token, which
+runs on every authenticated request.
+
+    python -m benchmarks.bench_auth [iterations]
+"""
+import sys
+import timeit
+
+from app.core.config import SECRET_KEY
+from app.models.user import UserInDB
+from app.services.authentication import AuthService, TokenCache
+
+
+def main(iterations: int = 20000) -> None:
+    user = UserInDB(
+        id="4b0b5a94-1f5d-4d55-8d4d-1c2a1b6f0a11",
+        email="elliot@sample.io",
+        username="elliot",
+        password="not-a-real-hash",
+        salt="not-a-real-salt",
+    )
+
+    uncached_service = AuthService()
+    uncached_service.token_cache = TokenCache(max_size=0)
+    cached_service = AuthService()
+
+    token = cached_service.create_access_token_for_user(
+        user=user, secret_key=str(SECRET_KEY))
+    cached_service.get_username_from_token(
+        token=token, secret_key=str(SECRET_KEY))
+
+    results = {}
+    for label, service in (("jwt.decode + JWTPayload", uncached_service), ("token cache hit", cached_service)):
+        seconds = timeit.timeit(
+            lambda: service.get_username_from_token(
+                token=token, secret_key=str(SECRET_KEY)),
+            number=iterations,
+        )
+        results[label] = seconds / iterations * 1_000_000
+        print(f"{label:<26} {results[label]:8.2f} us/request")
+
+    saved = results["jwt.decode + JWTPayload"] - results["token cache hit"]
+    print(f"{'saved per request':<26} {saved:8.2f} us")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
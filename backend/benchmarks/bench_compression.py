@@ -0,0 +1,65 @@
+"""
+Measures size and CPU cost of compressing a full feed page
+(page_chunk_size=50 with nested owners and profiles) for every
+available encoding and COMPRESSION_PROFILE.
+
+    python -m benchmarks.bench_compression [iterations]
+"""
+import sys
+import json
+import random
+import timeit
+import uuid
+
+from app.api.middleware.compression import COMPRESSION_LEVELS, get_available_compressors
+
+
+def make_feed_page(size: int = 50) -> bytes:
+    rng = random.Random(42)
+    words = ["kitchen", "bathroom", "balcony", "windows", "oven", "carpet", "garage", "stairs", "fridge"]
+    page = [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": f"deep clean of apartment {i}",
+            "description": " ".join(rng.choice(words) for _ in range(rng.randint(5, 25))),
+            "price": round(rng.uniform(10, 300), 2),
+            "cleaning_type": "full_clean",
+            "owner": {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "username": f"user_{i}",
+                "email": f"user_{i}@sample.io",
+                "email_verified": True,
+                "is_active": True,
+                "is_superuser": False,
+                "profile": {
+                    "full_name": f"Sample User {i}",
+                    "phone_number": "555-333-1000",
+                    "bio": "Tidy, punctual and friendly.",
+                    "image": "https://images.sample.io/avatar.png",
+                },
+            },
+            "event_type": "is_create",
+            "event_timestamp": f"2021-06-01T12:{rng.randint(10, 59)}:15.{rng.randint(0, 999999):06d}+00:00",
+            "row_number": i + 1,
+        }
+        for i in range(size)
+    ]
+    return json.dumps(page, separators=(",", ":")).encode()
+
+
+def main(iterations: int = 200) -> None:
+    body = make_feed_page()
+    print(f"{'identity':<20} {len(body):8d} bytes")
+
+    for profile in COMPRESSION_LEVELS:
+        compressors = get_available_compressors(encodings=["br", "zstd", "gzip"], profile=profile)
+        for encoding, compress in compressors.items():
+            seconds = timeit.timeit(lambda: compress(body), number=iterations) / iterations
+            print(
+                f"{encoding + ' (' + profile + ')':<20} {len(compress(body)):8d} bytes "
+                f"{seconds * 1_000_000:10.1f} us/response"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,80 @@
+"""
+Inserts the same number of rows keyed by random uuid4 ids and by time
+ordered UUIDv7 ids, and reports insert throughput and the size of the
+primary key index each one leaves behind. Runs in a throwaway schema.
+
+    python -m benchmarks.bench_id_inserts [rows] [batch size]
+"""
+import sys
+import time
+import asyncio
+
+import asyncpg
+
+from app.core.config import DATABASE_URL
+from app.db.ids import ID_GENERATORS
+
+SCHEMA = "bench_id_inserts"
+
+CREATE_TABLE = """
+    CREATE TABLE {schema}.cleanings_{name} (
+        id uuid PRIMARY KEY,
+        name TEXT NOT NULL,
+        price NUMERIC(10, 2) NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+"""
+
+INSERT = "INSERT INTO {schema}.cleanings_{name} (id, name, price) VALUES ($1, $2, $3)"
+
+INDEX_STATS = """
+    SELECT pg_relation_size('{schema}.cleanings_{name}_pkey') AS bytes,
+           (SELECT leaf_fragmentation FROM pgstatindex('{schema}.cleanings_{name}_pkey')) AS fragmentation
+"""
+
+INDEX_SIZE = "SELECT pg_relation_size('{schema}.cleanings_{name}_pkey')"
+
+
+async def insert_rows(connection: asyncpg.Connection, *, name: str, rows: int, batch_size: int) -> float:
+    generate_id = ID_GENERATORS[name]()
+    query = INSERT.format(schema=SCHEMA, name=name)
+
+    started = time.perf_counter()
+    for start in range(0, rows, batch_size):
+        batch = [(generate_id(), f"cleaning {i}", 10 + i % 200) for i in range(start, min(start + batch_size, rows))]
+        async with connection.transaction():
+            await connection.executemany(query, batch)
+
+    return time.perf_counter() - started
+
+
+async def main(rows: int = 200_000, batch_size: int = 500) -> None:
+    connection = await asyncpg.connect(str(DATABASE_URL))
+
+    try:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        # leaf fragmentation needs pgstattuple, sizes are reported either way
+        has_pgstattuple = await connection.fetchval(
+            "SELECT count(*) > 0 FROM pg_extension WHERE extname = 'pgstattuple'")
+
+        print(f"{rows} rows in batches of {batch_size}\n")
+        print(f"{'ids':<8} {'rows/s':>10} {'pkey size':>12} {'leaf fragmentation':>20}")
+
+        for name in ID_GENERATORS:
+            await connection.execute(CREATE_TABLE.format(schema=SCHEMA, name=name))
+            seconds = await insert_rows(connection, name=name, rows=rows, batch_size=batch_size)
+
+            if has_pgstattuple:
+                stats = await connection.fetchrow(INDEX_STATS.format(schema=SCHEMA, name=name))
+                size, fragmentation = stats["bytes"], f"{stats['fragmentation']:.1f}%"
+            else:
+                size, fragmentation = await connection.fetchval(INDEX_SIZE.format(schema=SCHEMA, name=name)), "-"
+
+            print(f"{name:<8} {rows / seconds:>10.0f} {size / 1024:>10.0f}kB {fragmentation:>20}")
+    finally:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
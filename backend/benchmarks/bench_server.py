@@ -0,0 +1,79 @@
+"""
+Throughput of the production entry point for different worker counts.
+
+    python -m benchmarks.bench_server [worker counts...]
+
+Starts `python -m app.serve` once per worker count and hammers a route that
+doesn't touch the database, so the numbers reflect the HTTP stack and the
+per-process CPU available rather than Postgres.
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import subprocess
+
+import httpx
+
+PORT = 5599
+URL = f"http://127.0.0.1:{PORT}/openapi.json"
+CONCURRENCY = 64
+DURATION_SECONDS = 10
+
+
+def wait_for_port(timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", PORT)) == 0:
+                return
+        time.sleep(0.2)
+
+    raise RuntimeError("server did not start")
+
+
+async def hammer() -> float:
+    completed = 0
+    deadline = time.monotonic() + DURATION_SECONDS
+
+    async with httpx.AsyncClient() as client:
+        await client.get(URL)
+
+        async def consumer() -> None:
+            nonlocal completed
+            while time.monotonic() < deadline:
+                response = await client.get(URL)
+                response.raise_for_status()
+                completed += 1
+
+        await asyncio.gather(*(consumer() for _ in range(CONCURRENCY)))
+
+    return completed / DURATION_SECONDS
+
+
+def bench(workers: int) -> float:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve"],
+        env={**os.environ, "SERVER_WORKERS": str(workers), "SERVER_PORT": str(PORT),
+             "SERVER_HOST": "127.0.0.1", "JOBS_RUN_IN_PROCESS": "False"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port()
+        time.sleep(1)
+        return asyncio.run(hammer())
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main(worker_counts=(1, 2, 4)) -> None:
+    print(f"{os.cpu_count()} cpus, {CONCURRENCY} concurrent clients, {DURATION_SECONDS}s per run")
+    for workers in worker_counts:
+        print(f"{workers} workers: {bench(workers):8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (1, 2, 4))
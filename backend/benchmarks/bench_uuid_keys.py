@@ -0,0 +1,143 @@
+"""
+Compares CHAR(36) and native uuid keys on the same seeded dataset: index
+sizes and the time of the kind of joins the offers routes run.
+Everything lives in a throwaway schema, dropped again at the end.
+
+    python -m benchmarks.bench_uuid_keys [users] [cleanings] [offers]
+"""
+import sys
+import json
+import asyncio
+import statistics
+
+import asyncpg
+
+from app.core.config import DATABASE_URL
+
+SCHEMA = "bench_uuid_keys"
+RUNS = 5
+
+CREATE_TABLES = """
+    CREATE TABLE {schema}.users_{kind} (
+        id {key_type} PRIMARY KEY,
+        username TEXT NOT NULL
+    );
+    CREATE TABLE {schema}.cleanings_{kind} (
+        id {key_type} PRIMARY KEY,
+        owner {key_type} REFERENCES {schema}.users_{kind} (id),
+        price NUMERIC(10, 2) NOT NULL
+    );
+    CREATE TABLE {schema}.offers_{kind} (
+        user_id {key_type} NOT NULL REFERENCES {schema}.users_{kind} (id),
+        cleaning_id {key_type} NOT NULL REFERENCES {schema}.cleanings_{kind} (id),
+        status TEXT NOT NULL DEFAULT 'pending',
+        PRIMARY KEY (user_id, cleaning_id)
+    );
+    CREATE INDEX ON {schema}.offers_{kind} (user_id);
+    CREATE INDEX ON {schema}.offers_{kind} (cleaning_id);
+"""
+
+SEED = """
+    INSERT INTO {schema}.users_{kind} (id, username)
+    SELECT CAST(id AS {key_type}), 'user_' || n
+    FROM {schema}.seed_users;
+
+    INSERT INTO {schema}.cleanings_{kind} (id, owner, price)
+    SELECT CAST(id AS {key_type}), CAST(owner AS {key_type}), price
+    FROM {schema}.seed_cleanings;
+
+    INSERT INTO {schema}.offers_{kind} (user_id, cleaning_id)
+    SELECT CAST(user_id AS {key_type}), CAST(cleaning_id AS {key_type})
+    FROM {schema}.seed_offers;
+
+    ANALYZE {schema}.users_{kind};
+    ANALYZE {schema}.cleanings_{kind};
+    ANALYZE {schema}.offers_{kind};
+"""
+
+# one shared set of ids, so both kinds hold exactly the same data
+SEED_IDS = """
+    CREATE TABLE {schema}.seed_users AS
+        SELECT n, gen_random_uuid() AS id FROM generate_series(1, {users}) AS n;
+    CREATE TABLE {schema}.seed_cleanings AS
+        SELECT c.n, gen_random_uuid() AS id, u.id AS owner, (c.n % 200) + 10 AS price
+        FROM generate_series(1, {cleanings}) AS c(n)
+            INNER JOIN {schema}.seed_users u ON u.n = (c.n % {users}) + 1;
+    CREATE TABLE {schema}.seed_offers AS
+        SELECT DISTINCT ON (u.id, c.id) u.id AS user_id, c.id AS cleaning_id
+        FROM generate_series(1, {offers}) AS o(n)
+            INNER JOIN {schema}.seed_users u ON u.n = (o.n * 7919 % {users}) + 1
+            INNER JOIN {schema}.seed_cleanings c ON c.n = (o.n % {cleanings}) + 1;
+"""
+
+JOIN_QUERIES = {
+    "offers with cleaner and cleaning": """
+        SELECT o.status, u.username, c.price
+        FROM {schema}.offers_{kind} o
+            INNER JOIN {schema}.users_{kind} u ON u.id = o.user_id
+            INNER JOIN {schema}.cleanings_{kind} c ON c.id = o.cleaning_id
+    """,
+    "offers for one owner's cleanings": """
+        SELECT o.user_id, o.status
+        FROM {schema}.cleanings_{kind} c
+            INNER JOIN {schema}.offers_{kind} o ON o.cleaning_id = c.id
+        WHERE c.owner = (SELECT CAST(id AS {key_type}) FROM {schema}.seed_users WHERE n = 1)
+    """,
+}
+
+INDEX_SIZES = """
+    SELECT c.relname AS index_name, pg_relation_size(c.oid) AS bytes
+    FROM pg_index i
+        INNER JOIN pg_class c ON c.oid = i.indexrelid
+        INNER JOIN pg_class t ON t.oid = i.indrelid
+        INNER JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = $1 AND t.relname LIKE '%\\_' || $2
+    ORDER BY c.relname;
+"""
+
+KINDS = {"char": "CHAR(36)", "uuid": "uuid"}
+
+
+async def time_query(connection: asyncpg.Connection, query: str) -> float:
+    timings = []
+    for _ in range(RUNS):
+        plan = await connection.fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}")
+        timings.append(json.loads(plan)[0]["Execution Time"])
+
+    return statistics.median(timings)
+
+
+async def main(users: int = 20000, cleanings: int = 100000, offers: int = 500000) -> None:
+    connection = await asyncpg.connect(str(DATABASE_URL))
+
+    try:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        await connection.execute(
+            SEED_IDS.format(schema=SCHEMA, users=users, cleanings=cleanings, offers=offers))
+
+        for kind, key_type in KINDS.items():
+            await connection.execute(CREATE_TABLES.format(schema=SCHEMA, kind=kind, key_type=key_type))
+            await connection.execute(SEED.format(schema=SCHEMA, kind=kind, key_type=key_type))
+
+        print(f"{users} users, {cleanings} cleanings, {offers} offers (before dedup)\n")
+
+        sizes = {kind: await connection.fetch(INDEX_SIZES, SCHEMA, kind) for kind in KINDS}
+        print(f"{'index':<40} {'CHAR(36)':>12} {'uuid':>12}")
+        for char_index, uuid_index in zip(sizes["char"], sizes["uuid"]):
+            name = char_index["index_name"].replace("_char", "")
+            print(f"{name:<40} {char_index['bytes'] / 1024:>10.0f}kB {uuid_index['bytes'] / 1024:>10.0f}kB")
+
+        print(f"\n{'join (median of ' + str(RUNS) + ')':<40} {'CHAR(36)':>12} {'uuid':>12}")
+        for label, query in JOIN_QUERIES.items():
+            timings = {
+                kind: await time_query(connection, query.format(schema=SCHEMA, kind=kind, key_type=key_type))
+                for kind, key_type in KINDS.items()
+            }
+            print(f"{label:<40} {timings['char']:>10.1f}ms {timings['uuid']:>10.1f}ms")
+    finally:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
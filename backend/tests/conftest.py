@@ -2,6 +2,7 @@ from typing import Callable, List
 import random
 import warnings
 import os
+import uuid
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
 from fastapi import FastAPI
@@ -86,6 +87,19 @@ async def user_fixture_helper(*, db: Database, new_user: UserCreate) -> UserInDB
     return await user_repo.register_new_user(new_user=new_user)
 
 
+async def fresh_user_fixture_helper(*, db: Database) -> UserInDB:
+    """
+    A user nothing else in the session touches, for tests that list all of
+    a user's offers or evaluations.
+    """
+    suffix = uuid.uuid4().hex[:8]
+
+    return await user_fixture_helper(
+        db=db,
+        new_user=UserCreate(email=f"user_{suffix}@sample.io", username=f"user_{suffix}", password="wh1terose")
+    )
+
+
 @pytest_asyncio.fixture
 def elliots_authorized_client(client: AsyncClient, user_elliot: UserInDB) -> AsyncClient:
     access_token = auth_service.create_access_token_for_user(
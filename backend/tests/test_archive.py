@@ -0,0 +1,93 @@
+from typing import Callable, List
+
+import pytest
+from databases import Database
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+
+from app.db.repositories.cleanings import CleaningsRepository
+from app.db.repositories.evaluations import EvaluationsRepository
+from app.models.cleaning import CleaningInDB
+from app.models.evaluation import EvaluationExpansion
+from app.models.user import UserInDB
+from app.services.archive import archive_cleanings
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestSoftDelete:
+    async def test_deleted_cleanings_are_hidden_but_kept(
+        self,
+        app: FastAPI,
+        elliots_authorized_client: AsyncClient,
+        db: Database,
+        test_cleaning: CleaningInDB,
+    ) -> None:
+        res = await elliots_authorized_client.delete(
+            app.url_path_for("cleanings:delete-cleaning-by-id", cleaning_id=test_cleaning.id)
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        res = await elliots_authorized_client.get(app.url_path_for("cleanings:list-all-user-cleanings"))
+        assert test_cleaning.id not in [c["id"] for c in res.json()]
+
+        deleted_at = await db.fetch_val(
+            query="SELECT deleted_at FROM cleanings WHERE id = :id", values={"id": test_cleaning.id}
+        )
+        assert deleted_at is not None
+
+        # deleting twice finds nothing left to delete
+        res = await elliots_authorized_client.delete(
+            app.url_path_for("cleanings:delete-cleaning-by-id", cleaning_id=test_cleaning.id)
+        )
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestArchive:
+    async def test_completed_cleanings_move_to_the_archive_with_their_offers(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_darlene: UserInDB,
+        user_mr_robot: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB],
+    ) -> None:
+        ids = [c.id for c in test_list_of_cleanings_with_evaluated_offer]
+        # only this test's cleanings, the rest of the suite still uses the ones it left behind
+        assert await archive_cleanings(db, archive_after_days=0, batch_size=2, ids=ids) == len(ids)
+
+        assert await db.fetch_val(
+            query="SELECT count(*) FROM cleanings WHERE id = ANY(:ids)", values={"ids": ids}
+        ) == 0
+        assert await db.fetch_val(
+            query="SELECT count(*) FROM user_offers_for_cleanings_archive WHERE cleaning_id = ANY(:ids)",
+            values={"ids": ids},
+        ) == len(ids)
+
+        # direct lookups still find them
+        client = create_authorized_client(user=user_darlene)
+        res = await client.get(app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id=ids[0]))
+        assert res.status_code == status.HTTP_200_OK
+        assert res.json()["id"] == ids[0]
+
+        res = await client.get(app.url_path_for("cleanings:list-all-user-cleanings"))
+        assert not set(ids) & {c["id"] for c in res.json()}
+
+        # evaluations stay and still expand to their cleaning
+        evaluations = await EvaluationsRepository(db).list_evaluations_for_cleaner(
+            cleaner=user_mr_robot, expand=[EvaluationExpansion.cleaning]
+        )
+        archived = [e for e in evaluations if e.cleaning_id in ids]
+        assert len(archived) == len(ids)
+        assert all(e.cleaning and e.cleaning.id == e.cleaning_id for e in archived)
+
+    async def test_pending_cleanings_are_not_archived(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB, user_elliot: UserInDB
+    ) -> None:
+        assert await archive_cleanings(db, archive_after_days=0, ids=[test_cleaning.id]) == 0
+
+        cleaning = await CleaningsRepository(db).get_cleaning_by_id(
+            id=test_cleaning.id, requesting_user=user_elliot, populate=False
+        )
+        assert cleaning.id == test_cleaning.id
@@ -0,0 +1,179 @@
+import json
+from typing import Callable, List
+
+import pytest
+from databases import Database
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+
+from app.models.cleaning import CleaningInDB, CleaningPublic
+from app.models.user import UserInDB
+from app.services.cleaning_details import check_cleaning_details
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestCleaningDetailDocuments:
+    async def test_documents_parse_into_cleaning_details(self) -> None:
+        document = {
+            "id": "0192a0a4-7c1e-7d3a-8b0e-3c9a4a1f2b3c",
+            "name": "clean my house",
+            "description": None,
+            "price": 29.99,
+            "cleaning_type": "full_clean",
+            "created_at": "2026-10-19T17:24:05.11873+00:00",
+            "updated_at": "2026-10-19T17:24:05.11873+00:00",
+            "owner": {
+                "id": "0192a0a4-7c1e-7d3a-8b0e-3c9a4a1f2b3d",
+                "username": "darlene",
+                "email": "darlene@sample.io",
+                "email_verified": False,
+                "is_active": True,
+                "is_superuser": False,
+                "created_at": "2026-10-19T17:24:05.11873+00:00",
+                "profile": None,
+            },
+        }
+
+        # offer counts are read from the cleaning's counters next to the document
+        detail = CleaningPublic(**document, pending_offers=3, rejected_offers=1)
+
+        assert detail.owner.username == "darlene"
+        assert detail.offer_counts.pending == 3
+        assert detail.offer_counts.accepted == 0
+
+
+class TestCleaningDetailsProjection:
+    async def test_offer_counts_follow_offer_transitions(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_darlene: UserInDB,
+        test_user_list: List[UserInDB],
+        test_cleaning_with_accepted_offer: CleaningInDB,
+    ) -> None:
+        client = create_authorized_client(user=user_darlene)
+        res = await client.get(
+            app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id=test_cleaning_with_accepted_offer.id)
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        detail = res.json()
+        assert detail["owner"]["username"] == user_darlene.username
+        assert detail["offer_counts"]["accepted"] == 1
+        assert detail["offer_counts"]["rejected"] == len(test_user_list) - 1
+        assert detail["offer_counts"]["pending"] == 0
+
+    async def test_offer_writes_leave_the_document_alone(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_darlene: UserInDB,
+        user_elliot: UserInDB,
+        test_cleaning_with_offers: CleaningInDB,
+    ) -> None:
+        owner_client = create_authorized_client(user=user_darlene)
+        path = app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id=test_cleaning_with_offers.id)
+        res = await owner_client.get(path)
+        etag, pending = res.headers["etag"], res.json()["offer_counts"]["pending"]
+
+        refreshed_at = await db.fetch_val(
+            query="SELECT refreshed_at FROM cleaning_details WHERE id = :id",
+            values={"id": test_cleaning_with_offers.id},
+        )
+        res = await create_authorized_client(user=user_elliot).post(
+            app.url_path_for("offers:create-offer", cleaning_id=test_cleaning_with_offers.id)
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+
+        assert await db.fetch_val(
+            query="SELECT refreshed_at FROM cleaning_details WHERE id = :id",
+            values={"id": test_cleaning_with_offers.id},
+        ) == refreshed_at
+
+        # the counts still move, and so do the validators
+        res = await create_authorized_client(user=user_darlene).get(path)
+        assert res.json()["offer_counts"]["pending"] == pending + 1
+        assert res.headers["etag"] != etag
+
+    async def test_owner_profile_edits_reach_the_document(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_darlene: UserInDB,
+        test_cleaning_with_offers: CleaningInDB,
+    ) -> None:
+        client = create_authorized_client(user=user_darlene)
+        res = await client.put(
+            app.url_path_for("profiles:update-own-profile"), json={"full_name": "Darlene Alderson"}
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        document = await db.fetch_val(
+            query="SELECT document FROM cleaning_details WHERE id = :id",
+            values={"id": test_cleaning_with_offers.id},
+        )
+        assert json.loads(document)["owner"]["profile"]["full_name"] == "Darlene Alderson"
+
+    async def test_only_projected_owner_changes_reach_the_document(
+        self, client: AsyncClient, db: Database, test_cleaning_with_offers: CleaningInDB
+    ) -> None:
+        async def refreshed_at():
+            return await db.fetch_val(
+                query="SELECT refreshed_at FROM cleaning_details WHERE id = :id",
+                values={"id": test_cleaning_with_offers.id},
+            )
+
+        before = await refreshed_at()
+        await db.execute(
+            query="UPDATE users SET salt = salt, password = password WHERE id = :id",
+            values={"id": test_cleaning_with_offers.owner},
+        )
+        assert await refreshed_at() == before
+
+        await db.execute(
+            query="UPDATE users SET email_verified = NOT email_verified WHERE id = :id",
+            values={"id": test_cleaning_with_offers.owner},
+        )
+        assert await refreshed_at() > before
+
+        # put it back for the tests that follow
+        await db.execute(
+            query="UPDATE users SET email_verified = NOT email_verified WHERE id = :id",
+            values={"id": test_cleaning_with_offers.owner},
+        )
+
+    async def test_deleted_cleanings_leave_the_projection(
+        self, app: FastAPI, elliots_authorized_client: AsyncClient, db: Database, test_cleaning: CleaningInDB
+    ) -> None:
+        res = await elliots_authorized_client.delete(
+            app.url_path_for("cleanings:delete-cleaning-by-id", cleaning_id=test_cleaning.id)
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+        assert await db.fetch_val(
+            query="SELECT count(*) FROM cleaning_details WHERE id = :id", values={"id": test_cleaning.id}
+        ) == 0
+
+
+class TestCleaningDetailsCheck:
+    async def test_drift_is_found_and_repaired(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB, test_cleaning_with_offers: CleaningInDB
+    ) -> None:
+        await db.execute(
+            query="UPDATE cleaning_details SET document = document - 'name' WHERE id = :id",
+            values={"id": test_cleaning.id},
+        )
+        await db.execute(
+            query="DELETE FROM cleaning_details WHERE id = :id", values={"id": test_cleaning_with_offers.id}
+        )
+
+        check = await check_cleaning_details(db, batch_size=2)
+        assert check.stale >= 1
+        assert check.missing >= 1
+
+        check = await check_cleaning_details(db, batch_size=2)
+        assert (check.stale, check.missing, check.orphaned) == (0, 0, 0)
+        assert check.checked >= 2
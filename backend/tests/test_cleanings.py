@@ -123,6 +123,35 @@ class TestGetcleaning:
 
         assert cleaning == test_cleaning.dict(exclude={"owner", "updated_at", "created_at"})
 
+    async def test_get_cleaning_by_id_with_sparse_fields_and_expansion(
+        self,
+        app: FastAPI,
+        elliots_authorized_client: AsyncClient,
+        user_elliot: UserInDB,
+        test_cleaning: CleaningInDB,
+    ) -> None:
+        path = app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id=test_cleaning.id)
+
+        response = await elliots_authorized_client.get(path)
+        assert response.json()["owner"]["username"] == user_elliot.username
+
+        response = await elliots_authorized_client.get(path, params={"expand": ""})
+        assert response.json()["owner"] == user_elliot.id
+
+        response = await elliots_authorized_client.get(path, params={"fields": "id,name,owner.username"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "id": test_cleaning.id,
+            "name": test_cleaning.name,
+            "owner": {"username": user_elliot.username},
+        }
+
+        response = await elliots_authorized_client.get(path, params={"fields": "id,not_a_field"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await elliots_authorized_client.get(path, params={"expand": "offers"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
     async def test_unauthorized_users_cant_access_cleanings(
         self, app: FastAPI, client: AsyncClient, test_cleaning: CleaningInDB
     ) -> None:
@@ -176,6 +205,51 @@ class TestGetcleaning:
         assert all(c not in cleanings for c in darlenes_cleanings_list)
 
 
+class TestConditionalGetcleaning:
+    async def test_matching_etag_returns_not_modified_until_cleaning_changes(
+        self, app: FastAPI, elliots_authorized_client: AsyncClient, test_cleaning: CleaningInDB
+    ) -> None:
+        path = app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id=test_cleaning.id)
+
+        response = await elliots_authorized_client.get(path)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        last_modified = response.headers["last-modified"]
+
+        response = await elliots_authorized_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        response = await elliots_authorized_client.get(path, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # a different representation never matches
+        response = await elliots_authorized_client.get(
+            path, params={"fields": "id"}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        await elliots_authorized_client.put(path, json={"price": 123.45})
+
+        response = await elliots_authorized_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+
+    async def test_unauthenticated_requests_never_get_not_modified(
+        self,
+        app: FastAPI,
+        client: AsyncClient,
+        elliots_authorized_client: AsyncClient,
+        test_cleaning: CleaningInDB,
+    ) -> None:
+        path = app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id=test_cleaning.id)
+        etag = (await elliots_authorized_client.get(path)).headers["etag"]
+
+        response = await client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 class TestUpdatecleaning:
     @pytest.mark.parametrize(
         "attrs_to_change, values",
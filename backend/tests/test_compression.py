@@ -0,0 +1,118 @@
+import json
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+
+from app.api.middleware.compression import CompressionMiddleware, select_encoding
+from app.api.middleware.conditional import ConditionalRequestsMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+LARGE_PAYLOAD = [{"id": i, "name": f"cleaning job number {i}", "price": 9.99} for i in range(200)]
+
+
+@pytest.fixture
+def compressed_app() -> FastAPI:
+    compressed_app = FastAPI()
+    compressed_app.add_middleware(ConditionalRequestsMiddleware)
+    compressed_app.add_middleware(CompressionMiddleware, encodings=["br", "zstd", "gzip"], minimum_size=500)
+
+    @compressed_app.get("/large")
+    async def large() -> list:
+        return LARGE_PAYLOAD
+
+    @compressed_app.get("/small")
+    async def small() -> dict:
+        return {"id": 1}
+
+    return compressed_app
+
+
+class TestEncodingSelection:
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        (
+            (None, None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, br", "br"),
+            ("gzip;q=1.0, br;q=0.5", "gzip"),
+            ("br;q=0, gzip", "gzip"),
+            ("*", "br"),
+            ("*, br;q=0", "zstd"),
+        ),
+    )
+    async def test_encoding_follows_q_values_then_server_preference(
+        self, accept_encoding: str, expected: str
+    ) -> None:
+        assert select_encoding(accept_encoding, available=["br", "zstd", "gzip"]) == expected
+
+
+class TestCompressionMiddleware:
+    async def test_large_json_is_gzipped_and_small_json_is_not(self, compressed_app: FastAPI) -> None:
+        async with AsyncClient(app=compressed_app, base_url="http://testserver") as client:
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["content-encoding"] == "gzip"
+            assert "accept-encoding" in response.headers["vary"].lower()
+            assert response.headers["etag"].startswith("W/")
+            assert response.json() == LARGE_PAYLOAD
+
+            response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+            assert response.headers["vary"] == "Accept-Encoding"
+
+            response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in response.headers
+            assert response.headers["vary"] == "Accept-Encoding"
+
+    async def test_weak_etag_of_compressed_response_still_revalidates(self, compressed_app: FastAPI) -> None:
+        async with AsyncClient(app=compressed_app, base_url="http://testserver") as client:
+            etag = (await client.get("/large", headers={"Accept-Encoding": "gzip"})).headers["etag"]
+
+            assert etag.startswith('W/"')
+
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.headers["etag"] == etag
+            assert response.headers["vary"] == "Accept-Encoding"
+
+            # a client holding the uncompressed copy keeps its strong ETag
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip", "If-None-Match": etag[2:]})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.headers["etag"] == etag[2:]
+
+    async def test_identical_responses_are_compressed_once(self) -> None:
+        plain_app = FastAPI()
+        plain_app.add_middleware(ConditionalRequestsMiddleware)
+
+        @plain_app.get("/large")
+        async def large() -> list:
+            return LARGE_PAYLOAD
+
+        middleware = CompressionMiddleware(plain_app, encodings=["gzip"], minimum_size=500)
+
+        async with AsyncClient(app=middleware, base_url="http://testserver") as client:
+            for _ in range(3):
+                response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+                assert response.json() == LARGE_PAYLOAD
+
+        assert middleware.cache.misses == 1
+        assert middleware.cache.hits == 2
+
+    async def test_optional_encodings_when_installed(self, compressed_app: FastAPI) -> None:
+        pytest.importorskip("brotli")
+        zstandard = pytest.importorskip("zstandard")
+
+        async with AsyncClient(app=compressed_app, base_url="http://testserver") as client:
+            br_response = await client.get("/large", headers={"Accept-Encoding": "br"})
+            zstd_response = await client.get("/large", headers={"Accept-Encoding": "zstd"})
+
+        assert br_response.headers["content-encoding"] == "br"
+        assert br_response.json() == LARGE_PAYLOAD
+
+        # httpx doesn't decode zstd, the raw bytes are still compressed
+        assert zstd_response.headers["content-encoding"] == "zstd"
+        assert json.loads(
+            zstandard.ZstdDecompressor().decompressobj().decompress(zstd_response.content)
+        ) == LARGE_PAYLOAD
@@ -0,0 +1,90 @@
+import datetime
+import pytest
+from fastapi import Depends, FastAPI, Request, status
+from httpx import AsyncClient
+
+from app.api.dependencies.conditional import (
+    CacheValidators,
+    NotModified,
+    etag_matches,
+    evaluate_conditional_request,
+    is_not_modified,
+    not_modified_exception_handler,
+)
+from app.api.middleware.conditional import ConditionalRequestsMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+LAST_MODIFIED = datetime.datetime(2021, 6, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+
+
+def check_timestamp(request: Request) -> None:
+    evaluate_conditional_request(
+        request, validators=CacheValidators(etag='"v1"', last_modified=LAST_MODIFIED)
+    )
+
+
+@pytest.fixture
+def conditional_app() -> FastAPI:
+    conditional_app = FastAPI()
+    conditional_app.add_middleware(ConditionalRequestsMiddleware)
+    conditional_app.add_exception_handler(NotModified, not_modified_exception_handler)
+
+    @conditional_app.get("/hashed")
+    async def hashed() -> dict:
+        return {"answer": 42}
+
+    @conditional_app.get("/timestamped", dependencies=[Depends(check_timestamp)])
+    async def timestamped() -> dict:
+        return {"answer": 42}
+
+    return conditional_app
+
+
+class TestValidators:
+    @pytest.mark.parametrize(
+        "if_none_match, matches",
+        (('"abc"', True), ('W/"abc"', True), ('"x", "abc"', True), ("*", True), ('"abcd"', False)),
+    )
+    async def test_if_none_match_uses_weak_comparison(self, if_none_match: str, matches: bool) -> None:
+        assert etag_matches(if_none_match, '"abc"') is matches
+
+    async def test_if_modified_since_is_ignored_when_if_none_match_is_sent(self) -> None:
+        validators = CacheValidators(etag='"v1"', last_modified=LAST_MODIFIED)
+        since = validators.headers["Last-Modified"]
+
+        assert is_not_modified(if_none_match=None, if_modified_since=since, validators=validators)
+        assert not is_not_modified(if_none_match='"v0"', if_modified_since=since, validators=validators)
+        assert not is_not_modified(if_none_match=None, if_modified_since="garbage", validators=validators)
+
+
+class TestConditionalRequestsMiddleware:
+    async def test_body_hash_etag_answers_not_modified(self, conditional_app: FastAPI) -> None:
+        async with AsyncClient(app=conditional_app, base_url="http://testserver") as client:
+            response = await client.get("/hashed")
+            assert response.status_code == status.HTTP_200_OK
+            etag = response.headers["etag"]
+
+            response = await client.get("/hashed", headers={"If-None-Match": etag})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.content == b""
+            assert "content-length" not in response.headers
+
+    async def test_route_validators_are_used_and_short_circuit(self, conditional_app: FastAPI) -> None:
+        async with AsyncClient(app=conditional_app, base_url="http://testserver") as client:
+            response = await client.get("/timestamped")
+            assert response.headers["etag"] == '"v1"'
+            assert response.headers["last-modified"] == "Tue, 01 Jun 2021 12:30:15 GMT"
+
+            response = await client.get("/timestamped", headers={"If-None-Match": '"v1"'})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+            response = await client.get(
+                "/timestamped", headers={"If-Modified-Since": "Tue, 01 Jun 2021 12:30:15 GMT"}
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+            response = await client.get(
+                "/timestamped", headers={"If-Modified-Since": "Tue, 01 Jun 2021 12:30:14 GMT"}
+            )
+            assert response.status_code == status.HTTP_200_OK
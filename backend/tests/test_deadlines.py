@@ -0,0 +1,169 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from asyncpg.exceptions import QueryCanceledError
+from fastapi import Depends, FastAPI, Request, status
+from httpx import AsyncClient
+
+from app.core.deadlines import DeadlineExceeded, RequestDeadline, get_request_deadline, request_deadline
+from app.api.dependencies.deadlines import limit_request_time
+from app.api.middleware.deadlines import RequestDeadlineMiddleware
+from app.db.pools import apply_request_deadlines
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def deadline_app() -> FastAPI:
+    deadline_app = FastAPI()
+    deadline_app.add_middleware(RequestDeadlineMiddleware, timeout=5)
+    deadline_app.state.cancelled = asyncio.Event()
+
+    @deadline_app.get("/slow")
+    async def slow(seconds: float = 0.5) -> dict:
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            deadline_app.state.cancelled.set()
+            raise
+        return {"remaining": get_request_deadline().remaining()}
+
+    @deadline_app.get("/tight", dependencies=[Depends(limit_request_time(0.05))])
+    async def tight() -> dict:
+        await asyncio.sleep(0.5)
+        return {}
+
+    @deadline_app.get("/exceeded")
+    async def exceeded() -> dict:
+        raise DeadlineExceeded()
+
+    @deadline_app.get("/canceled")
+    async def canceled() -> dict:
+        raise QueryCanceledError("canceling statement due to statement timeout")
+
+    @deadline_app.post("/echo")
+    async def echo(request: Request) -> dict:
+        return await request.json()
+
+    return deadline_app
+
+
+class TestRequestDeadlines:
+    async def test_requests_within_their_deadline_are_untouched(self, deadline_app: FastAPI) -> None:
+        async with AsyncClient(app=deadline_app, base_url="http://testserver") as client:
+            res = await client.get("/slow", params={"seconds": 0})
+            assert res.status_code == status.HTTP_200_OK
+            assert 4 < res.json()["remaining"] <= 5
+
+            res = await client.post("/echo", json={"name": "fsociety"})
+            assert res.json() == {"name": "fsociety"}
+
+    async def test_clients_can_ask_for_a_shorter_deadline(self, deadline_app: FastAPI) -> None:
+        async with AsyncClient(app=deadline_app, base_url="http://testserver") as client:
+            res = await client.get("/slow", headers={"X-Request-Timeout": "0.05"})
+
+        assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert deadline_app.state.cancelled.is_set()
+
+    async def test_clients_cannot_extend_the_deadline(self, deadline_app: FastAPI) -> None:
+        async with AsyncClient(app=deadline_app, base_url="http://testserver") as client:
+            res = await client.get("/slow", params={"seconds": 0}, headers={"X-Request-Timeout": "60"})
+
+        assert res.json()["remaining"] <= 5
+
+    async def test_routes_can_tighten_the_deadline(self, deadline_app: FastAPI) -> None:
+        async with AsyncClient(app=deadline_app, base_url="http://testserver") as client:
+            res = await client.get("/tight")
+
+        assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+    async def test_deadline_errors_raised_by_the_app_become_504(self, deadline_app: FastAPI) -> None:
+        async with AsyncClient(app=deadline_app, base_url="http://testserver") as client:
+            res = await client.get("/exceeded")
+            assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+            res = await client.get("/canceled")
+            assert res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+
+class TestClientDisconnects:
+    async def test_work_is_cancelled_when_the_client_goes_away(self, deadline_app: FastAPI) -> None:
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        sent = []
+
+        async def receive() -> dict:
+            if messages:
+                return messages.pop()
+            # the client hangs up while the route is still working
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": "GET", "path": "/slow", "root_path": "", "scheme": "http",
+            "query_string": b"seconds=5", "headers": [], "server": ("testserver", 80), "client": ("1.2.3.4", 1),
+            "http_version": "1.1", "asgi": {"version": "3.0"},
+        }
+        await asyncio.wait_for(deadline_app(scope, receive, send), timeout=1)
+
+        assert deadline_app.state.cancelled.is_set()
+        assert sent == []
+
+
+class TestDeadlineStatementTimeouts:
+    @pytest.fixture
+    def database(self) -> SimpleNamespace:
+        executed = []
+
+        class FakeConnection:
+            async def execute(self, query, *args):
+                executed.append((query, args))
+
+        class FakePool:
+            def __init__(self) -> None:
+                self.released = []
+
+            async def acquire(self, *, timeout=None):
+                if timeout is not None and timeout < 0.01:
+                    raise asyncio.TimeoutError()
+                return FakeConnection()
+
+            async def release(self, connection):
+                self.released.append(connection)
+
+        database = SimpleNamespace(_backend=SimpleNamespace(_pool=FakePool()), executed=executed)
+        apply_request_deadlines(database, statement_timeout_ms=10000)
+        return database
+
+    async def test_statement_timeout_follows_the_remaining_deadline(self, database) -> None:
+        token = request_deadline.set(RequestDeadline(2))
+        try:
+            await database._backend._pool.acquire()
+        finally:
+            request_deadline.reset(token)
+
+        (query, (timeout_ms,)), = database.executed
+        assert "statement_timeout" in query
+        assert 1900 < int(timeout_ms) <= 2000
+
+    async def test_pool_timeout_is_kept_when_the_deadline_is_further_away(self, database) -> None:
+        await database._backend._pool.acquire()
+
+        token = request_deadline.set(RequestDeadline(60))
+        try:
+            await database._backend._pool.acquire()
+        finally:
+            request_deadline.reset(token)
+
+        assert database.executed == []
+
+    async def test_checkout_gives_up_at_the_deadline(self, database) -> None:
+        token = request_deadline.set(RequestDeadline(0.001))
+        try:
+            with pytest.raises(DeadlineExceeded):
+                await database._backend._pool.acquire()
+        finally:
+            request_deadline.reset(token)
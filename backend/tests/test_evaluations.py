@@ -1,17 +1,51 @@
+import datetime
 from typing import Callable, List
 from statistics import mean
 import pytest
+import pytest_asyncio
 import uuid
+from databases import Database
 from httpx import AsyncClient
 from fastapi import FastAPI, status
-from app.models.cleaning import CleaningInDB
-from app.models.evaluation import EvaluationAggregate, EvaluationCreate, EvaluationInDB, EvaluationPublic
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.models.cleaning import CleaningCreate, CleaningInDB
+from app.models.evaluation import (
+    EvaluationAggregate,
+    EvaluationCreate,
+    EvaluationInDB,
+    EvaluationListWithStats,
+    EvaluationPublic,
+)
+from app.services.cleaner_ratings import backfill_cleaner_daily_ratings
+from tests.conftest import create_cleaning_with_evaluated_offer_helper, fresh_user_fixture_helper
 
 from app.models.user import UserInDB
 
 pytestmark = pytest.mark.asyncio
 
 FAKE_ID = str(uuid.uuid4())
+# overall ratings of evaluated_cleaner's evaluations, oldest first, the 1 star one a no-show
+EVALUATED_CLEANER_RATINGS = [3, 1, 5, 3, 4]
+
+
+@pytest_asyncio.fixture
+async def evaluated_cleaner(client: AsyncClient, db: Database, user_darlene: UserInDB) -> UserInDB:
+    """
+    A cleaner of their own, so evaluations from other tests don't end up in
+    their list: one evaluation from darlene per rating above.
+    """
+    cleaner = await fresh_user_fixture_helper(db=db)
+
+    for i, rating in enumerate(EVALUATED_CLEANER_RATINGS):
+        await create_cleaning_with_evaluated_offer_helper(
+            db=db,
+            owner=user_darlene,
+            cleaner=cleaner,
+            cleaning_create=CleaningCreate(name=f"cleaning {i}", price=9.99 + i, cleaning_type="spot_clean"),
+            eval_create=EvaluationCreate(overall_rating=rating, no_show=rating == 1, headline=f"job {i}"),
+        )
+
+    return cleaner
 
 
 class TestEvaluationRoutes:
@@ -221,24 +255,58 @@ class TestGetEvaluations:
             assert evaluation.cleaner_id == user_mr_robot.id
             assert evaluation.overall_rating >= 0
 
-    async def test_authenticated_user_can_get_aggregate_stats_for_cleaner(
+    async def test_list_of_evals_for_cleaner_can_be_fully_expanded(
         self,
         app: FastAPI,
         create_authorized_client: Callable,
+        user_darlene: UserInDB,
         user_mr_robot: UserInDB,
         user_tyrell: UserInDB,
         test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB]
     ) -> None:
         authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for(
+            "evaluations:list-evaluations-for-cleaner", username=user_mr_robot.username
+        )
+
+        response = await authorized_client.get(path)
+        assert response.status_code == status.HTTP_200_OK
+        for evaluation in response.json():
+            assert evaluation["cleaner"] is None
+            assert evaluation["cleaning"] is None
+            assert evaluation["owner"] is None
 
         response = await authorized_client.get(
-            app.url_path_for(
-                "evaluations:list-evaluations-for-cleaner",
-                username=user_mr_robot.username
-            )
+            path, params=[("expand", "cleaner"), ("expand", "cleaning"), ("expand", "owner")]
         )
         assert response.status_code == status.HTTP_200_OK
+
         evaluations = [EvaluationPublic(**e) for e in response.json()]
+        evaluated_cleaning_ids = [c.id for c in test_list_of_cleanings_with_evaluated_offer]
+        for evaluation in evaluations:
+            assert evaluation.cleaner.username == user_mr_robot.username
+            assert evaluation.cleaning.id == evaluation.cleaning_id
+            if evaluation.cleaning_id in evaluated_cleaning_ids:
+                assert evaluation.owner.username == user_darlene.username
+
+    async def test_authenticated_user_can_get_aggregate_stats_for_cleaner(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_mr_robot: UserInDB,
+        user_tyrell: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB]
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:list-evaluations-for-cleaner", username=user_mr_robot.username)
+
+        evaluations, params = [], {"limit": 50}
+        while params:
+            response = await authorized_client.get(path, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            evaluations += [EvaluationPublic(**e) for e in response.json()]
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            params = {"limit": 50, "cursor": cursor} if cursor else None
 
         response = await authorized_client.get(
             app.url_path_for(
@@ -276,6 +344,23 @@ class TestGetEvaluations:
         assert len([e for e in evaluations if e.overall_rating == 5]
                    ) == stats.five_stars
 
+    async def test_aggregate_stats_are_revalidated_with_content_etag(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_mr_robot: UserInDB,
+        user_tyrell: UserInDB,
+        test_list_of_cleanings_with_evaluated_offer: List[CleaningInDB]
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:get-stats-for-cleaner", username=user_mr_robot.username)
+
+        etag = (await authorized_client.get(path)).headers["etag"]
+
+        response = await authorized_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+
     async def test_unauthenticated_user_forbidden_from_get_requests(
         self,
         app: FastAPI,
@@ -301,3 +386,214 @@ class TestGetEvaluations:
         )
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestListEvaluations:
+    async def test_evaluations_page_newest_first(
+        self, app: FastAPI, create_authorized_client: Callable, user_tyrell: UserInDB, evaluated_cleaner: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:list-evaluations-for-cleaner", username=evaluated_cleaner.username)
+
+        response = await authorized_client.get(path, params={"limit": 3})
+        assert response.status_code == status.HTTP_200_OK
+        first_page = [EvaluationPublic(**e) for e in response.json()]
+        assert [e.overall_rating for e in first_page] == EVALUATED_CLEANER_RATINGS[::-1][:3]
+
+        response = await authorized_client.get(
+            path, params={"limit": 3, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert NEXT_CURSOR_HEADER not in response.headers
+        second_page = [EvaluationPublic(**e) for e in response.json()]
+        assert [e.overall_rating for e in second_page] == EVALUATED_CLEANER_RATINGS[::-1][3:]
+
+        evaluations = first_page + second_page
+        assert [e.created_at for e in evaluations] == sorted((e.created_at for e in evaluations), reverse=True)
+
+    @pytest.mark.parametrize(
+        "sort, ratings",
+        (
+            ("oldest", EVALUATED_CLEANER_RATINGS),
+            ("highest_rated", sorted(EVALUATED_CLEANER_RATINGS, reverse=True)),
+            ("lowest_rated", sorted(EVALUATED_CLEANER_RATINGS)),
+        ),
+    )
+    async def test_evaluations_can_be_sorted_across_pages(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_tyrell: UserInDB,
+        evaluated_cleaner: UserInDB,
+        sort: str,
+        ratings: List[int],
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:list-evaluations-for-cleaner", username=evaluated_cleaner.username)
+
+        evaluations, params = [], {"sort": sort, "limit": 2}
+        while params:
+            response = await authorized_client.get(path, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            evaluations += [EvaluationPublic(**e) for e in response.json()]
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            params = {"sort": sort, "limit": 2, "cursor": cursor} if cursor else None
+
+        assert [e.overall_rating for e in evaluations] == ratings
+        assert len({e.cleaning_id for e in evaluations}) == len(ratings)
+
+    async def test_evaluations_can_be_filtered(
+        self, app: FastAPI, create_authorized_client: Callable, user_tyrell: UserInDB, evaluated_cleaner: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:list-evaluations-for-cleaner", username=evaluated_cleaner.username)
+
+        response = await authorized_client.get(path, params={"min_rating": 3, "max_rating": 4})
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(e["overall_rating"] for e in response.json()) == [3, 3, 4]
+
+        response = await authorized_client.get(path, params={"no_show": True})
+        assert response.status_code == status.HTTP_200_OK
+        assert [(e["overall_rating"], e["no_show"]) for e in response.json()] == [(1, True)]
+
+        response = await authorized_client.get(path, params={"no_show": False, "max_rating": 3})
+        assert response.status_code == status.HTTP_200_OK
+        assert [e["overall_rating"] for e in response.json()] == [3, 3]
+
+        response = await authorized_client.get(path, params={"min_rating": 4, "max_rating": 2})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await authorized_client.get(path, params={"min_rating": 6})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_stats_can_come_with_the_page(
+        self, app: FastAPI, create_authorized_client: Callable, user_tyrell: UserInDB, evaluated_cleaner: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:list-evaluations-for-cleaner", username=evaluated_cleaner.username)
+
+        response = await authorized_client.get(path, params={"include_stats": True, "limit": 2, "sort": "highest_rated"})
+        assert response.status_code == status.HTTP_200_OK
+        assert NEXT_CURSOR_HEADER in response.headers
+
+        page = EvaluationListWithStats(**response.json())
+        assert [e.overall_rating for e in page.evaluations] == [5, 4]
+        # the stats cover every evaluation, not just the page
+        assert page.stats.total_evaluations == len(EVALUATED_CLEANER_RATINGS)
+        assert page.stats.total_no_show == 1
+        assert page.stats.three_stars == 2
+        assert page.stats.avg_overall_rating == mean(EVALUATED_CLEANER_RATINGS)
+
+        response = await authorized_client.get(
+            path, params={"include_stats": True, "fields": "overall_rating", "expand": "cleaning"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert all(e == {"overall_rating": e["overall_rating"]} for e in response.json()["evaluations"])
+        assert response.json()["stats"]["total_evaluations"] == len(EVALUATED_CLEANER_RATINGS)
+
+    async def test_cursors_only_continue_their_own_sort(
+        self, app: FastAPI, create_authorized_client: Callable, user_tyrell: UserInDB, evaluated_cleaner: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:list-evaluations-for-cleaner", username=evaluated_cleaner.username)
+
+        response = await authorized_client.get(path, params={"limit": 2})
+        cursor = response.headers[NEXT_CURSOR_HEADER]
+
+        response = await authorized_client.get(path, params={"limit": 2, "cursor": cursor, "sort": "lowest_rated"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await authorized_client.get(path, params={"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestWindowedStats:
+    async def test_windowed_stats_match_lifetime_stats_of_recent_evaluations(
+        self, app: FastAPI, create_authorized_client: Callable, user_tyrell: UserInDB, evaluated_cleaner: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:get-stats-for-cleaner", username=evaluated_cleaner.username)
+
+        response = await authorized_client.get(path)
+        assert response.status_code == status.HTTP_200_OK
+        lifetime = EvaluationAggregate(**response.json())
+
+        response = await authorized_client.get(path, params={"days": 30})
+        assert response.status_code == status.HTTP_200_OK
+        recent = EvaluationAggregate(**response.json())
+
+        assert recent.total_evaluations == lifetime.total_evaluations == len(EVALUATED_CLEANER_RATINGS)
+        assert recent.total_no_show == lifetime.total_no_show == 1
+        assert (recent.min_overall_rating, recent.max_overall_rating) == (1, 5)
+        assert recent.avg_overall_rating == pytest.approx(lifetime.avg_overall_rating)
+        assert recent.avg_professionalism is None
+        assert [recent.one_stars, recent.two_stars, recent.three_stars, recent.four_stars, recent.five_stars] == [
+            1, 0, 2, 1, 1
+        ]
+
+    async def test_windows_only_add_up_their_days(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_tyrell: UserInDB,
+        evaluated_cleaner: UserInDB,
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_tyrell)
+        path = app.url_path_for("evaluations:get-stats-for-cleaner", username=evaluated_cleaner.username)
+        await db.execute(
+            query="""
+                INSERT INTO cleaner_daily_ratings (cleaner_id, day, evaluations, overall_rating_sum, two_stars)
+                VALUES (:cleaner_id, CAST(now() AT TIME ZONE 'UTC' AS date) - 40, 2, 4, 2)
+            """,
+            values={"cleaner_id": evaluated_cleaner.id},
+        )
+
+        response = await authorized_client.get(path, params={"days": 30})
+        assert response.json()["total_evaluations"] == len(EVALUATED_CLEANER_RATINGS)
+        assert response.json()["two_stars"] == 0
+
+        response = await authorized_client.get(path, params={"days": 90})
+        assert response.json()["total_evaluations"] == len(EVALUATED_CLEANER_RATINGS) + 2
+        assert response.json()["two_stars"] == 2
+
+        for days in (0, 366):
+            response = await authorized_client.get(path, params={"days": days})
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_deleted_evaluations_leave_the_rollup(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_tyrell: UserInDB,
+        evaluated_cleaner: UserInDB,
+    ) -> None:
+        await db.execute(
+            query="DELETE FROM cleaning_to_cleaner_evaluations WHERE cleaner_id = :cleaner_id AND no_show",
+            values={"cleaner_id": evaluated_cleaner.id},
+        )
+
+        authorized_client = create_authorized_client(user=user_tyrell)
+        response = await authorized_client.get(
+            app.url_path_for("evaluations:get-stats-for-cleaner", username=evaluated_cleaner.username),
+            params={"days": 7},
+        )
+        stats = EvaluationAggregate(**response.json())
+
+        assert stats.total_evaluations == len(EVALUATED_CLEANER_RATINGS) - 1
+        assert (stats.total_no_show, stats.one_stars, stats.min_overall_rating) == (0, 0, 3)
+
+    async def test_backfill_rebuilds_drifted_days(
+        self, client: AsyncClient, db: Database, evaluated_cleaner: UserInDB
+    ) -> None:
+        query = "SELECT evaluations, five_stars FROM cleaner_daily_ratings WHERE cleaner_id = :cleaner_id"
+        values = {"cleaner_id": evaluated_cleaner.id}
+        expected = [tuple(r) for r in await db.fetch_all(query=query, values=values)]
+        assert expected == [(len(EVALUATED_CLEANER_RATINGS), 1)]
+
+        await db.execute(query="DELETE FROM cleaner_daily_ratings WHERE cleaner_id = :cleaner_id", values=values)
+
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        assert await backfill_cleaner_daily_ratings(db, since=today - datetime.timedelta(days=2), batch_days=1) >= 1
+        assert [tuple(r) for r in await db.fetch_all(query=query, values=values)] == expected
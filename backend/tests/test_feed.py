@@ -1,4 +1,5 @@
 from typing import List
+import json
 import datetime
 from collections import Counter
 import pytest
@@ -7,6 +8,8 @@ from httpx import AsyncClient
 from fastapi import FastAPI, status
 
 from app.models.cleaning import CleaningInDB
+from app.models.feed import CleaningFeedItem
+from app.services.feed_snapshot import CleaningFeedSnapshot
 
 pytestmark = pytest.mark.asyncio
 
@@ -42,6 +45,24 @@ class TestCleaningFeed:
         assert len(cleaning_feed) == 20
         assert set(feed_item["id"] for feed_item in cleaning_feed).issubset(
             set(cleaning_ids))
+
+    async def test_cleaning_feed_skips_owner_population_when_not_expanded(
+        self,
+        *,
+        app: FastAPI,
+        elliots_authorized_client: AsyncClient,
+        test_list_of_new_and_updated_cleanings: List[CleaningInDB]
+    ) -> None:
+        response = await elliots_authorized_client.get(
+            app.url_path_for("feed:get-cleaning-feed-for-user"),
+            params={"expand": "", "fields": "id,owner,event_type"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+        for feed_item in response.json():
+            assert set(feed_item) == {"id", "owner", "event_type"}
+            assert isinstance(feed_item["owner"], str)
     
     async def test_cleaning_fed_response_is_ordered_correctly(
         self,
@@ -118,4 +139,113 @@ class TestCleaningFeed:
         id_counts = Counter(ids_page_1 + ids_page_2)
         assert len([id for id, cnt in id_counts.items() if cnt > 1]) == 13
 
+    async def test_cleaning_created_through_the_api_shows_up_in_the_feed_head(
+        self,
+        *,
+        app: FastAPI,
+        elliots_authorized_client: AsyncClient,
+        test_list_of_new_and_updated_cleanings: List[CleaningInDB]
+    ) -> None:
+        feed_path = app.url_path_for("feed:get-cleaning-feed-for-user")
+        await elliots_authorized_client.get(feed_path)
+
+        response = await elliots_authorized_client.post(
+            app.url_path_for("cleanings:create-cleaning"),
+            json={"name": "fresh feed item", "price": 9.99, "cleaning_type": "dust_up"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        cleaning_feed = (await elliots_authorized_client.get(feed_path)).json()
+        assert cleaning_feed[0]["id"] == response.json()["id"]
+        assert cleaning_feed[0]["owner"]["username"]
+
+    async def test_offers_mark_the_feed_snapshot_stale(
+        self,
+        *,
+        app: FastAPI,
+        elliots_authorized_client: AsyncClient,
+        test_list_of_new_and_updated_cleanings: List[CleaningInDB]
+    ) -> None:
+        await elliots_authorized_client.get(app.url_path_for("feed:get-cleaning-feed-for-user"))
+        assert not app.state.cleaning_feed_snapshot.stale
+
+        # feed items carry offer counts, so a new offer has to rebuild the snapshot
+        response = await elliots_authorized_client.post(
+            app.url_path_for("offers:create-offer", cleaning_id=test_list_of_new_and_updated_cleanings[-1].id)
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert app.state.cleaning_feed_snapshot.stale
+
+
+class FakeFeedRepository:
+    def __init__(self, items: List[CleaningFeedItem]) -> None:
+        self.items = items
+        self.calls = 0
+
+    async def fetch_cleaning_jobs_feed(
+        self, *, page_chunk_size: int, starting_date: datetime.datetime, populate: bool = True
+    ) -> List[CleaningFeedItem]:
+        self.calls += 1
+        return [i for i in self.items if i.event_timestamp < starting_date][:page_chunk_size]
+
+
+def make_feed_items(count: int) -> List[CleaningFeedItem]:
+    newest = datetime.datetime(2021, 6, 1, tzinfo=datetime.timezone.utc)
+    return [
+        CleaningFeedItem(
+            id=f"cleaning-{i}",
+            name=f"cleaning {i}",
+            price=9.99,
+            cleaning_type="spot_clean",
+            owner="owner-id",
+            event_type="is_create",
+            event_timestamp=newest - datetime.timedelta(minutes=i),
+            row_number=i + 1,
+        )
+        for i in range(count)
+    ]
+
+
+class TestCleaningFeedSnapshot:
+    async def test_snapshot_is_shared_until_it_goes_stale(self) -> None:
+        feed_repo = FakeFeedRepository(make_feed_items(30))
+        snapshot = CleaningFeedSnapshot(size=20, ttl=60)
+
+        await snapshot.refresh_if_needed(feed_repo=feed_repo)
+        await snapshot.refresh_if_needed(feed_repo=feed_repo)
+        assert feed_repo.calls == 1
+
+        snapshot.mark_stale()
+        await snapshot.refresh_if_needed(feed_repo=feed_repo)
+        assert feed_repo.calls == 2
+
+    async def test_pages_inside_the_snapshot_match_the_feed_query(self) -> None:
+        items = make_feed_items(30)
+        snapshot = CleaningFeedSnapshot(size=20, ttl=60)
+        await snapshot.refresh_if_needed(feed_repo=FakeFeedRepository(items))
+
+        far_future = datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+        start, end = snapshot.find_page(starting_date=far_future, page_chunk_size=10)
+        assert [i.id for i in snapshot.get_page(start=start, end=end)] == [i.id for i in items[:10]]
+
+        start, end = snapshot.find_page(starting_date=items[9].event_timestamp, page_chunk_size=10)
+        page = snapshot.get_page(start=start, end=end)
+        assert [i.id for i in page] == [i.id for i in items[10:20]]
+        assert [i.row_number for i in page] == list(range(1, 11))
+
+        # the next page reaches past the snapshot and has to go to the database
+        assert snapshot.find_page(starting_date=items[14].event_timestamp, page_chunk_size=10) is None
+
+        stats = snapshot.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["size"] == 20 and stats["fresh"]
+
+    async def test_short_pages_are_served_when_the_snapshot_holds_the_whole_feed(self) -> None:
+        items = make_feed_items(5)
+        snapshot = CleaningFeedSnapshot(size=20, ttl=60)
+        await snapshot.refresh_if_needed(feed_repo=FakeFeedRepository(items))
 
+        start, end = snapshot.find_page(starting_date=items[2].event_timestamp, page_chunk_size=10)
+        assert [i.id for i in snapshot.get_page(start=start, end=end)] == ["cleaning-3", "cleaning-4"]
+        serialized = json.loads(snapshot.get_serialized_page(start=start, end=end))
+        assert [(i["id"], i["row_number"]) for i in serialized] == [("cleaning-3", 1), ("cleaning-4", 2)]
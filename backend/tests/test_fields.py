@@ -0,0 +1,34 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.dependencies.fields import build_include, parse_expand, split_query_values
+from app.models.cleaning import CleaningExpansion, CleaningPublic
+
+
+class TestFieldSelection:
+    def test_query_values_accept_commas_and_repeats(self) -> None:
+        assert split_query_values(None) is None
+        assert split_query_values([""]) == []
+        assert split_query_values(["id,name", " owner "]) == ["id", "name", "owner"]
+
+    def test_dotted_paths_build_nested_include(self) -> None:
+        include = build_include(
+            paths=["id", "owner.username", "owner.profile.image", "owner"], model=CleaningPublic
+        )
+        assert include == {"id": ..., "owner": ...}
+
+        include = build_include(paths=["owner.username", "owner.profile.image"], model=CleaningPublic)
+        assert include == {"owner": {"username": ..., "profile": {"image": ...}}}
+
+    def test_unknown_fields_and_expansions_are_rejected(self) -> None:
+        with pytest.raises(HTTPException):
+            build_include(paths=["nope"], model=CleaningPublic)
+
+        with pytest.raises(HTTPException):
+            parse_expand(values=["nope"], expansions=CleaningExpansion, default=frozenset())
+
+    def test_missing_expand_falls_back_to_default(self) -> None:
+        default = frozenset([CleaningExpansion.owner])
+
+        assert parse_expand(values=None, expansions=CleaningExpansion, default=default) == default
+        assert parse_expand(values=[], expansions=CleaningExpansion, default=default) == frozenset()
@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+# generous on purpose, it should only trip when something heavy sneaks into the import path
+IMPORT_TIME_BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", 1500))
+
+# only needed once a request actually hashes a password, talks to postgres or negotiates br/zstd
+LAZY_MODULES = ("_pytest", "pytest", "passlib", "asyncpg", "brotli", "zstandard")
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+
+def cumulative_import_time_us(stderr: str, module: str) -> int:
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            return int(line.split("|")[1])
+
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+class TestImportTime:
+    def test_app_imports_within_budget(self) -> None:
+        # best of three to keep noisy neighbours out of the measurement
+        timings = [
+            cumulative_import_time_us(
+                run_python("import app.api.server", "-X", "importtime").stderr, "app.api.server"
+            )
+            for _ in range(3)
+        ]
+
+        assert min(timings) / 1000 < IMPORT_TIME_BUDGET_MS
+
+    @pytest.mark.parametrize("module", LAZY_MODULES)
+    def test_heavy_modules_are_not_imported_eagerly(self, module: str) -> None:
+        result = run_python(
+            "import sys, json, app.api.server; print(json.dumps(sorted(sys.modules)))")
+        loaded = json.loads(result.stdout)
+
+        assert module not in loaded
@@ -0,0 +1,110 @@
+from typing import List
+import asyncio
+import pytest
+from databases import Database
+from httpx import AsyncClient
+
+from app.db.repositories.jobs import JobsRepository
+from app.models.job import JobCreate, JobStatus
+from app.services.jobs import JobWorker, job_handler, compute_retry_delay
+
+pytestmark = pytest.mark.asyncio
+
+handled_payloads: List[str] = []
+
+
+@job_handler("tests:record-payload")
+async def record_payload_job(db: Database, *, value: str) -> None:
+    handled_payloads.append(value)
+
+
+@job_handler("tests:always-fail")
+async def always_fail_job(db: Database) -> None:
+    raise RuntimeError("this job never works")
+
+
+class TestJobsRepository:
+    async def test_claimed_jobs_are_not_claimed_twice(self, client: AsyncClient, db: Database) -> None:
+        jobs_repo = JobsRepository(db)
+
+        job = await jobs_repo.enqueue_job(
+            job_create=JobCreate(task="tests:record-payload",
+                                 payload={"value": "claim-me"}, max_attempts=3)
+        )
+        assert job.status == JobStatus.queued
+        assert job.payload == {"value": "claim-me"}
+
+        claimed = await jobs_repo.claim_jobs(limit=100)
+        assert job.id in [j.id for j in claimed]
+
+        claimed_again = await jobs_repo.claim_jobs(limit=100)
+        assert job.id not in [j.id for j in claimed_again]
+
+
+class TestJobWorker:
+    async def test_worker_runs_handler_and_marks_job_succeeded(self, client: AsyncClient, db: Database) -> None:
+        jobs_repo = JobsRepository(db)
+        worker = JobWorker(db)
+
+        await jobs_repo.enqueue_job(
+            job_create=JobCreate(task="tests:record-payload",
+                                 payload={"value": "processed"}, max_attempts=3)
+        )
+
+        while await worker.run_once():
+            pass
+
+        assert "processed" in handled_payloads
+        assert worker.metrics.succeeded >= 1
+
+    async def test_failing_job_is_retried_then_marked_failed(self, client: AsyncClient, db: Database) -> None:
+        jobs_repo = JobsRepository(db)
+        worker = JobWorker(db)
+
+        job = await jobs_repo.enqueue_job(
+            job_create=JobCreate(task="tests:always-fail", max_attempts=2)
+        )
+
+        claimed = await jobs_repo.claim_jobs(limit=100)
+        failing_job = [j for j in claimed if j.id == job.id][0]
+        await worker.process_job(job=failing_job)
+        assert worker.metrics.retried == 1
+
+        # second and final attempt
+        failing_job = failing_job.copy(update={"attempts": 2})
+        await worker.process_job(job=failing_job)
+        assert worker.metrics.failed == 1
+
+        counts = await jobs_repo.count_jobs_by_status()
+        assert counts.get("failed", 0) >= 1
+
+    async def test_running_worker_requeues_stale_jobs_while_polling(self, client: AsyncClient, db: Database) -> None:
+        jobs_repo = JobsRepository(db)
+        worker = JobWorker(db, poll_interval=0.05, stale_after=60)
+
+        job = await jobs_repo.enqueue_job(
+            job_create=JobCreate(task="tests:record-payload",
+                                 payload={"value": "left-running"}, max_attempts=3)
+        )
+        claimed = await jobs_repo.claim_jobs(limit=100)
+        assert job.id in [j.id for j in claimed]
+
+        await worker.start()
+        try:
+            # its worker went away an hour ago, after this one had already started
+            await db.execute(
+                "UPDATE jobs SET locked_at = now() - interval '1 hour' WHERE id = :id;", values={"id": job.id}
+            )
+
+            for _ in range(100):
+                if "left-running" in handled_payloads:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await worker.stop()
+
+        assert "left-running" in handled_payloads
+
+    @pytest.mark.parametrize("attempts, delay", ((1, 2.0), (2, 4.0), (3, 8.0), (30, 600.0)))
+    async def test_retry_delay_backs_off_exponentially(self, attempts: int, delay: float) -> None:
+        assert compute_retry_delay(attempts=attempts) == delay
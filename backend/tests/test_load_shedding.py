@@ -0,0 +1,163 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+
+from app.api.server import get_application
+from app.api.middleware.load_shedding import (
+    AdaptiveConcurrencyLimiter,
+    LoadSheddingMiddleware,
+    Priority,
+    classify_request,
+)
+from app.db.pools import instrument_pool_wait
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestRequestClassification:
+    @pytest.mark.parametrize(
+        "method, path, expected",
+        (
+            ("POST", "/api/users/login/token", ("auth", Priority.critical)),
+            ("POST", "/api/users/token/refresh", ("auth", Priority.critical)),
+            ("POST", "/api/cleanings/1/offers/", ("offer-writes", Priority.critical)),
+            ("PUT", "/api/cleanings/1/offers/mrrobot/", ("offer-writes", Priority.critical)),
+            ("GET", "/api/cleanings/1/offers/", ("other", Priority.normal)),
+            ("GET", "/api/feed/cleanings/", ("feed", Priority.low)),
+            ("GET", "/api/users/elliot/evaluations/stats", ("evaluation-stats", Priority.low)),
+            ("GET", "/api/users/elliot/evaluations/", ("other", Priority.normal)),
+            ("POST", "/api/cleanings/", ("other", Priority.normal)),
+        ),
+    )
+    async def test_requests_are_classified_by_method_and_path(self, method, path, expected) -> None:
+        assert classify_request(method=method, path=path) == expected
+
+
+class TestAdaptiveConcurrencyLimiter:
+    async def test_limit_backs_off_while_pool_wait_is_above_target(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=20, min_limit=4, target_pool_wait=0.05, smoothing=1.0, backoff_interval=0
+        )
+
+        for _ in range(3):
+            limiter.record_pool_wait(0.5)
+
+        assert limiter.overloaded
+        assert limiter.limit == pytest.approx(20 * 0.9 ** 3)
+
+        for _ in range(100):
+            limiter.record_pool_wait(0.5)
+        assert limiter.limit == 4
+
+    async def test_saturated_limit_grows_while_pool_wait_is_healthy(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=3)
+
+        for _ in range(50):
+            assert limiter.try_acquire(name="other", priority=Priority.normal)
+            assert limiter.try_acquire(name="other", priority=Priority.normal)
+            limiter.release(name="other")
+            limiter.release(name="other")
+
+        assert limiter.limit == 3
+
+    async def test_low_priority_is_shed_first_and_critical_never(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, low_priority_share=0.5)
+
+        assert limiter.try_acquire(name="feed", priority=Priority.low)
+        assert limiter.try_acquire(name="feed", priority=Priority.low)
+        # half the limit is taken, more feed requests are shed but others still fit
+        assert not limiter.try_acquire(name="feed", priority=Priority.low)
+        assert limiter.try_acquire(name="other", priority=Priority.normal)
+        assert limiter.try_acquire(name="other", priority=Priority.normal)
+        assert not limiter.try_acquire(name="other", priority=Priority.normal)
+        assert limiter.try_acquire(name="auth", priority=Priority.critical)
+
+        stats = limiter.stats()
+        assert stats["in_flight"] == 5
+        assert stats["in_flight_by_class"] == {"feed": 2, "other": 2, "auth": 1}
+        assert stats["shed_by_class"] == {"feed": 1, "other": 1}
+
+    async def test_low_priority_is_shed_while_the_pool_is_congested(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=20, target_pool_wait=0.05, smoothing=1.0)
+        limiter.record_pool_wait(0.5)
+
+        assert not limiter.try_acquire(name="feed", priority=Priority.low)
+        assert limiter.try_acquire(name="other", priority=Priority.normal)
+
+    async def test_pool_wait_decays_when_the_pool_goes_quiet(self, monkeypatch) -> None:
+        now = [1000.0]
+        monkeypatch.setattr("app.api.middleware.load_shedding.time.monotonic", lambda: now[0])
+        limiter = AdaptiveConcurrencyLimiter(target_pool_wait=0.05, smoothing=1.0, half_life=1.0)
+
+        limiter.record_pool_wait(0.2)
+        assert limiter.overloaded
+
+        now[0] += 3
+        assert limiter.pool_wait == pytest.approx(0.025)
+        assert not limiter.overloaded
+
+
+class TestLoadSheddingMiddleware:
+    async def test_shed_requests_get_503_and_admitted_ones_are_released(self) -> None:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, low_priority_share=0.5)
+        release = asyncio.Event()
+
+        shedding_app = FastAPI()
+        shedding_app.add_middleware(LoadSheddingMiddleware, limiter=limiter)
+
+        @shedding_app.get("/api/feed/cleanings/")
+        async def feed() -> dict:
+            await release.wait()
+            return {}
+
+        @shedding_app.post("/api/users/login/token")
+        async def login() -> dict:
+            return {}
+
+        async with AsyncClient(app=shedding_app, base_url="http://testserver") as client:
+            slow = asyncio.ensure_future(client.get("/api/feed/cleanings/"))
+            while limiter.in_flight == 0:
+                await asyncio.sleep(0)
+
+            res = await client.get("/api/feed/cleanings/")
+            assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert res.headers["retry-after"] == "1"
+
+            res = await client.post("/api/users/login/token")
+            assert res.status_code == status.HTTP_200_OK
+
+            release.set()
+            assert (await slow).status_code == status.HTTP_200_OK
+
+        assert limiter.in_flight == 0
+
+    async def test_shed_responses_carry_cors_headers(self) -> None:
+        shedding_app = get_application()
+        # a congested pool sheds the feed before it reaches a route or the database
+        shedding_app.state.concurrency_limiter.record_pool_wait(10.0)
+
+        async with AsyncClient(app=shedding_app, base_url="http://testserver") as client:
+            res = await client.get(
+                shedding_app.url_path_for("feed:get-cleaning-feed-for-user"),
+                headers={"Origin": "http://example.com"},
+            )
+
+        assert res.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert res.headers["access-control-allow-origin"] == "*"
+
+
+class TestPoolWaitInstrumentation:
+    async def test_every_pool_checkout_is_timed(self) -> None:
+        async def acquire():
+            await asyncio.sleep(0.01)
+            return "connection"
+
+        database = SimpleNamespace(_backend=SimpleNamespace(_pool=SimpleNamespace(acquire=acquire)))
+        waits = []
+        instrument_pool_wait(database, waits.append)
+
+        assert await database._backend._pool.acquire() == "connection"
+        assert len(waits) == 1 and waits[0] >= 0.01
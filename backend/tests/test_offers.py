@@ -1,14 +1,21 @@
 from typing import List, Callable
 import pytest
+import pytest_asyncio
 import uuid
 from httpx import AsyncClient
+from databases import Database
 from fastapi import FastAPI, status
 import random
 
 from app.models.cleaning import CleaningCreate, CleaningInDB
 from app.models.user import UserInDB
 from app.models.offer import OfferCreate, OfferUpdate, OfferInDB, OfferPublic
+from app.models.evaluation import EvaluationCreate
+from app.db.repositories.cleanings import CleaningsRepository
 from app.db.repositories.offers import OffersRepository
+from app.api.dependencies.pagination import NEXT_CURSOR_HEADER
+from app.services.archive import archive_cleanings
+from tests.conftest import create_cleaning_with_evaluated_offer_helper, fresh_user_fixture_helper
 
 pytestmark = pytest.mark.asyncio
 
@@ -16,6 +23,30 @@ pytestmark = pytest.mark.asyncio
 FAKE_ID = str(uuid.uuid4())
 
 
+@pytest_asyncio.fixture
+async def cleaner_with_offers(client: AsyncClient, db: Database, user_darlene: UserInDB) -> UserInDB:
+    """
+    A cleaner of their own, so offers from other tests don't end up in their
+    list: pending on three of darlene's cleanings and accepted on a fourth.
+    """
+    cleaner = await fresh_user_fixture_helper(db=db)
+    cleanings_repo = CleaningsRepository(db)
+    offers_repo = OffersRepository(db)
+
+    for i in range(4):
+        cleaning = await cleanings_repo.create_cleaning(
+            new_cleaning=CleaningCreate(name=f"cleaning {i}", price=9.99 + i, cleaning_type="dust_up"),
+            requesting_user=user_darlene,
+        )
+        offer = await offers_repo.create_offer_for_cleaning(
+            new_offer=OfferCreate(cleaning_id=cleaning.id, user_id=cleaner.id)
+        )
+
+    await offers_repo.accept_offer(offer=offer)
+
+    return cleaner
+
+
 class TestOffersRoutes:
     async def test_routes_exist(self, app: FastAPI, client: AsyncClient) -> None:
         response = await client.post(app.url_path_for("offers:create-offer", cleaning_id=1))
@@ -209,6 +240,69 @@ class TestGetOffers:
         for offer in response.json():
             assert offer["user_id"] in [user.id for user in test_user_list]
 
+    async def test_offers_list_embeds_users_by_default_and_expands_on_request(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_darlene: UserInDB,
+        test_user_list: List[UserInDB],
+        test_cleaning_with_offers: CleaningInDB,
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_darlene)
+        path = app.url_path_for(
+            "offers:list-offers-for-cleaning", cleaning_id=test_cleaning_with_offers.id
+        )
+        usernames = {user.id: user.username for user in test_user_list}
+
+        response = await authorized_client.get(path)
+        assert response.status_code == status.HTTP_200_OK
+        for offer in response.json():
+            assert offer["user"]["username"] == usernames[offer["user_id"]]
+            assert offer["cleaning"] is None
+
+        response = await authorized_client.get(path, params={"expand": "cleaning"})
+        assert response.status_code == status.HTTP_200_OK
+        for offer in response.json():
+            assert offer["user"] is None
+            assert offer["cleaning"]["id"] == test_cleaning_with_offers.id
+
+        response = await authorized_client.get(path, params={"expand": "nonsense"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_cleaning_owner_pages_through_offers_accepted_first(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_darlene: UserInDB,
+        user_mr_robot: UserInDB,
+        test_user_list: List[UserInDB],
+        test_cleaning_with_accepted_offer: CleaningInDB,
+    ) -> None:
+        authorized_client = create_authorized_client(user=user_darlene)
+        path = app.url_path_for(
+            "offers:list-offers-for-cleaning", cleaning_id=test_cleaning_with_accepted_offer.id
+        )
+
+        offers, params = [], {"limit": 1}
+        while True:
+            response = await authorized_client.get(path, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.json()) == 1
+            offers += [OfferPublic(**o) for o in response.json()]
+
+            if NEXT_CURSOR_HEADER not in response.headers:
+                break
+            params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+        assert len(offers) == len(test_user_list)
+        assert offers[0].user_id == user_mr_robot.id
+        assert [o.status for o in offers] == ["accepted"] + ["rejected"] * (len(test_user_list) - 1)
+        rejected = [(o.created_at, o.user_id) for o in offers[1:]]
+        assert rejected == sorted(rejected)
+
+        response = await authorized_client.get(path, params={"cursor": "bm9wZQ=="})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     async def test_non_owners_forbidden_from_fetching_all_offers_for_cleaning(
         self,
         app: FastAPI,
@@ -521,3 +615,194 @@ class TestRescindOffers:
         )
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestOfferCounts:
+    async def test_counters_follow_every_offer_transition(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_darlene: UserInDB,
+        user_mr_robot: UserInDB,
+        user_tyrell: UserInDB,
+        test_user_list: List[UserInDB],
+        test_cleaning_with_offers: CleaningInDB
+    ) -> None:
+        cleanings_repo = CleaningsRepository(app.state._db)
+
+        async def offer_counts() -> dict:
+            cleaning = await cleanings_repo.get_cleaning_by_id(
+                id=test_cleaning_with_offers.id, requesting_user=user_darlene, populate=False
+            )
+            return cleaning.offer_counts.dict()
+
+        assert await offer_counts() == {
+            "pending": len(test_user_list), "accepted": 0, "rejected": 0, "cancelled": 0, "completed": 0
+        }
+
+        owner_client = create_authorized_client(user=user_darlene)
+        response = await owner_client.put(
+            app.url_path_for(
+                "offers:accept-offer-from-user",
+                cleaning_id=test_cleaning_with_offers.id,
+                username=user_mr_robot.username
+            )
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert await offer_counts() == {
+            "pending": 0, "accepted": 1, "rejected": len(test_user_list) - 1, "cancelled": 0, "completed": 0
+        }
+
+        cleaner_client = create_authorized_client(user=user_mr_robot)
+        response = await cleaner_client.put(
+            app.url_path_for("offers:cancel-offer-from-user", cleaning_id=test_cleaning_with_offers.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert await offer_counts() == {
+            "pending": len(test_user_list) - 1, "accepted": 0, "rejected": 0, "cancelled": 1, "completed": 0
+        }
+
+        tyrell_client = create_authorized_client(user=user_tyrell)
+        response = await tyrell_client.delete(
+            app.url_path_for("offers:rescind-offer-from-user", cleaning_id=test_cleaning_with_offers.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert (await offer_counts())["pending"] == len(test_user_list) - 2
+
+    async def test_moving_counters_is_not_an_edit_of_the_cleaning(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        user_darlene: UserInDB,
+        user_mr_robot: UserInDB,
+        test_cleaning_with_offers: CleaningInDB
+    ) -> None:
+        owner_client = create_authorized_client(user=user_darlene)
+        response = await owner_client.put(
+            app.url_path_for(
+                "offers:accept-offer-from-user",
+                cleaning_id=test_cleaning_with_offers.id,
+                username=user_mr_robot.username
+            )
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        cleaning = await CleaningsRepository(app.state._db).get_cleaning_by_id(
+            id=test_cleaning_with_offers.id, requesting_user=user_darlene, populate=False
+        )
+        assert cleaning.offer_counts.accepted == 1
+        assert cleaning.updated_at == test_cleaning_with_offers.updated_at
+
+
+class TestListOwnOffers:
+    async def test_cleaners_page_through_their_offers_newest_first(
+        self, app: FastAPI, create_authorized_client: Callable, cleaner_with_offers: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=cleaner_with_offers)
+        path = app.url_path_for("users:list-own-offers")
+
+        response = await authorized_client.get(path, params={"limit": 3})
+        assert response.status_code == status.HTTP_200_OK
+        first_page = response.json()
+        assert len(first_page) == 3
+        cursor = response.headers[NEXT_CURSOR_HEADER]
+
+        response = await authorized_client.get(path, params={"limit": 3, "cursor": cursor})
+        assert response.status_code == status.HTTP_200_OK
+        second_page = response.json()
+        assert len(second_page) == 1
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+        offers = [OfferPublic(**o) for o in first_page + second_page]
+        keys = [(o.created_at, o.cleaning_id) for o in offers]
+        assert keys == sorted(keys, reverse=True)
+        assert all(o.user_id == cleaner_with_offers.id for o in offers)
+        # the cleaning summary is joined in by default
+        assert all(o.cleaning.id == o.cleaning_id for o in offers)
+        assert offers[0].status == "accepted"
+        assert offers[0].cleaning.offer_counts.accepted == 1
+
+    async def test_offers_filter_by_status(
+        self, app: FastAPI, create_authorized_client: Callable, cleaner_with_offers: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=cleaner_with_offers)
+
+        response = await authorized_client.get(
+            app.url_path_for("users:list-own-offers"), params={"status": "accepted", "expand": ""}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [o["status"] for o in response.json()] == ["accepted"]
+        assert response.json()[0]["cleaning"] is None
+
+        response = await authorized_client.get(
+            app.url_path_for("users:list-own-offers"), params={"status": "not_a_status"}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    async def test_offers_on_deleted_cleanings_are_left_out(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_darlene: UserInDB,
+        cleaner_with_offers: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=cleaner_with_offers)
+        response = await authorized_client.get(app.url_path_for("users:list-own-offers"))
+        cleaning_id = response.json()[-1]["cleaning_id"]
+
+        await CleaningsRepository(db).delete_cleaning_by_id(id=cleaning_id, requesting_user=user_darlene)
+
+        response = await authorized_client.get(app.url_path_for("users:list-own-offers"))
+        assert cleaning_id not in [o["cleaning_id"] for o in response.json()]
+        assert len(response.json()) == 3
+
+    async def test_offers_on_archived_cleanings_are_still_listed(
+        self,
+        app: FastAPI,
+        create_authorized_client: Callable,
+        db: Database,
+        user_darlene: UserInDB,
+        cleaner_with_offers: UserInDB
+    ) -> None:
+        completed_cleaning = await create_cleaning_with_evaluated_offer_helper(
+            db=db,
+            owner=user_darlene,
+            cleaner=cleaner_with_offers,
+            cleaning_create=CleaningCreate(name="archived cleaning", price=19.99, cleaning_type="full_clean"),
+            eval_create=EvaluationCreate(overall_rating=5),
+        )
+        assert await archive_cleanings(db, archive_after_days=0, ids=[completed_cleaning.id]) == 1
+
+        authorized_client = create_authorized_client(user=cleaner_with_offers)
+        response = await authorized_client.get(app.url_path_for("users:list-own-offers"), params={"limit": 2})
+        assert response.status_code == status.HTTP_200_OK
+
+        # the newest offer, read from the archive, then the newest live one
+        offers = [OfferPublic(**o) for o in response.json()]
+        assert offers[0].cleaning_id == completed_cleaning.id
+        assert offers[0].status == "completed"
+        assert offers[0].cleaning.name == "archived cleaning"
+        assert offers[1].status == "accepted"
+
+        response = await authorized_client.get(
+            app.url_path_for("users:list-own-offers"),
+            params={"cursor": response.headers[NEXT_CURSOR_HEADER]},
+        )
+        assert completed_cleaning.id not in [o["cleaning_id"] for o in response.json()]
+        assert len(response.json()) == 3
+
+    async def test_invalid_cursors_are_rejected(
+        self, app: FastAPI, create_authorized_client: Callable, cleaner_with_offers: UserInDB
+    ) -> None:
+        authorized_client = create_authorized_client(user=cleaner_with_offers)
+
+        for cursor in ("not a cursor", "eyJmb28iOiAiYmFyIn0="):
+            response = await authorized_client.get(
+                app.url_path_for("users:list-own-offers"), params={"cursor": cursor}
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_unauthenticated_users_cant_list_offers(self, app: FastAPI, client: AsyncClient) -> None:
+        response = await client.get(app.url_path_for("users:list-own-offers"))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
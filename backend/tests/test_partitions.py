@@ -0,0 +1,131 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from databases import Database
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.db.repositories.offers import OffersRepository
+from app.db.repositories.partitions import PartitionsRepository
+from app.models.cleaning import CleaningInDB
+from app.models.offer import OfferCreate
+from app.models.partition import PartitionInDB
+from app.models.user import UserInDB
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    maintain_partitions,
+    partition_name,
+    plan_partitions,
+)
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime(2026, 10, 19, 17, 30, tzinfo=timezone.utc)
+
+
+def partition(name: str, bounds: str) -> PartitionInDB:
+    return PartitionInDB(table="user_offers_for_cleanings", name=name, bounds=bounds)
+
+
+class TestPartitionBounds:
+    async def test_bounds_are_parsed_from_the_partition_expression(self) -> None:
+        legacy = partition(
+            "user_offers_for_cleanings_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-12-01 00:00:00+00')"
+        )
+        assert legacy.lower is None
+        assert legacy.upper == datetime(2026, 12, 1, tzinfo=timezone.utc)
+
+        monthly = partition(
+            "user_offers_for_cleanings_p2026_12",
+            "FOR VALUES FROM ('2026-11-30 19:00:00-05') TO ('2026-12-31 19:00:00-05')",
+        )
+        assert monthly.lower == datetime(2026, 12, 1, tzinfo=timezone.utc)
+        assert monthly.upper == datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+    async def test_only_range_partitions_are_understood(self) -> None:
+        with pytest.raises(ValueError):
+            partition("user_offers_for_cleanings_default", "DEFAULT")
+
+    async def test_months_roll_over_years(self) -> None:
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert partition_name("cleaning_to_cleaner_evaluations", date(2027, 2, 1)) == \
+            "cleaning_to_cleaner_evaluations_p2027_02"
+
+
+class TestPartitionPlan:
+    async def test_missing_months_ahead_are_created_after_the_last_partition(self) -> None:
+        partitions = [
+            partition("user_offers_for_cleanings_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')"),
+            partition(
+                "user_offers_for_cleanings_p2026_11",
+                "FOR VALUES FROM ('2026-11-01 00:00:00+00') TO ('2026-12-01 00:00:00+00')",
+            ),
+        ]
+
+        plan = plan_partitions(partitions, now=NOW, months_ahead=3, retention_months=0)
+
+        assert plan.create == [date(2026, 12, 1), date(2027, 1, 1)]
+        assert plan.detach == []
+
+    async def test_nothing_is_created_when_enough_months_exist(self) -> None:
+        partitions = [
+            partition(
+                "user_offers_for_cleanings_p2027_01",
+                "FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2027-02-01 00:00:00+00')",
+            ),
+        ]
+
+        assert plan_partitions(partitions, now=NOW, months_ahead=3, retention_months=0).create == []
+
+    async def test_partitions_past_the_retention_are_detached(self) -> None:
+        old = partition(
+            "user_offers_for_cleanings_p2026_03",
+            "FOR VALUES FROM ('2026-03-01 00:00:00+00') TO ('2026-04-01 00:00:00+00')",
+        )
+        recent = partition(
+            "user_offers_for_cleanings_p2026_04",
+            "FOR VALUES FROM ('2026-04-01 00:00:00+00') TO ('2026-05-01 00:00:00+00')",
+        )
+
+        plan = plan_partitions([old, recent], now=NOW, months_ahead=0, retention_months=6)
+        assert [p.name for p in plan.detach] == [old.name]
+
+        plan = plan_partitions([old, recent], now=NOW, months_ahead=0, retention_months=0)
+        assert plan.detach == []
+
+
+class TestPartitionedTables:
+    async def test_offers_and_evaluations_are_partitioned_ahead(self, client: AsyncClient, db: Database) -> None:
+        partitions_repo = PartitionsRepository(db)
+        next_month = datetime.now(timezone.utc).replace(day=1) + timedelta(days=32)
+
+        for table in PARTITIONED_TABLES:
+            partitions = await partitions_repo.list_partitions(table=table)
+
+            assert f"{table}_legacy" in [p.name for p in partitions]
+            assert max(p.upper for p in partitions) > next_month
+
+    async def test_maintenance_is_idempotent(self, client: AsyncClient, db: Database) -> None:
+        await maintain_partitions(db, retention_months=0)
+        plan = await maintain_partitions(db, retention_months=0)
+
+        assert plan.create == []
+        assert plan.detach == []
+
+    async def test_offers_stay_unique_per_cleaner_and_cleaning(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB, user_darlene: UserInDB
+    ) -> None:
+        offers_repo = OffersRepository(db)
+        new_offer = OfferCreate(cleaning_id=test_cleaning.id, user_id=user_darlene.id)
+
+        offer = await offers_repo.create_offer_for_cleaning(new_offer=new_offer)
+        assert offer.created_at >= test_cleaning.created_at
+
+        with pytest.raises(HTTPException) as exc:
+            await offers_repo.create_offer_for_cleaning(new_offer=new_offer)
+        assert exc.value.status_code == 400
+
+        fetched = await offers_repo.get_offer_for_cleaning_from_user(cleaning=test_cleaning, user=user_darlene)
+        assert fetched.created_at == offer.created_at
@@ -36,6 +36,21 @@ class TestProfileCreate:
         assert user_profile is not None
         assert isinstance(user_profile, ProfileInDB)
 
+    async def test_profile_created_for_new_users_without_eager_jobs(
+        self, app: FastAPI, client: AsyncClient, db: Database, monkeypatch
+    ) -> None:
+        monkeypatch.setattr("app.services.jobs.jobs_run_eagerly", lambda: False)
+        profiles_repo = ProfilesRepository(db)
+
+        new_user = {"email": "nobody@polling.io",
+                    "username": "nobodypolling", "password": "noworkerisrunning"}
+        response = await client.post(app.url_path_for("users:register-new-user"), json=new_user)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["profile"] is not None
+
+        user_profile = await profiles_repo.get_profile_by_username(username="nobodypolling")
+        assert user_profile is not None
+
 
 class TestProfileView:
     async def test_authenticated_user_can_view_other_users_profile(
@@ -49,6 +64,17 @@ class TestProfileView:
         profile = ProfilePublic(**response.json())
         assert profile.username == user_darlene.username
 
+    async def test_profile_can_be_fetched_with_sparse_fields(
+        self, app: FastAPI, elliots_authorized_client: AsyncClient, user_darlene: UserInDB
+    ) -> None:
+        response = await elliots_authorized_client.get(
+            app.url_path_for("profiles:get-profile-by-username",
+                             username=user_darlene.username),
+            params={"fields": "username,image"}
+        )
+        assert response.status_code == HTTP_200_OK
+        assert set(response.json()) == {"username", "image"}
+
     async def test_unregistered_users_cannot_access_other_users_profile(
         self, app: FastAPI, client: AsyncClient, user_darlene: UserInDB
     ) -> None:
@@ -70,6 +96,25 @@ class TestProfileView:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+    async def test_profile_is_revalidated_with_etag(
+        self, app: FastAPI, elliots_authorized_client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        path = app.url_path_for("profiles:get-profile-by-username", username=user_elliot.username)
+
+        etag = (await elliots_authorized_client.get(path)).headers["etag"]
+
+        response = await elliots_authorized_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        await elliots_authorized_client.put(
+            app.url_path_for("profiles:update-own-profile"), json={"bio": "revalidated bio"}
+        )
+
+        response = await elliots_authorized_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["bio"] == "revalidated bio"
+
+
 class TestProfileManagement:
     @pytest.mark.parametrize(
         "attr,value",
@@ -0,0 +1,182 @@
+import pytest
+from fastapi import Depends, FastAPI, status
+from httpx import AsyncClient
+
+from app.core.config import SECRET_KEY, JWT_TOKEN_PREFIX
+from app.models.user import UserInDB
+from app.services import auth_service
+from app.services.rate_limiting import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitRule,
+)
+from app.api.dependencies.rate_limiting import rate_limit_writes
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestRateLimitRules:
+    async def test_rules_are_parsed_from_config_strings(self) -> None:
+        rule = RateLimitRule.parse("20/60")
+        assert rule == RateLimitRule(capacity=20, period=60.0)
+        assert rule.refill_rate == pytest.approx(20 / 60)
+
+
+class TestInMemoryRateLimiter:
+    async def test_bucket_allows_bursts_up_to_capacity_then_rejects(self) -> None:
+        limiter = RateLimiter(rules={"login-ip": RateLimitRule(3, 60)}, enabled=True)
+
+        results = [await limiter.hit(rule_name="login-ip", key="1.2.3.4") for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        # one token comes back every 20 seconds
+        assert 0 < results[-1].retry_after <= 20
+
+    async def test_keys_and_rules_have_separate_buckets(self) -> None:
+        limiter = RateLimiter(
+            rules={"login-ip": RateLimitRule(1, 60), "register-ip": RateLimitRule(1, 60)}, enabled=True
+        )
+
+        assert (await limiter.hit(rule_name="login-ip", key="a")).allowed
+        assert not (await limiter.hit(rule_name="login-ip", key="a")).allowed
+        assert (await limiter.hit(rule_name="login-ip", key="b")).allowed
+        assert (await limiter.hit(rule_name="register-ip", key="a")).allowed
+
+    async def test_tokens_refill_over_time(self, monkeypatch) -> None:
+        now = [1000.0]
+        monkeypatch.setattr("app.services.rate_limiting.time.monotonic", lambda: now[0])
+        limiter = RateLimiter(rules={"writes-user": RateLimitRule(2, 10)}, enabled=True)
+
+        for _ in range(2):
+            await limiter.hit(rule_name="writes-user", key="elliot")
+        assert not (await limiter.hit(rule_name="writes-user", key="elliot")).allowed
+
+        now[0] += 5
+        assert (await limiter.hit(rule_name="writes-user", key="elliot")).allowed
+        assert not (await limiter.hit(rule_name="writes-user", key="elliot")).allowed
+
+    async def test_least_recently_used_keys_are_evicted(self) -> None:
+        limiter = RateLimiter(
+            backend=InMemoryRateLimitBackend(max_keys=2),
+            rules={"login-ip": RateLimitRule(1, 60)},
+            enabled=True,
+        )
+
+        for key in ("a", "b", "c"):
+            await limiter.hit(rule_name="login-ip", key=key)
+
+        assert len(limiter.backend._buckets) == 2
+        # "a" was evicted and starts over with a full bucket
+        assert (await limiter.hit(rule_name="login-ip", key="a")).allowed
+
+    async def test_disabled_limiter_and_unknown_rules_allow_everything(self) -> None:
+        disabled = RateLimiter(rules={"login-ip": RateLimitRule(1, 60)}, enabled=False)
+        for _ in range(3):
+            assert (await disabled.hit(rule_name="login-ip", key="a")).allowed
+
+        limiter = RateLimiter(rules={}, enabled=True)
+        assert (await limiter.hit(rule_name="login-ip", key="a")).allowed
+
+
+class TestWriteRateLimits:
+    @pytest.fixture
+    def limited_app(self) -> FastAPI:
+        limited_app = FastAPI()
+        limited_app.state.rate_limiter = RateLimiter(
+            rules={"writes-user": RateLimitRule(2, 60)}, enabled=True
+        )
+
+        @limited_app.api_route("/things", methods=["GET", "POST"], dependencies=[Depends(rate_limit_writes)])
+        async def things() -> dict:
+            return {}
+
+        return limited_app
+
+    async def test_only_writes_are_counted(self, limited_app: FastAPI) -> None:
+        async with AsyncClient(app=limited_app, base_url="http://testserver") as client:
+            for _ in range(5):
+                assert (await client.get("/things")).status_code == status.HTTP_200_OK
+
+            assert (await client.post("/things")).status_code == status.HTTP_200_OK
+            assert (await client.post("/things")).status_code == status.HTTP_200_OK
+
+            res = await client.post("/things")
+            assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+            assert int(res.headers["retry-after"]) >= 1
+
+    async def test_writes_are_keyed_by_user_not_address(self, limited_app: FastAPI) -> None:
+        def auth_header(username: str) -> dict:
+            user = UserInDB(id="1", username=username, email=f"{username}@sample.io",
+                            password="password123", salt="salt")
+            token = auth_service.create_access_token_for_user(user=user, secret_key=str(SECRET_KEY))
+            return {"Authorization": f"{JWT_TOKEN_PREFIX} {token}"}
+
+        async with AsyncClient(app=limited_app, base_url="http://testserver") as client:
+            for _ in range(2):
+                await client.post("/things", headers=auth_header("elliot"))
+
+            res = await client.post("/things", headers=auth_header("elliot"))
+            assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+            res = await client.post("/things", headers=auth_header("darlene"))
+            assert res.status_code == status.HTTP_200_OK
+
+
+class TestLoginRateLimits:
+    async def test_login_attempts_are_limited_per_address(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        app.state.rate_limiter.rules["login-ip"] = RateLimitRule(2, 60)
+
+        for _ in range(2):
+            res = await client.post(
+                app.url_path_for("users:login-email-and-password"),
+                data={"username": user_elliot.email, "password": "wrongpassword"},
+            )
+            assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+        # even the right password is refused once the bucket is empty
+        res = await client.post(
+            app.url_path_for("users:login-email-and-password"),
+            data={"username": user_elliot.email, "password": "evenflow"},
+        )
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(res.headers["retry-after"]) >= 1
+
+    async def test_login_attempts_are_limited_per_account(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB, user_darlene: UserInDB
+    ) -> None:
+        app.state.rate_limiter.rules["login-account"] = RateLimitRule(1, 600)
+
+        res = await client.post(
+            app.url_path_for("users:login-email-and-password"),
+            data={"username": user_elliot.email, "password": "wrongpassword"},
+        )
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+        res = await client.post(
+            app.url_path_for("users:login-email-and-password"),
+            data={"username": user_elliot.email.upper(), "password": "evenflow"},
+        )
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        res = await client.post(
+            app.url_path_for("users:login-email-and-password"),
+            data={"username": user_darlene.email, "password": "ones-and-zer0es.mpeg"},
+        )
+        assert res.status_code == status.HTTP_200_OK
+
+    async def test_registration_is_limited_per_address(self, app: FastAPI, client: AsyncClient) -> None:
+        app.state.rate_limiter.rules["register-ip"] = RateLimitRule(1, 3600)
+
+        res = await client.post(
+            app.url_path_for("users:register-new-user"),
+            json={"email": "whiterose@sample.io", "username": "whiterose", "password": "timekeeper"},
+        )
+        assert res.status_code == status.HTTP_201_CREATED
+
+        res = await client.post(
+            app.url_path_for("users:register-new-user"),
+            json={"email": "price@sample.io", "username": "phillipprice", "password": "ecorp2015"},
+        )
+        assert res.status_code == status.HTTP_429_TOO_MANY_REQUESTS
@@ -1,3 +1,4 @@
+import time
 from databases.core import Database
 from fastapi.exceptions import HTTPException
 import pytest
@@ -17,10 +18,13 @@ from starlette.status import (
 )
 
 from app.services import auth_service
+from app.services.authentication import AuthService
 from app.db.repositories.users import UsersRepository
+from app.db.repositories.refresh_tokens import RefreshTokensRepository
 from app.models.user import UserCreate, UserInDB, UserPublic
 from app.core.config import SECRET_KEY, JWT_ALGORITHM, JWT_AUDIENCE, JWT_TOKEN_PREFIX, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models.token import JWTMeta, JWTCreds, JWTPayload
+from tests.conftest import fresh_user_fixture_helper
 
 
 pytestmark = pytest.mark.asyncio
@@ -118,6 +122,40 @@ class TestUsersRegistration:
         )
 
 
+class TestUserHydration:
+    async def test_user_lookups_include_profile(
+        self, app: FastAPI, client: AsyncClient, db: Database, user_elliot: UserInDB
+    ) -> None:
+        user_repo = UsersRepository(db)
+
+        for user in (
+            await user_repo.get_user_by_id(user_id=user_elliot.id),
+            await user_repo.get_user_by_email(email=user_elliot.email),
+            await user_repo.get_user_by_username(username=user_elliot.username),
+        ):
+            assert isinstance(user, UserPublic)
+            assert user.id == user_elliot.id
+            assert user.profile is not None
+            assert user.profile.user_id == user_elliot.id
+            assert user.profile.username == user_elliot.username
+
+    async def test_users_can_be_loaded_in_bulk(
+        self, app: FastAPI, client: AsyncClient, db: Database, test_user_list: List[UserInDB]
+    ) -> None:
+        user_repo = UsersRepository(db)
+        user_ids = [user.id for user in test_user_list]
+
+        users = await user_repo.get_users_by_ids(user_ids=user_ids + user_ids + ["not-a-user-id"])
+
+        assert set(users) == set(user_ids)
+        for user_id, user in users.items():
+            assert user.id == user_id
+            assert user.profile is not None
+            assert user.profile.user_id == user_id
+
+        assert await user_repo.get_users_by_ids(user_ids=[]) == {}
+
+
 class TestAuthTokens:
     async def test_can_create_access_token_succesfully(
         self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
@@ -217,6 +255,57 @@ class TestAuthTokens:
                 token=wrong_token, secret_key=str(secret))
 
 
+    async def test_verified_tokens_are_served_from_cache(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        service = AuthService()
+        token = service.create_access_token_for_user(
+            user=user_elliot, secret_key=str(SECRET_KEY))
+
+        assert service.token_cache.get(token=token, secret_key=str(SECRET_KEY)) is None
+
+        username = service.get_username_from_token(
+            token=token, secret_key=str(SECRET_KEY))
+        cached = service.token_cache.get(token=token, secret_key=str(SECRET_KEY))
+
+        assert cached is not None
+        assert cached.username == username == user_elliot.username
+        assert service.get_username_from_token(
+            token=token, secret_key=str(SECRET_KEY)) == username
+
+    async def test_token_cache_does_not_bypass_secret_or_expiry(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        service = AuthService()
+        token = service.create_access_token_for_user(
+            user=user_elliot, secret_key=str(SECRET_KEY))
+        service.get_username_from_token(token=token, secret_key=str(SECRET_KEY))
+
+        with pytest.raises(HTTPException):
+            service.get_username_from_token(token=token, secret_key="wrong-secret")
+
+        # pretend the cached entry outlived the token
+        service.token_cache.set(
+            token=token, secret_key=str(SECRET_KEY), username=user_elliot.username, exp=0
+        )
+        assert service.token_cache.get(token=token, secret_key=str(SECRET_KEY)) is None
+        assert len(service.token_cache) == 0
+
+    async def test_token_cache_is_bounded(
+        self, app: FastAPI, client: AsyncClient, test_user_list: List[UserInDB]
+    ) -> None:
+        service = AuthService()
+        service.token_cache.max_size = 2
+
+        for user in test_user_list:
+            token = service.create_access_token_for_user(
+                user=user, secret_key=str(SECRET_KEY))
+            service.get_username_from_token(
+                token=token, secret_key=str(SECRET_KEY))
+
+        assert len(service.token_cache) == 2
+
+
 class TestUserLogin:
     async def test_user_can_login_successfully_and_receives_valid_token(
         self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
@@ -310,3 +399,100 @@ class TestUserMe:
         )
 
         assert response.status_code == HTTP_401_UNAUTHORIZED
+
+
+class TestRefreshTokens:
+    async def login_elliot(self, app: FastAPI, client: AsyncClient) -> dict:
+        response = await client.post(
+            app.url_path_for("users:login-email-and-password"),
+            data={"username": "elliot@sample.io", "password": "evenflow"},
+            headers={"content-type": "application/x-www-form-urlencoded"},
+        )
+        assert response.status_code == HTTP_200_OK
+
+        return response.json()
+
+    async def test_jwt_meta_timestamps_are_computed_per_token(self) -> None:
+        first_meta = JWTMeta()
+        time.sleep(0.01)
+        second_meta = JWTMeta()
+
+        assert second_meta.iat > first_meta.iat
+        assert second_meta.exp > first_meta.exp
+
+    async def test_login_returns_refresh_token(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        tokens = await self.login_elliot(app, client)
+
+        assert tokens.get("refresh_token")
+        assert tokens["refresh_token"] != tokens["access_token"]
+
+    async def test_refresh_token_can_be_exchanged_for_new_tokens(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        tokens = await self.login_elliot(app, client)
+
+        response = await client.post(
+            app.url_path_for("users:refresh-access-token"),
+            json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == HTTP_200_OK
+
+        refreshed = response.json()
+        assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+        username = auth_service.get_username_from_token(
+            token=refreshed["access_token"], secret_key=str(SECRET_KEY))
+        assert username == user_elliot.username
+
+    async def test_reused_refresh_token_revokes_whole_family(
+        self, app: FastAPI, client: AsyncClient, user_elliot: UserInDB
+    ) -> None:
+        tokens = await self.login_elliot(app, client)
+
+        response = await client.post(
+            app.url_path_for("users:refresh-access-token"),
+            json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == HTTP_200_OK
+        rotated_refresh_token = response.json()["refresh_token"]
+
+        # replaying the first token is treated as theft
+        response = await client.post(
+            app.url_path_for("users:refresh-access-token"),
+            json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+        response = await client.post(
+            app.url_path_for("users:refresh-access-token"),
+            json={"refresh_token": rotated_refresh_token}
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+    async def test_deactivated_users_refresh_token_is_rejected_without_rotating(
+        self, app: FastAPI, client: AsyncClient, db: Database
+    ) -> None:
+        user = await fresh_user_fixture_helper(db=db)
+        refresh_tokens_repo = RefreshTokensRepository(db)
+        issued_token = await refresh_tokens_repo.create_refresh_token_for_user(user=user)
+        await db.execute("UPDATE users SET is_active = FALSE WHERE id = :id;", values={"id": user.id})
+
+        response = await client.post(
+            app.url_path_for("users:refresh-access-token"),
+            json={"refresh_token": issued_token.refresh_token}
+        )
+        assert response.status_code == HTTP_401_UNAUTHORIZED
+
+        stored_token = await refresh_tokens_repo.get_refresh_token(refresh_token=issued_token.refresh_token)
+        assert stored_token.revoked_at is None
+        assert stored_token.replaced_by is None
+
+    async def test_unknown_refresh_token_is_rejected(self, app: FastAPI, client: AsyncClient) -> None:
+        response = await client.post(
+            app.url_path_for("users:refresh-access-token"),
+            json={"refresh_token": "not-a-real-refresh-token"}
+        )
+
+        assert response.status_code == HTTP_401_UNAUTHORIZED
@@ -0,0 +1,150 @@
+import uuid
+import datetime
+
+import pytest
+from databases import Database
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.db.ids import UUIDv7Generator, get_id_generator, get_id_timestamp, min_id_at
+from app.db.repositories.cleanings import CleaningsRepository
+from app.models.core import is_valid_uuid
+from app.models.cleaning import CleaningCreate, CleaningInDB, CleaningPublic
+from app.models.offer import OfferInDB
+from app.models.user import UserInDB
+
+pytestmark = pytest.mark.asyncio
+
+KEY_COLUMNS = {
+    ("users", "id"),
+    ("profiles", "id"),
+    ("profiles", "user_id"),
+    ("cleanings", "id"),
+    ("cleanings", "owner"),
+    ("user_offers_for_cleanings", "user_id"),
+    ("user_offers_for_cleanings", "cleaning_id"),
+    ("cleaning_to_cleaner_evaluations", "cleaning_id"),
+    ("cleaning_to_cleaner_evaluations", "cleaner_id"),
+    ("refresh_tokens", "id"),
+    ("refresh_tokens", "user_id"),
+    ("refresh_tokens", "family_id"),
+    ("refresh_tokens", "replaced_by"),
+}
+
+
+class TestUUIDIds:
+    async def test_uuid_values_from_the_database_become_strings(self) -> None:
+        cleaning_id, owner_id = uuid.uuid4(), uuid.uuid4()
+        cleaning = CleaningInDB(
+            id=cleaning_id, name="clean", price=10.0, cleaning_type="dust_up", owner=owner_id
+        )
+
+        assert cleaning.id == str(cleaning_id)
+        assert cleaning.owner == str(owner_id)
+        assert CleaningPublic(**cleaning.dict()).json().count(str(owner_id)) == 1
+
+        offer = OfferInDB(user_id=owner_id, cleaning_id=str(cleaning_id))
+        assert (offer.user_id, offer.cleaning_id) == (str(owner_id), str(cleaning_id))
+
+    async def test_ids_are_documented_as_uuids(self) -> None:
+        schema = CleaningPublic.schema()
+
+        assert schema["properties"]["id"] == {"title": "Id", "type": "string", "format": "uuid"}
+
+    async def test_only_well_formed_uuids_are_valid(self) -> None:
+        assert is_valid_uuid(str(uuid.uuid4()))
+        assert is_valid_uuid(uuid.uuid4())
+        assert not is_valid_uuid("None")
+        assert not is_valid_uuid("cleaning-3")
+
+
+class TestUUIDColumns:
+    async def test_keys_are_stored_as_native_uuids(self, client: AsyncClient, db: Database) -> None:
+        columns = await db.fetch_all(
+            query="""
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = current_schema();
+            """
+        )
+        types = {(c["table_name"], c["column_name"]): c["data_type"] for c in columns}
+
+        assert {column: types[column] for column in KEY_COLUMNS} == {column: "uuid" for column in KEY_COLUMNS}
+        assert not any(column.endswith("__uuid") for _, column in types)
+
+    async def test_malformed_ids_are_not_found(
+        self, app: FastAPI, elliots_authorized_client: AsyncClient
+    ) -> None:
+        res = await elliots_authorized_client.get(
+            app.url_path_for("cleanings:get-cleaning-by-id", cleaning_id="not-a-uuid")
+        )
+
+        assert res.status_code == 404
+
+    async def test_malformed_ids_are_left_out_of_bulk_loads(
+        self, client: AsyncClient, db: Database, test_cleaning: CleaningInDB
+    ) -> None:
+        cleanings = await CleaningsRepository(db).get_cleanings_by_ids(ids=[test_cleaning.id, "not-a-uuid"])
+
+        assert list(cleanings) == [test_cleaning.id]
+        assert await CleaningsRepository(db).get_cleanings_by_ids(ids=["not-a-uuid"]) == {}
+
+
+class TestIdGenerators:
+    async def test_uuid7_ids_carry_their_creation_time(self) -> None:
+        generate_id = UUIDv7Generator(clock=lambda: 1_700_000_000_123)
+        id = uuid.UUID(generate_id())
+
+        assert (id.version, id.variant) == (7, uuid.RFC_4122)
+        assert get_id_timestamp(str(id)) == datetime.datetime(
+            2023, 11, 14, 22, 13, 20, 123000, tzinfo=datetime.timezone.utc
+        )
+        assert get_id_timestamp(str(uuid.uuid4())) is None
+
+    async def test_ids_keep_increasing_within_a_millisecond_and_when_the_clock_goes_back(self) -> None:
+        now = [1_700_000_000_000]
+        generate_id = UUIDv7Generator(clock=lambda: now[0])
+
+        ids = [generate_id() for _ in range(5000)]
+        now[0] -= 1000
+        ids += [generate_id() for _ in range(10)]
+
+        assert [uuid.UUID(id) for id in ids] == sorted(uuid.UUID(id) for id in ids)
+        assert len(set(ids)) == len(ids)
+        # more ids than the counter holds borrow from the next milliseconds
+        assert get_id_timestamp(ids[-1]) > get_id_timestamp(ids[0])
+
+    async def test_min_id_at_bounds_ids_generated_from_then_on(self) -> None:
+        generate_id = UUIDv7Generator(clock=lambda: 1_700_000_000_123)
+        moment = datetime.datetime.fromtimestamp(1_700_000_000.123, tz=datetime.timezone.utc)
+
+        assert uuid.UUID(min_id_at(moment)) <= uuid.UUID(generate_id())
+        assert uuid.UUID(min_id_at(moment + datetime.timedelta(milliseconds=1))) > uuid.UUID(generate_id())
+
+    async def test_generator_is_picked_by_name(self) -> None:
+        assert uuid.UUID(get_id_generator("uuid4")()).version == 4
+        assert uuid.UUID(get_id_generator("uuid7")()).version == 7
+
+        with pytest.raises(ValueError):
+            get_id_generator("serial")
+
+
+class TestRepositoryIds:
+    async def test_new_cleanings_are_listed_in_creation_order(
+        self, client: AsyncClient, db: Database, user_angela: UserInDB
+    ) -> None:
+        cleanings_repo = CleaningsRepository(db)
+        created = [
+            await cleanings_repo.create_cleaning(
+                new_cleaning=CleaningCreate(name=f"ordered cleaning {i}", price=10.0), requesting_user=user_angela
+            )
+            for i in range(3)
+        ]
+
+        assert all(uuid.UUID(cleaning.id).version == 7 for cleaning in created)
+
+        listed = await cleanings_repo.list_all_user_cleanings(requesting_user=user_angela)
+        listed_ids = [cleaning.id for cleaning in listed]
+        assert [listed_ids.index(cleaning.id) for cleaning in created] == sorted(
+            listed_ids.index(cleaning.id) for cleaning in created
+        )